@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Adversarial benchmark: parse time of files with pathologically long lines.
+
+Run with `python -m benchmarks.adversarial`. Fails if any file takes longer than the budget."""
+
+import sys
+from time import perf_counter
+
+import click
+
+from umldotcs.creator import UmlCreator
+
+SHAPES = {
+    "parameters": lambda n: "public void Do(" + ", ".join(f"int p{i}" for i in range(n)) + ")",
+    "defaults": lambda n: "public void Do(" + ", ".join(f"int p{i} = {i}" for i in range(n)) + ")",
+    "tuple": lambda n: "public (" + ", ".join(["int"] * n) + ") Do()",
+    "generic": lambda n: "public Dictionary<" + ", ".join(["int"] * n) + "> Field;",
+    "initializer": lambda n: "public int[] X = new[] { " + ", ".join(map(str, range(n))) + " };",
+    "expression": lambda n: "public int Y => " + " + ".join(["1"] * n) + ";",
+    "blank": lambda n: " " * 8 * n,
+    "minified": lambda n: "public int A;" * n,
+}
+
+
+def source(line):
+    """Return the source of a class with a single member line."""
+    return f"namespace Bench\n{{\n    public class Klass\n    {{\n{line}\n    }}\n}}\n"
+
+
+def parse_time(text, repeat=3):
+    """Return the fastest of repeat parses of a source, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        UmlCreator("Klass.cs").process_source(text)
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+@click.command()
+@click.option("--sizes", default="1000,10000,100000", help="Comma-separated repetitions per line.")
+@click.option("--budget", default=50.0, help="Maximum milliseconds per file.")
+def main(sizes, budget):
+    """Time the parsing of files with one long line of each shape, of increasing length."""
+    slow = []
+    for size in map(int, sizes.split(",")):
+        line = f"{size:>7}"
+        for name, shape in SHAPES.items():
+            text = source(shape(size))
+            elapsed = parse_time(text) * 1000
+            line += f"  {name} {elapsed:6.1f}ms"
+            if elapsed > budget:
+                slow.append(f"{name} x{size} ({len(text) / 2**10:.0f} KiB): {elapsed:.1f}ms")
+        click.echo(line)
+    if slow:
+        click.secho(f"Over the budget of {budget}ms per file:", fg="bright_red", bold=True)
+        click.echo("\n".join(slow))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Dot size benchmark: size of normal and compact .gv files and the time dot takes on them.
+
+Run with `python -m benchmarks.dot_size`. Rendering is timed only if dot is on the PATH."""
+
+from os.path import getsize, join
+from shutil import which
+from subprocess import run  # nosec
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import click
+
+from benchmarks.generate import generate_tree
+from umldotcs.model import Project
+
+
+def render_time(output_gv):
+    """Return the number of seconds dot takes to render a .gv file to SVG."""
+    start = perf_counter()
+    run(["dot", "-Tsvg", "-o", "/dev/null", output_gv], check=True)
+    return perf_counter() - start
+
+
+@click.command()
+@click.option("--sizes", default="50,200,800", help="Comma-separated numbers of files.")
+@click.option("--members", default=20, help="Members per class.")
+def main(sizes, members):
+    """Compare normal and compact dot code of generated trees of increasing size."""
+    dot = which("dot")
+    if not dot:
+        click.secho("dot not found, only comparing sizes", fg="yellow")
+    for size in map(int, sizes.split(",")):
+        with TemporaryDirectory() as tmp:
+            generate_tree(join(tmp, "src"), size, members)
+            model = Project([join(tmp, "src")]).build()
+            line = f"{size:>6} files"
+            for name, compact in [("normal", False), ("compact", True)]:
+                output_gv = join(tmp, f"{name}.gv")
+                model.write_gv(output_gv, compact=compact)
+                line += f"  {name} {getsize(output_gv) / 2**10:9.1f} KiB"
+                if dot:
+                    line += f" {render_time(output_gv):7.2f}s"
+            normal, compact = getsize(join(tmp, "normal.gv")), getsize(join(tmp, "compact.gv"))
+            click.echo(f"{line}  ({100 * (1 - compact / normal):.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Generate synthetic C# source trees for benchmarks."""
+
+from os import makedirs
+from os.path import join
+
+ACCESS = ["public", "protected", "internal", "private"]
+TYPES = ["int", "string", "List<string>", "Dictionary<string, List<int>>", "Guid"]
+
+
+def klass(nsp, name, members, body=1):
+    """Return the source of a class with the given number of members, half of them methods.
+
+    Methods have body lines of statements, including a comment and a string."""
+    lines = ["using System;", "", f"namespace {nsp}", "{", f"    public class {name} : IBench"]
+    lines.append("    {")
+    for i in range(members):
+        access, typ = ACCESS[i % len(ACCESS)], TYPES[i % len(TYPES)]
+        if i % 2:
+            lines.append("        [Obsolete]")
+            lines.append(
+                f"        {access} {typ} Method{i}({typ} first, int second = {i}, bool third = true)"
+            )
+            lines.append("        {")
+            for j in range(1, body):
+                statement = f'var local{j} = string.Format("{{0}} {j}", second); // step {j}'
+                lines.append(f"            {statement}")
+            lines.extend([f"            return default({typ});", "        }", ""])
+        else:
+            lines.append(f"        {access} static readonly {typ} Field{i} = default({typ});")
+    lines.extend(["    }", "}", ""])
+    return "\n".join(lines)
+
+
+def generate_tree(directory, files, members=20, namespaces=10, body=1):
+    """Write a tree of distinct classes to directory. Return the total number of members."""
+    for i in range(files):
+        space = f"Space{i % namespaces}"
+        makedirs(join(directory, space), exist_ok=True)
+        with open(join(directory, space, f"Klass{i}.cs"), "w") as file_:
+            file_.write(klass(f"Bench.{space}", f"Klass{i}", members, body))
+    return files * members
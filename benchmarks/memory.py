@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Memory benchmark: tracemalloc figures and peak RSS of parsing generated trees.
+
+Run with `python -m benchmarks.memory`. Exits with 1 if the memory retained by the model
+per 1k members of any tree exceeds the stored baseline by more than its tolerance."""
+
+import inspect
+import json
+import linecache
+import sys
+import tracemalloc
+from os.path import dirname, join
+from resource import RUSAGE_SELF, getrusage
+from subprocess import run  # nosec
+from tempfile import TemporaryDirectory
+
+import click
+
+from benchmarks.generate import generate_tree
+from umldotcs import creator, entities, features, helpers
+from umldotcs.model import Project
+
+BASELINE = join(dirname(__file__), "memory_baseline.json")
+# Source lines allocating strings: tokenizing lines and escaping type names
+STRINGS = (creator.__file__, helpers.__file__)
+
+
+def class_lines(*classes):
+    """Return (filename, first line, last line, class name) for the source of classes."""
+    spans = []
+    for cls in classes:
+        lines, first = inspect.getsourcelines(cls)
+        spans.append((inspect.getsourcefile(cls), first, first + len(lines) - 1, cls.__name__))
+    return spans
+
+
+CLASSES = class_lines(features.Field, features.Method, features.FieldOrMethod)
+
+
+def category(frame):
+    """Return the category of the memory allocated on a line of code.
+
+    Lines constructing or initialising fields and methods count for Field and Method,
+    other lines in entities.py for UmlEntity and tokenizing and escaping for str."""
+    text = linecache.getline(frame.filename, frame.lineno)
+    for name in ["Field", "Method"]:
+        if f"{name}(" in text:
+            return name
+    for filename, first, last, name in CLASSES:
+        if frame.filename == filename and first <= frame.lineno <= last:
+            return name
+    if frame.filename == entities.__file__:
+        return "UmlEntity"
+    if frame.filename in STRINGS:
+        return "str"
+    return "other"
+
+
+def measure(directory):
+    """Parse a directory under tracemalloc. Return a dictionary of memory figures.
+
+    The memory retained by the model is the difference of snapshots taken before and
+    after the build, grouped by the file and line it was allocated on."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    model = Project([directory]).build()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    objects = dict(UmlEntity=0, Field=0, Method=0, FieldOrMethod=0, str=0, other=0)
+    for stat in after.compare_to(before, "lineno"):
+        objects[category(stat.traceback[0])] += stat.size_diff
+    retained = sum(objects.values())
+    members = sum(len(ent.fields) + len(ent.methods) for ent in model.entities())
+    return dict(
+        members=members,
+        traced_current=current,
+        traced_peak=peak,
+        retained=retained,
+        retained_per_1k_members=1000 * retained // max(members, 1),
+        peak_rss=getrusage(RUSAGE_SELF).ru_maxrss * 1024,
+        objects=objects,
+    )
+
+
+@click.command()
+@click.option("--sizes", default="100,400,1600", help="Comma-separated numbers of files.")
+@click.option("--members", default=20, help="Members per class.")
+@click.option("--update-baseline", is_flag=True, help="Store the results as the new baseline.")
+@click.option("--measure", "directory", hidden=True)
+def main(sizes, members, update_baseline, directory):
+    """Measure memory use of parsing generated trees of increasing size."""
+    if directory:
+        click.echo(json.dumps(measure(directory)))
+        return
+    with open(BASELINE) as file_:
+        baseline = json.load(file_)
+    budget = baseline["retained_per_1k_members"] * (1 + baseline["tolerance"])
+    worst = 0
+    for size in map(int, sizes.split(",")):
+        with TemporaryDirectory() as tmp:
+            generate_tree(tmp, size, members)
+            # Measure in a fresh interpreter so that peak RSS belongs to this tree only
+            args = [sys.executable, "-m", "benchmarks.memory", "--measure", tmp]
+            result = json.loads(run(args, capture_output=True, check=True, text=True).stdout)
+        worst = max(worst, result["retained_per_1k_members"])
+        click.echo(
+            f"{size:>6} files {result['members']:>8} members "
+            f"peak {result['traced_peak'] / 2**20:8.1f} MiB "
+            f"retained {result['retained'] / 2**20:8.1f} MiB "
+            f"({result['retained_per_1k_members'] / 2**10:7.1f} KiB/1k members) "
+            f"RSS {result['peak_rss'] / 2**20:8.1f} MiB  "
+            + " ".join(f"{k} {v / 2**20:.1f} MiB" for k, v in result["objects"].items())
+        )
+    if update_baseline:
+        baseline["retained_per_1k_members"] = worst
+        with open(BASELINE, "w") as file_:
+            json.dump(baseline, file_, indent=2)
+            file_.write("\n")
+    elif worst > budget:
+        click.secho(
+            f"Retained {worst} bytes per 1k members, exceeding the budget of {budget:.0f}",
+            fg="bright_red",
+            bold=True,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Parser micro-benchmark: lines per second of the member parser and of whole files.
+
+Run with `python -m benchmarks.parser`."""
+
+from timeit import repeat
+
+import click
+
+from benchmarks.generate import klass
+from umldotcs.creator import UmlCreator
+from umldotcs.entities import UmlClass
+from umldotcs.features import Access, Modifier
+
+MEMBERS = [
+    "public Guid Id { get; set; }",
+    "private static readonly string CrLf = Environment.NewLine;",
+    "protected internal virtual IDictionary<string, List<int>> Lookup => lookup;",
+    "public async Task<int> Do(string sql, IEnumerable<object> subs, bool prep = true)",
+    "public Klass(int first, string second = null, bool third = false) : base(first)",
+    "public static explicit operator int(Klass klass) => klass.Count;",
+    "internal override bool Equals(object obj)",
+    "return default(int);",
+]
+
+
+def rate(func, lines, number):
+    """Return the best number of lines per second of calling func on each of lines."""
+    best = min(repeat(lambda: [func(line) for line in lines], number=number, repeat=5))
+    return len(lines) * number / best
+
+
+@click.command()
+@click.option("--number", default=2000, help="Passes over the lines per timing.")
+def main(number):
+    """Time the keyword lookups, the member parser and the parsing of a whole file."""
+    tokens = [line.split() for line in MEMBERS]
+    ent = UmlClass(["Klass"])
+
+    def parse_member(toks):
+        ent.fields, ent.methods = [], []
+        ent.parse_tokens(toks.copy(), [])
+
+    source = klass("Bench", "Klass", 200)
+    results = [
+        ("Access.parse_access", rate(lambda t: Access.parse_access(t.copy()), tokens, number)),
+        (
+            "Modifier.parse_modifiers",
+            rate(lambda t: Modifier.parse_modifiers(t[1:]), tokens, number),
+        ),
+        ("UmlEntity.parse_tokens", rate(parse_member, tokens, number)),
+        (
+            "UmlCreator.process_source",
+            rate(lambda s: UmlCreator("Klass.cs").process_source(s), [source], number // 100)
+            * len(source.splitlines()),
+        ),
+    ]
+    for name, lines_per_second in results:
+        click.echo(f"{name:<28} {lines_per_second:>12,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Scanner benchmark: throughput of the NumPy scanner and of parsing every line in Python.
+
+Run with `python -m benchmarks.scanner`. Requires NumPy."""
+
+import sys
+from os.path import getsize
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import click
+
+from benchmarks.generate import generate_tree
+from umldotcs import scanner
+from umldotcs.model import parse_source
+from umldotcs.sources import glob_files
+
+
+def python_engine(paths):
+    """Parse files line by line in Python."""
+    return [parse_source(path, None) for path in paths]
+
+
+def numpy_engine(paths):
+    """Parse files with the vectorised scanner."""
+    return scanner.parse_sources([(path, None) for path in paths])
+
+
+def best_time(func, paths, repeat=3):
+    """Return the fastest of repeat runs of func(paths), in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func(paths)
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+@click.command()
+@click.option("--sizes", default="100,400,1600", help="Comma-separated numbers of files.")
+@click.option("--members", default=40, help="Members per class.")
+@click.option("--body", default=10, help="Lines per method body.")
+def main(sizes, members, body):
+    """Compare both engines on generated trees of increasing size."""
+    if scanner.np is None:
+        click.secho("NumPy is not installed", fg="bright_red", bold=True)
+        sys.exit(1)
+    for size in map(int, sizes.split(",")):
+        with TemporaryDirectory() as tmp:
+            generate_tree(tmp, size, members, body=body)
+            paths = glob_files(tmp)
+            megabytes = sum(map(getsize, paths)) / 2**20
+            python = best_time(python_engine, paths)
+            vectorised = best_time(numpy_engine, paths)
+        click.echo(
+            f"{size:>6} files {megabytes:7.1f} MiB  python {megabytes / python:6.1f} MiB/s  "
+            f"numpy {megabytes / vectorised:6.1f} MiB/s  ({python / vectorised:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
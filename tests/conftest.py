@@ -0,0 +1,15 @@
+"""Shared test fixtures."""
+
+import pytest
+
+
+@pytest.fixture(name="fake_dot")
+def fixture_fake_dot(tmp_path, monkeypatch):
+    """Put a dot on the PATH which echoes its input, or fails on empty input."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    dot = bin_dir / "dot"
+    dot.write_text('#!/bin/sh\nexec grep ""\n')
+    dot.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir), prepend=":")
+    return dot
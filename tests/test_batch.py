@@ -0,0 +1,104 @@
+"""Test the batch module."""
+
+from time import sleep
+
+import pytest
+
+from umldotcs.batch import Batch, Entry
+
+MANIFEST = """[app]
+root = ./tests/sln/Uml.Cs.App
+gv = {tmp}/app.gv
+label = App
+
+[dll]
+root = ./tests/sln/Uml.Cs.Dll/Uml.Cs.Dll.csproj
+svg = {tmp}/dll.svg
+font = Arial
+repo_url = https://example.com/dll
+"""
+
+
+@pytest.fixture(name="svg_dot")
+def fixture_svg_dot(tmp_path, monkeypatch):
+    """Put a dot on the PATH which copies its input to the -o file."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    dot = bin_dir / "dot"
+    dot.write_text('#!/bin/sh\ncat > "$3"\n')
+    dot.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir), prepend=":")
+    return dot
+
+
+def test_entry___init__():
+    """Test Entry.__init__()."""
+    with pytest.raises(ValueError, match="neither a gv nor an svg"):
+        Entry("nowhere", ".")
+
+
+def test_entry_read_manifest(tmp_path):
+    """Test Entry.read_manifest()."""
+    (tmp_path / "manifest.ini").write_text(MANIFEST.format(tmp=tmp_path))
+    assert Entry.read_manifest(tmp_path / "manifest.ini") == [
+        Entry("app", "./tests/sln/Uml.Cs.App", f"{tmp_path}/app.gv", label="App"),
+        Entry(
+            "dll",
+            "./tests/sln/Uml.Cs.Dll/Uml.Cs.Dll.csproj",
+            output_svg=f"{tmp_path}/dll.svg",
+            font="Arial",
+            repo_url="https://example.com/dll",
+        ),
+    ]
+    with pytest.raises(ValueError, match="has no root"):
+        Entry.from_dict("foo", {"gv": "foo.gv"})
+    with pytest.raises(ValueError, match="unknown options colour"):
+        Entry.from_dict("foo", {"root": ".", "gv": "foo.gv", "colour": "red"})
+
+
+def test_batch_run(svg_dot, tmp_path):  # pylint: disable=unused-argument
+    """Test Batch.run()."""
+    (tmp_path / "empty").mkdir()
+    entries = [
+        Entry("app", "./tests/sln/Uml.Cs.App", f"{tmp_path}/app.gv", label="App"),
+        Entry("dll", "./tests/sln/Uml.Cs.Dll", output_svg=f"{tmp_path}/dll.svg", font="Arial"),
+        Entry("empty", str(tmp_path / "empty"), f"{tmp_path}/empty.gv"),
+    ]
+    reported = []
+    batch = Batch(jobs=2, cache_dir=str(tmp_path))
+    results = batch.run(entries, reported.append)
+    assert sorted(stats["name"] for stats in reported) == ["app", "dll", "empty"]
+    assert [stats["files"] for stats in results] == [1, 4, 0]
+    assert [stats["parsed"] for stats in results] == [1, 4, 0]
+    assert results[2]["error"] == "no code"
+    assert results[0]["rate"] > 0
+    assert 'label    = "App"' in (tmp_path / "app.gv").read_text()
+    assert 'fontname = "Arial"' in (tmp_path / "dll.svg").read_text()
+    assert (tmp_path / "app.snapshot").exists()
+    results = batch.run(entries)
+    assert [stats["parsed"] for stats in results] == [0, 0, 0]
+
+
+def test_batch_run_bounded(tmp_path):
+    """Test that Batch.run() waits for renders instead of holding on to every model."""
+    pending, peak = [], []
+
+    class SlowBatch(Batch):
+        """A batch recording the models built but not rendered yet."""
+
+        def build(self, entry, pool, stats):
+            model = super().build(entry, pool, stats)
+            pending.append(entry.name)
+            peak.append(len(pending))
+            return model
+
+        def render(self, entry, model, stats, report=None):
+            sleep(0.05)
+            pending.remove(entry.name)
+            return stats
+
+    entries = [
+        Entry(f"app{i}", "./tests/sln/Uml.Cs.App", f"{tmp_path}/app{i}.gv") for i in range(5)
+    ]
+    SlowBatch(jobs=1, max_dot=1).run(entries)
+    assert max(peak) <= 2
@@ -1,14 +1,14 @@
 """Test the CLI."""
 
-from umldotcs.cli import (
-    NAMESPACES,
-    RELATIONS,
-    exclude,
-    glob_files,
-    write_output,
-    zip_namespaces,
-    zip_relations,
-)
+import tarfile
+from shutil import copytree
+
+from click.testing import CliRunner
+
+from umldotcs.cli import exclude, glob_files, main, parse_root, write_output
+from umldotcs.graphviz import DotPipe
+from umldotcs.model import Model
+from umldotcs.vcs import git
 
 
 def test_glob_files():
@@ -51,27 +51,282 @@ def test_exclude():
 
 def test_write_output():
     """Test cli.write_output()."""
-    assert NAMESPACES == {}
-    assert write_output(None, None, None, None) == 0
-
-
-def test_zip_namespaces():
-    """Test cli.zip_namespaces()."""
-    assert NAMESPACES == {}
-    nsp_inner = {"Inner.Space": [1, 2, 3]}
-    zip_namespaces(nsp_inner)
-    assert NAMESPACES == nsp_inner
-    nsp_outer1 = {"Outer.Space": [4, 5, 6]}
-    nsp_outer2 = {"Outer.Space": [7, 8, 9]}
-    zip_namespaces(nsp_outer1)
-    zip_namespaces(nsp_outer2)
-    nsp_merged = {"Inner.Space": [1, 2, 3], "Outer.Space": [4, 5, 6, 7, 8, 9]}
-    assert NAMESPACES == nsp_merged
-    NAMESPACES == {}  # pylint: disable=pointless-statement
-
-
-def test_zip_relations():
-    """Test cli.zip_relations()."""
-    assert RELATIONS == []
-    zip_relations(["foo"])
-    assert RELATIONS == ["foo"]
+    assert write_output(Model(), None, None, None, None) == 0
+
+
+def test_default_group(tmp_path):
+    """Test that create is the default command of the CLI."""
+    runner = CliRunner()
+    assert "create" in runner.invoke(main, ["--help"]).output
+    assert "Missing argument 'DIRECTORY'" in runner.invoke(main, []).output
+    result = runner.invoke(main, ["-o", f"{tmp_path}/out.gv", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "NO CODE" in result.output
+
+
+def test_parse_root():
+    """Test cli.parse_root()."""
+    assert parse_root("./tests/sln/") == ("sln", "./tests/sln/")
+    assert parse_root("tests=./tests/sln") == ("tests", "./tests/sln")
+
+
+def test_create_uml_since(tmp_path):
+    """Test create --since REV --snapshot FILE."""
+    copytree("./tests/sln", tmp_path / "sln")
+    repo, directory = str(tmp_path), str(tmp_path / "sln")
+    git(repo, "init", "--quiet")
+    git(repo, "add", ".")
+    git(repo, "-c", "user.name=Test", "-c", "user.email=test@example.com", "commit", "-qm", "init")
+    runner = CliRunner()
+    args = ["-o", f"{repo}/uml.gv", directory]
+    result = runner.invoke(main, ["--since", "HEAD"] + args)
+    assert "--since requires --snapshot" in result.output
+    args = ["--snapshot", f"{repo}/uml.snapshot"] + args
+    result = runner.invoke(main, ["--since", "HEAD"] + args)
+    assert "--since requires --snapshot" not in result.output
+    assert "No usable snapshot" in result.output
+    assert result.output.count("Processing") == 5
+    with open(tmp_path / "uml.gv") as file_:
+        expected = file_.read()
+    with open(tmp_path / "sln" / "Uml.Cs.Dll" / "UmlEnum.cs", "a") as file_:
+        file_.write("\n")
+    result = runner.invoke(main, ["--since", "HEAD"] + args)
+    assert result.output == "Processing /Uml.Cs.Dll/UmlEnum.cs\n"
+    with open(tmp_path / "uml.gv") as file_:
+        assert file_.read() == expected
+
+
+def test_create_uml_since_no_repo(tmp_path):
+    """Test create --since REV outside of a git repository."""
+    copytree("./tests/sln", tmp_path / "sln")
+    args = ["--snapshot", str(tmp_path / "uml.snapshot"), "-o", str(tmp_path / "uml.gv")]
+    result = CliRunner().invoke(main, ["--since", "HEAD"] + args + [str(tmp_path / "sln")])
+    assert result.exit_code == 2
+    assert "Invalid value for --since: Can't list files changed since HEAD" in result.output
+
+
+def test_create_uml_pipe(fake_dot, tmp_path):  # pylint: disable=unused-argument
+    """Test create --pipe."""
+    runner = CliRunner()
+    result = runner.invoke(main, ["--pipe", "./tests/sln"])
+    assert "Missing option '-o'" in result.output
+    result = runner.invoke(main, ["--pipe", "-s", f"{tmp_path}/uml.svg", "./tests/sln"])
+    assert result.exit_code == 0
+    result = runner.invoke(
+        main, ["--pipe", "-o", f"{tmp_path}/uml.gv", "-s", f"{tmp_path}/tee.svg", "./tests/sln"]
+    )
+    assert result.exit_code == 0
+    with open(tmp_path / "uml.svg") as svg, open(tmp_path / "tee.svg") as tee:
+        assert svg.read() == tee.read()
+    with open(tmp_path / "uml.gv") as gv_, open(tmp_path / "tee.svg") as tee:
+        assert gv_.read() == tee.read()
+
+
+def test_create_uml_pipe_build_error(fake_dot, tmp_path, monkeypatch):
+    """Test that create --pipe stops dot when the build fails."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "NoNs.cs").write_text("public class NoNs {}\n")
+    pipes = []
+
+    def dot_pipe(output):
+        pipes.append(DotPipe(output))
+        return pipes[-1]
+
+    monkeypatch.setattr("umldotcs.cli.DotPipe", dot_pipe)
+    result = CliRunner().invoke(
+        main, ["--pipe", "-s", f"{tmp_path}/uml.svg", str(tmp_path / "src")]
+    )
+    assert isinstance(result.exception, RuntimeError)
+    assert pipes[0].process.poll() is not None
+    assert not (tmp_path / "uml.svg").exists()
+
+
+def test_create_uml_views(tmp_path):
+    """Test create --view and --views."""
+    config = tmp_path / "views.ini"
+    config.write_text(f"[names]\ngv = {tmp_path}/names.gv\nmembers = no\n")
+    runner = CliRunner()
+    result = runner.invoke(main, ["--view", "gv=x.gv;colour=red", "./tests/sln"])
+    assert "unknown options colour" in result.output
+    result = runner.invoke(
+        main,
+        [
+            "--views",
+            str(config),
+            "--view",
+            f"name=api;gv={tmp_path}/api.gv;access=public",
+            "--view",
+            f"name=nsp;gv={tmp_path}/{{namespace}}.gv",
+            "./tests/sln",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Rendering view nsp:Uml.Cs.Dll" in result.output
+    for name in ["names", "api", "Uml.Cs.App", "Uml.Cs.Dll"]:
+        assert (tmp_path / f"{name}.gv").read_text().startswith("digraph UML {")
+    assert "SubUmlCsDll" in (tmp_path / "names.gv").read_text()
+    assert "SubUmlCsDll" not in (tmp_path / "api.gv").read_text()
+
+
+def test_create_uml_min_access(tmp_path):
+    """Test create --min-access."""
+    runner = CliRunner()
+    result = runner.invoke(main, ["--min-access", "private", "-o", "x.gv", "./tests/sln"])
+    assert "Invalid value for '--min-access'" in result.output
+    result = runner.invoke(
+        main, ["--min-access", "public", "-o", f"{tmp_path}/uml.gv", "./tests/sln"]
+    )
+    assert result.exit_code == 0
+    assert "-Str : string" not in (tmp_path / "uml.gv").read_text()
+    assert "+IsValid() : bool" in (tmp_path / "uml.gv").read_text()
+
+
+def test_create_uml_generated(tmp_path):
+    """Test create --generated and --max-file-size."""
+    runner = CliRunner()
+    args = ["-o", f"{tmp_path}/uml.gv", "./tests/sln"]
+    result = runner.invoke(main, ["--generated", "skip", *args])
+    assert result.exit_code == 0
+    assert "Skipped" not in result.output
+    result = runner.invoke(main, ["--max-file-size", "100", *args])
+    assert result.exit_code == 0
+    assert "Skipped 5 out of scope, generated or oversized files" in result.output
+
+
+def test_create_uml_namespace(tmp_path):
+    """Test create --namespace."""
+    result = CliRunner().invoke(
+        main, ["--namespace", "-Uml.Cs.Dll", "-o", f"{tmp_path}/uml.gv", "./tests/sln"]
+    )
+    assert result.exit_code == 0
+    assert "Skipped 4 out of scope" in result.output
+    dot = (tmp_path / "uml.gv").read_text()
+    assert "cluster_Uml_Cs_App" in dot
+    assert "cluster_Uml_Cs_Dll" not in dot
+
+
+def test_create_uml_collapse(tmp_path):
+    """Test create --collapse."""
+    result = CliRunner().invoke(
+        main, ["--collapse", "Uml.Cs.*", "-o", f"{tmp_path}/uml.gv", "./tests/sln"]
+    )
+    assert result.exit_code == 0
+    dot = (tmp_path / "uml.gv").read_text()
+    assert '"Uml.Cs.App" [label = <<B>Uml.Cs.App</B><BR/>1 entities, 0 members>]' in dot
+    assert "TABLE" not in dot
+
+
+def test_create_uml_compact(tmp_path):
+    """Test create --compact."""
+    runner = CliRunner()
+    runner.invoke(main, ["-o", f"{tmp_path}/uml.gv", "./tests/sln"])
+    result = runner.invoke(main, ["--compact", "-o", f"{tmp_path}/compact.gv", "./tests/sln"])
+    assert result.exit_code == 0
+    dot, compact = (tmp_path / "uml.gv").read_text(), (tmp_path / "compact.gv").read_text()
+    assert len(compact) < len(dot)
+    assert "UmlCsDll->ICanBeImplemented[arrowhead=empty,style=dotted]" in compact
+    assert "    " not in compact
+
+
+def test_create_uml_archive(tmp_path):
+    """Test create with a tarball instead of a directory."""
+    archive = tmp_path / "sln.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add("tests/sln", "sln")
+    result = CliRunner().invoke(main, ["-o", f"{tmp_path}/uml.gv", str(archive)])
+    assert result.exit_code == 0
+    assert "Processing /sln/Uml.Cs.Dll/UmlEnum.cs" in result.output
+    CliRunner().invoke(main, ["-o", f"{tmp_path}/dir.gv", "./tests/sln"])
+    dot = (tmp_path / "uml.gv").read_text().splitlines()
+    assert sorted(dot) == sorted((tmp_path / "dir.gv").read_text().splitlines())
+
+
+def test_create_uml_rev(tmp_path):
+    """Test create --rev REV."""
+    copytree("./tests/sln", tmp_path / "sln")
+    repo, directory = str(tmp_path), str(tmp_path / "sln")
+    git(repo, "init", "--quiet")
+    git(repo, "add", ".")
+    git(repo, "-c", "user.name=Test", "-c", "user.email=test@example.com", "commit", "-qm", "init")
+    runner = CliRunner()
+    runner.invoke(main, ["-o", f"{repo}/head.gv", directory])
+    (tmp_path / "sln" / "Uml.Cs.Dll" / "UmlEnum.cs").unlink()
+    args = ["--snapshot", f"{repo}/uml.snapshot", "-o", f"{repo}/uml.gv", directory]
+    result = runner.invoke(main, ["--rev", "HEAD"] + args)
+    assert result.output.count("Processing") == 5
+    dot = (tmp_path / "uml.gv").read_text().splitlines()
+    assert sorted(dot) == sorted((tmp_path / "head.gv").read_text().splitlines())
+    result = runner.invoke(main, ["--rev", "HEAD"] + args)
+    assert "Processing" not in result.output
+    result = runner.invoke(main, ["--rev", "nope"] + args)
+    assert "Can't read revision nope" in result.output
+    result = runner.invoke(main, ["--rev", "HEAD", "--since", "HEAD"] + args)
+    assert "--since can't be combined with --rev" in result.output
+
+
+def test_create_uml_solution(tmp_path):
+    """Test create with a .sln file instead of a directory."""
+    result = CliRunner().invoke(
+        main, ["-j", "2", "-o", f"{tmp_path}/uml.gv", "./tests/sln/Uml.Cs.sln"]
+    )
+    assert result.exit_code == 0
+    assert "Processing /Uml.Cs.App/Program.cs" in result.output
+    assert result.output.count("Processing") == 5
+    result = CliRunner().invoke(main, ["--rev", "HEAD", "-o", "x.gv", "./tests/sln/Uml.Cs.sln"])
+    assert "--rev requires a directory" in result.output
+
+
+def test_batch(tmp_path):
+    """Test the batch command."""
+    manifest = tmp_path / "manifest.ini"
+    manifest.write_text(
+        f"[app]\nroot = ./tests/sln/Uml.Cs.App\ngv = {tmp_path}/app.gv\n\n"
+        f"[sln]\nroot = ./tests/sln/Uml.Cs.sln\ngv = {tmp_path}/sln.gv\n"
+    )
+    runner = CliRunner()
+    result = runner.invoke(main, ["batch", "-j", "1", str(manifest)])
+    assert result.exit_code == 0
+    assert "app: 1 files (1 parsed)" in result.output
+    assert "sln: 5 files (5 parsed)" in result.output
+    assert "2 of 2 diagrams rendered, 6 files" in result.output
+    (tmp_path / "nothing").mkdir()
+    manifest.write_text(f"[nothing]\nroot = {tmp_path}/nothing\ngv = {tmp_path}/nothing.gv\n")
+    result = runner.invoke(main, ["batch", str(manifest)])
+    assert result.exit_code == 1
+    assert "nothing: no code" in result.output
+    manifest.write_text("[nowhere]\nroot = .\n")
+    result = runner.invoke(main, ["batch", str(manifest)])
+    assert "Invalid value for MANIFEST" in result.output
+
+
+def test_diff(tmp_path):
+    """Test the diff command."""
+    copytree("./tests/sln", tmp_path / "sln")
+    runner = CliRunner()
+    args = ["diff", "-o", f"{tmp_path}/diff.gv", "./tests/sln", str(tmp_path / "sln")]
+    result = runner.invoke(main, args)
+    assert result.output == "0 added, 0 removed, 0 changed\n"
+    assert not (tmp_path / "diff.gv").exists()
+    (tmp_path / "sln" / "Uml.Cs.App" / "Program.cs").unlink()
+    result = runner.invoke(main, args)
+    assert result.output == "0 added, 1 removed, 0 changed\n"
+    assert "Program [" in (tmp_path / "diff.gv").read_text()
+    assert "UmlCsDll [" not in (tmp_path / "diff.gv").read_text()
+    result = runner.invoke(main, ["diff", "-o", "x.gv", f"{tmp_path}/nothing@HEAD", "./tests/sln"])
+    assert "Invalid value for OLD/NEW" in result.output
+
+
+def test_query(tmp_path):
+    """Test create --db and the query command."""
+    runner = CliRunner()
+    args = ["--db", f"{tmp_path}/uml.db", "-o", f"{tmp_path}/uml.gv", "./tests/sln"]
+    assert "Stored 5 changed files" in runner.invoke(main, args).output
+    assert "Stored 0 changed files" in runner.invoke(main, args).output
+    result = runner.invoke(main, ["query", f"{tmp_path}/uml.db", "subclasses", "UmlCsDll"])
+    assert result.output == (
+        "Uml.Cs.Dll.SubUmlCsDll (class) ./tests/sln/Uml.Cs.Dll/SubUmlCsDll.cs\n"
+    )
+    result = runner.invoke(main, ["query", f"{tmp_path}/uml.db", "returning", "string"])
+    assert "Uml.Cs.Dll.UmlCsDll.Str : string\n" in result.output
+    result = runner.invoke(main, ["query", f"{tmp_path}/uml.db", "implementors", "Nothing"])
+    assert (result.exit_code, result.output) == (1, "")
@@ -1,12 +1,14 @@
 """Test the Creator module."""
 
+import pickle
+from copy import copy
 from tempfile import NamedTemporaryFile
 
 import pytest
 
-from umldotcs.creator import UmlCreator
-from umldotcs.entities import IMPLEMENTS, UmlClass
-from umldotcs.features import Access, Modifier
+from umldotcs.creator import MAX_LINE, FragmentCache, UmlCreator, compact_relation
+from umldotcs.entities import COMPOSITES, EXTENDS, IMPLEMENTS, UmlClass
+from umldotcs.features import Access, Field, Method, Modifier
 
 
 def test_extract_attribute():
@@ -81,6 +83,52 @@ def test_process_file():
         assert lizt == [f"    Program -> IFoo {IMPLEMENTS}"]
 
 
+def test_process_line_long():
+    """Test UmlCreator.process_line() on lines longer than MAX_LINE."""
+    creator = UmlCreator("Klass.cs")
+    creator.nsp = "Foo"
+    klass = UmlClass(["Klass"])
+    params = ", ".join(f"int p{i} = {i}" for i in range(MAX_LINE))
+    assert creator.process_line(f"public void Do({params})", klass) is klass
+    assert creator.process_line(" " * MAX_LINE * 2, klass) is klass
+    assert klass.methods == [Method([], Access.PUBLIC, [], "", "Do(…)")]
+
+
+def test_process_line_long_head():
+    """Test UmlCreator.process_line() on long lines cut short before or after the return type."""
+    creator = UmlCreator("Klass.cs")
+    creator.nsp = "Foo"
+    klass = UmlClass(["Klass"])
+    func = "Func<" + ",".join(["int"] * MAX_LINE) + ">"
+    assert creator.process_line(f"public {func}", klass) is klass
+    assert creator.process_line("public " + "x" * MAX_LINE * 2, klass) is klass
+    assert creator.process_line("public List<int> " + "x" * MAX_LINE * 2, klass) is klass
+    assert klass.fields == [
+        Field([], Access.PUBLIC, [], "…", "…"),
+        Field([], Access.PUBLIC, [], "…", "…"),
+        Field([], Access.PUBLIC, [], "List<int>", "…"),
+    ]
+
+
+def test_process_lines_out_of_scope():
+    """Test that UmlCreator.process_lines() stops at a namespace out of scope."""
+    lines = iter(["using System;", "namespace Foo.Tests", "{", "    public class Bar", "    {"])
+    creator = UmlCreator("Bar.cs", namespaces=["Foo.*", "-Foo.Tests"])
+    assert creator.process_lines(lines) == (dict(), list())
+    assert next(lines) == "{"
+    creator = UmlCreator("Bar.cs", namespaces=["Foo.*", "-Foo.Tests"])
+    dikt, _ = creator.process_source("namespace Foo.Bar\n{\n    public class Bar\n    {\n")
+    assert list(dikt) == ["Foo.Bar"]
+
+
+def test_process_lines_without_members():
+    """Test that UmlCreator.process_lines() stops at the entity without members."""
+    lines = iter(["namespace Foo", "{", "    public class Bar", "    {", "        public int Baz;"])
+    dikt, _ = UmlCreator("Bar.cs", members=False).process_lines(lines)
+    assert dikt["Foo"][0].name == "Bar"
+    assert next(lines) == "    {"
+
+
 def test_tokenize():
     """Test UmlCreator.tokenize()."""
     lines_vs_tokens = [
@@ -126,3 +174,50 @@ def test_tokenize():
     ]
     for lvt in lines_vs_tokens:
         assert UmlCreator.tokenize(lvt[0]) == lvt[1]
+
+
+def test_fragment_cache():
+    """Test FragmentCache.fragment()."""
+    cache = FragmentCache(size=2)
+    klass = UmlClass(["Klass"])
+    other = UmlClass(["Other"])
+    fragment = cache.fragment("Foo.Bar", [klass, other])
+    assert fragment == UmlCreator.cluster_dot("Foo.Bar", [klass, other])
+    assert fragment.startswith("\n  subgraph cluster_Foo_Bar {")
+    assert cache.fragment("Foo.Bar", [klass, other]) is fragment
+    assert (cache.hits, cache.misses) == (1, 1)
+    changed = copy(klass)
+    changed.methods = [Method(None, Access.PUBLIC, [], "", "Do()")]
+    assert "+Do()" in cache.fragment("Foo.Bar", [changed, other])
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.fragment("Baz", [other])
+    assert len(cache.entries) == 2
+    lazarus = pickle.loads(pickle.dumps(cache))
+    assert lazarus.entries == cache.entries
+    assert lazarus.fragment("Baz", [other]) == cache.fragment("Baz", [other])
+
+
+def test_compact_relation():
+    """Test compact_relation()."""
+    assert compact_relation(f"    Klass -> Base {EXTENDS}") == "Klass->Base"
+    assert compact_relation(f"    Klass -> IFace {IMPLEMENTS}") == (
+        "Klass->IFace[arrowhead=empty,style=dotted]"
+    )
+    assert compact_relation(f"    Klass -> Part {COMPOSITES}") == "Klass->Part[arrowhead=diamond]"
+
+
+def test_iter_gv_compact():
+    """Test UmlCreator.iter_gv() with compact."""
+    klass = UmlClass(["Klass"])
+    cache = FragmentCache()
+    namespaces = {"Foo.Bar": [klass]}
+    relations = [f"    Klass -> Base {EXTENDS}"]
+    dot = "".join(UmlCreator.iter_gv("Label", "Font", namespaces, relations, compact=True))
+    assert dot.startswith('digraph UML{graph[fontname="Font SemiBold",fontsize=48]')
+    assert 'subgraph cluster_Foo_Bar{style=rounded;label="Foo.Bar";color=crimson\n' in dot
+    assert "\nKlass->Base\n}\n" in dot
+    assert "  " not in dot
+    cached = "".join(UmlCreator.iter_gv("Label", "Font", namespaces, relations, (), cache, True))
+    assert cached == dot
+    assert cache.fragment("Foo.Bar", [klass]) != cache.fragment("Foo.Bar", [klass], True)
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,120 @@
+"""Test the diff module."""
+
+from shutil import copytree
+
+import pytest
+
+from umldotcs.diff import ADDED, CHANGED, NEIGHBOUR, REMOVED, ModelDiff, load_model
+from umldotcs.entities import EXTENDS
+from umldotcs.model import Project
+from umldotcs.vcs import git
+
+
+@pytest.fixture(name="sln")
+def fixture_sln(tmp_path):
+    """Return a git repository with a committed copy of the test solution."""
+    copytree("./tests/sln", tmp_path / "sln")
+    repo = str(tmp_path)
+    git(repo, "init", "--quiet")
+    git(repo, "add", ".")
+    git(repo, "-c", "user.name=Test", "-c", "user.email=test@example.com", "commit", "-qm", "init")
+    return tmp_path / "sln"
+
+
+def test_load_model(sln, tmp_path):
+    """Test diff.load_model()."""
+    project = Project([str(sln)])
+    expected = sorted(ent.name for ent in project.build().entities())
+    project.save_snapshot(tmp_path / "uml.snapshot")
+    (sln / "Uml.Cs.App" / "Program.cs").unlink()
+    assert sorted(ent.name for ent in load_model(f"{sln}@HEAD").entities()) == expected
+    assert sorted(ent.name for ent in load_model(str(tmp_path / "uml.snapshot")).entities()) == (
+        expected
+    )
+    assert "Program" not in [ent.name for ent in load_model(str(sln)).entities()]
+    (tmp_path / "garbage").write_text("garbage")
+    with pytest.raises(ValueError, match="not a usable snapshot"):
+        load_model(str(tmp_path / "garbage"))
+
+
+def test_load_model_associations(tmp_path):
+    """Test that diff.load_model() resolves snapshots with associations too."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "Foo.cs").write_text(
+        "namespace Aa\n{\n    public class Foo\n    {\n    }\n}\n"
+    )
+    (tmp_path / "src" / "Bar.cs").write_text(
+        "namespace Aa\n{\n    public class Bar\n    {\n        public Foo Foo;\n    }\n}\n"
+    )
+    project = Project([str(tmp_path / "src")], associations=True)
+    model = project.build()
+    assert model.relations
+    project.save_snapshot(tmp_path / "uml.snapshot")
+    snapshot = load_model(str(tmp_path / "uml.snapshot"), associations=True)
+    assert snapshot.relations == model.relations
+    assert not ModelDiff(snapshot, load_model(str(tmp_path / "src"), associations=True))
+
+
+def test_model_diff(sln):
+    """Test ModelDiff."""
+    old = load_model(str(sln))
+    assert not ModelDiff(old, load_model(str(sln)))
+    (sln / "Uml.Cs.App" / "Program.cs").unlink()
+    enum = sln / "Uml.Cs.Dll" / "UmlEnum.cs"
+    enum.write_text(enum.read_text().replace("public enum", "internal enum"))
+    sub = sln / "Uml.Cs.Dll" / "SubUmlCsDll.cs"
+    sub.write_text(sub.read_text().replace("public static string Concat", "static string Concat"))
+    diff = ModelDiff(old, load_model(str(sln)))
+    assert diff.added == []
+    assert diff.removed == ["Uml.Cs.App.Program"]
+    assert sorted(diff.changed) == ["Uml.Cs.Dll.SubUmlCsDll", "Uml.Cs.Dll.UmlEnum"]
+    model = diff.to_model()
+    colors = {ent.name: (ent.color, ent.bgcolor) for ent in model.entities()}
+    assert colors == {
+        "Program": REMOVED,
+        "SubUmlCsDll": CHANGED,
+        "UmlEnum": CHANGED,
+        "UmlCsDll": NEIGHBOUR,
+    }
+    assert all(rel.split()[2] in colors for rel in model.relations)
+    assert "    SubUmlCsDll -> UmlCsDll" in "\n".join(model.relations)
+
+
+def test_model_diff_moved():
+    """Test ModelDiff with a class moved to another namespace and classes sharing a name."""
+    base = ("Base.cs", "namespace Core {\npublic class Base {\n}\n}")
+    other = ("Other.cs", "namespace Other {\npublic class Foo {\npublic int X;\n}\n}")
+    old = Project([base, other, ("Foo.cs", "namespace Old.Ns {\npublic class Foo : Base {\n}\n}")])
+    new = Project([base, other, ("Foo.cs", "namespace New.Ns {\npublic class Foo : Base {\n}\n}")])
+    diff = ModelDiff(old.build(), new.build())
+    assert diff.added == ["New.Ns.Foo"]
+    assert diff.removed == ["Old.Ns.Foo"]
+    assert diff.changed == []
+    model = diff.to_model()
+    colors = {
+        nsp: [(ent.name, ent.color) for ent in classes] for nsp, classes in model.namespaces.items()
+    }
+    assert colors == {
+        "New.Ns": [("Foo", ADDED[0])],
+        "Old.Ns": [("Foo", REMOVED[0])],
+        "Core": [("Base", NEIGHBOUR[0])],
+    }
+    assert model.relations == [f"    Foo -> Base {EXTENDS}"]
+
+
+def test_model_diff_same_names():
+    """Test ModelDiff with classes sharing a name in different namespaces."""
+    sources = [
+        ("Base.cs", "namespace Core {\npublic class Base {\n}\n}"),
+        ("A.cs", "namespace Aa {\npublic class Foo : Base {\n}\n}"),
+        ("B.cs", "namespace Bb {\npublic class Foo {\npublic int X;\n}\n}"),
+    ]
+    old = Project(sources).build()
+    sources[2] = ("B.cs", "namespace Bb {\npublic class Foo : Base {\npublic int X;\n}\n}")
+    diff = ModelDiff(old, Project(sources).build())
+    assert diff.changed == ["Bb.Foo"]
+    model = diff.to_model()
+    assert {nsp: [ent.name for ent in classes] for nsp, classes in model.namespaces.items()} == {
+        "Bb": ["Foo"],
+        "Core": ["Base"],
+    }
@@ -1,5 +1,7 @@
 """Test the entities."""
 
+from copy import copy
+
 import pytest
 
 from umldotcs.entities import (
@@ -200,6 +202,11 @@ def test_uml_entity_parse_tokens_for_methods():
             None,
             Method(None, Access.PUBLIC, [Modifier.STATIC], "string", "«Cast»(Klass)"),
         ),
+        (
+            "protected internal virtual void Do(int count = 1, bool all = false)",
+            None,
+            Method(None, Access.PROTECTEDINTERNAL, [Modifier.VIRTUAL], "", "Do(int, bool)"),
+        ),
     ]
     for lve in line_vs_expected:
         klass = UmlClass(["Klass"])
@@ -207,6 +214,47 @@ def test_uml_entity_parse_tokens_for_methods():
         assert klass.methods == [lve[2]]
 
 
+def test_uml_entity_parse_return_type():
+    """Test UmlEntity.parse_return_type(tokens, pos)."""
+    klass = UmlClass(["Klass"])
+    tokens = "public (int, string, bool) Do()".split()
+    assert klass.parse_return_type(tokens, 1) == ("(int, string, bool)", 4)
+    tokens = "public (int, string,".split()
+    assert klass.parse_return_type(tokens, 1) == ("(int, string,", 3)
+
+
+def test_uml_entity_parse_tokens_summarized():
+    """Test UmlEntity.parse_tokens(tokens, attrs, summarize=True)."""
+    klass = UmlClass(["Klass"])
+    klass.parse_tokens("public void Do(int a, int b,".split(), [], summarize=True)
+    klass.parse_tokens("public void Done(int a) => a".split(), [], summarize=True)
+    klass.parse_tokens("public int[] X = new[] { 1, 2,".split(), [], summarize=True)
+    klass.parse_tokens("public static (int, int,".split(), [], summarize=True)
+    klass.parse_tokens("public static implicit operator".split(), [], summarize=True)
+    klass.parse_tokens("public async".split(), [], summarize=True)
+    assert klass.methods == [
+        Method([], Access.PUBLIC, [], "", "Do(…)"),
+        Method([], Access.PUBLIC, [], "", "Done(int)"),
+    ]
+    assert klass.fields == [
+        Field([], Access.PUBLIC, [], "int[]", "X"),
+        Field([], Access.PUBLIC, [Modifier.STATIC], "…", "…"),
+        Field([], Access.PUBLIC, [Modifier.STATIC], "…", "…"),
+        Field([], Access.PUBLIC, [], "…", "…"),
+    ]
+
+
+def test_uml_entity_parse_signature():
+    """Test UmlEntity.parse_signature(tokens, pos, end)."""
+    tokens = "Do(string sql, Dictionary<string, int> map, bool prep = true) {".split()
+    assert UmlEntity.parse_signature(tokens, 0, len(tokens) - 1) == (
+        "Do(string, Dictionary<string, int>, bool)"
+    )
+    assert UmlEntity.parse_signature(tokens, 0, 2) == "Do(string,"
+    assert UmlEntity.parse_signature(["Id;"], 0, 1) == "Id"
+    assert UmlEntity.parse_signature(["Id"], 0, 0) == ""
+
+
 def test_uml_entity_relations_to_dot():
     """Test UmlEntity.relations_to_dot()."""
     klass = UmlClass(["Classy"])
@@ -258,6 +306,29 @@ def test_uml_entity_to_dot():
     )
 
 
+def test_uml_entity_to_dot_compact():
+    """Test UmlEntity.to_dot() with compact."""
+    klass = UmlClass(["Klass"])
+    klass.methods.append(Method(None, Access.PUBLIC, [], "int", "GetCount()"))
+    assert klass.to_dot(True) == (
+        'Klass[label=<<TABLE BGCOLOR="gray99" CELLBORDER="0" CELLSPACING="0">'
+        '<TR><TD PORT="name">Klass</TD></TR><HR/><TR><TD></TD></TR><HR/>'
+        '<TR><TD ALIGN="LEFT">+GetCount() : int</TD></TR></TABLE>>]\n'
+    )
+    klass.fields.append(Field(["XmlText"], Access.PUBLIC, [], "string", "Name"))
+    assert (
+        '<TR><TD ALIGN="LEFT">+Name : string</TD><TD ALIGN="RIGHT">[XmlText]</TD></TR><HR/>'
+        '<TR><TD ALIGN="LEFT" COLSPAN="2">+GetCount() : int</TD></TR>'
+    ) in klass.to_dot(True)
+
+    iface = UmlInterface(["IComparable"])
+    assert iface.to_dot(True) == (
+        'IComparable[color=darkolivegreen,label=<<TABLE BGCOLOR="darkolivegreen1" '
+        'CELLBORDER="0" CELLSPACING="0"><TR><TD PORT="name">«interface»<BR/>IComparable'
+        "</TD></TR></TABLE>>]\n"
+    )
+
+
 def test_uml_class_display_name():
     """Test UmlClass.display_name()."""
     klass = UmlClass(["Classy"])
@@ -282,3 +353,31 @@ def test_uml_interface_display_name():
     """Test UmlInterface.display_name()."""
     interface = UmlInterface(["ICanBeWhateverYouWant"])
     assert interface.display_name() == "«interface»<BR/>ICanBeWhateverYouWant"
+
+
+def test_uml_entity_parse_tokens_with_min_access():
+    """Test UmlEntity.parse_tokens(tokens, attr, min_access)."""
+    klass = UmlClass(["Klass"])
+    assert klass.parse_tokens("private int count;".split(), ["Attr"], Access.PROTECTED) == []
+    assert klass.parse_tokens("internal void Do()".split(), None, Access.PROTECTED) == []
+    klass.parse_tokens("protected void Undo()".split(), None, Access.PROTECTED)
+    klass.parse_tokens("public Guid Id { get; set; }".split(), None, Access.PROTECTED)
+    assert klass.fields == [Field(None, Access.PUBLIC, [], "Guid", "Id")]
+    assert klass.methods == [Method(None, Access.PROTECTED, [], "", "Undo()")]
+
+
+def test_uml_entity___init___with_constraints():
+    """Test UmlEntity.__init__() ignores generic constraints."""
+    entity = UmlClass(["Foo<T>", ":", "Base<T>", "where", "T", ":", "new()"])
+    assert entity.implements == ["Base_T_"]
+
+
+def test_uml_entity_fingerprint():
+    """Test UmlEntity.fingerprint()."""
+    klass = UmlClass(["Klass"], nsp="Foo")
+    assert klass.fingerprint() == UmlClass(["Klass"], nsp="Foo").fingerprint()
+    assert klass.fingerprint() != UmlClass(["Klass"], nsp="Bar").fingerprint()
+    assert klass.fingerprint() != UmlInterface(["Klass"], nsp="Foo").fingerprint()
+    clone = copy(klass)
+    clone.fields = [Field(None, Access.PUBLIC, [], "Guid", "Id")]
+    assert clone.fingerprint() != klass.fingerprint()
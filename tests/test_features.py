@@ -57,6 +57,16 @@ def test_parse_access():
     assert Access.parse_access(["public"] + tail) == (Access.PUBLIC, tail)
 
 
+def test_scan_access():
+    """Test Access.scan_access(tokens, pos)."""
+    tokens = ["static", "protected", "internal", "int", "Count"]
+    assert Access.scan_access(tokens) == (Access.INTERNAL, 0)
+    assert Access.scan_access(tokens, 1) == (Access.PROTECTEDINTERNAL, 3)
+    assert Access.scan_access(tokens, 2) == (Access.INTERNAL, 3)
+    assert Access.scan_access(["private"]) == (Access.PRIVATE, 1)
+    assert Access.scan_access([]) == (Access.INTERNAL, 0)
+
+
 def test_field_or_method_is_static():
     """Test FieldOrMethod.is_static()."""
     assert not Field(["XmlText"], Access.PUBLIC, None, "string", "Content").is_static()
@@ -242,3 +252,11 @@ def test_parse_modifiers():
         ],
         ["int", "RandInt()"],
     )
+
+
+def test_scan_modifiers():
+    """Test Modifier.scan_modifiers(tokens, pos)."""
+    tokens = ["public", "static", "readonly", "int", "Count"]
+    assert Modifier.scan_modifiers(tokens) == ([], 0)
+    assert Modifier.scan_modifiers(tokens, 1) == ([Modifier.STATIC, Modifier.READONLY], 3)
+    assert Modifier.scan_modifiers(["static"]) == ([Modifier.STATIC], 1)
@@ -0,0 +1,21 @@
+"""Test the graphviz module."""
+
+from umldotcs.graphviz import DotPipe
+
+
+def test_dot_pipe(fake_dot, tmp_path):  # pylint: disable=unused-argument
+    """Test DotPipe."""
+    output = tmp_path / "out.svg"
+    dot = DotPipe(str(output))
+    dot.write("digraph UML {\n")
+    dot.write("}\n")
+    assert dot.close() == 0
+    assert output.read_text() == "digraph UML {\n}\n"
+
+
+def test_dot_pipe_abort(fake_dot, tmp_path):  # pylint: disable=unused-argument
+    """Test DotPipe.abort()."""
+    output = tmp_path / "out.svg"
+    dot = DotPipe(str(output))
+    dot.abort()
+    assert not output.exists()
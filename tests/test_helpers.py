@@ -2,7 +2,14 @@
 
 import pytest
 
-from umldotcs.helpers import attrs_to_dot, clean_generics, encode_generics
+from umldotcs.helpers import (
+    attrs_to_dot,
+    clean_generics,
+    decode_generics,
+    encode_generics,
+    in_scope,
+    match_namespace,
+)
 
 
 def test_attrs_to_dot():
@@ -27,6 +34,13 @@ def test_clean_generics():
     assert clean_generics("IGeneric<Foo, Bar,Baz, Quux>") == "IGeneric_T_U_V_W_"
 
 
+def test_decode_generics():
+    """Test decode_generics()."""
+    assert decode_generics("Foo") == "Foo"
+    assert decode_generics("List&lt;List&lt;int&gt;&gt;") == "List<List<int>>"
+    assert decode_generics(encode_generics("IGeneric<Foo, Bar>")) == "IGeneric<Foo, Bar>"
+
+
 def test_encode_generics():
     """Test encode_generics()."""
     with pytest.raises(AttributeError):
@@ -40,3 +54,24 @@ def test_encode_generics():
     assert encode_generics("IGeneric<Foo, Bar, Baz>") == "IGeneric&lt;Foo, Bar, Baz&gt;"
     assert encode_generics("IGeneric<Foo, Bar, Baz, Quux>") == "IGeneric&lt;Foo, Bar, Baz, Quux&gt;"
     assert encode_generics("Klass(IFace<string, object>)") == "Klass(IFace&lt;string, object&gt;)"
+
+
+def test_in_scope():
+    """Test in_scope()."""
+    assert in_scope("Foo", [])
+    assert in_scope("Foo.Bar", ["Foo.*"])
+    assert not in_scope("Bar", ["Foo.*"])
+    assert not in_scope("Foo.Tests", ["Foo.*", "-Foo.Tests"])
+    assert in_scope("Bar", ["-Foo.*"])
+    assert not in_scope("Foo", ["-Foo.*"])
+
+
+def test_match_namespace():
+    """Test match_namespace()."""
+    assert not match_namespace("Foo", [])
+    assert match_namespace("Foo", ["Foo"])
+    assert match_namespace("Foo", ["Bar", "Foo.*"])
+    assert match_namespace("Foo.Bar.Baz", ["Foo.*"])
+    assert match_namespace("Foo.Bar", ["*.Bar"])
+    assert not match_namespace("FooBar", ["Foo.*"])
+    assert not match_namespace("Foo.Bar", ["Foo"])
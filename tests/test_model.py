@@ -0,0 +1,377 @@
+"""Test the model module."""
+
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from os import environ
+from os.path import join
+from subprocess import run  # nosec
+from tempfile import NamedTemporaryFile
+from zipfile import ZipFile
+
+from umldotcs.entities import COMPOSITES, IMPLEMENTS, UmlClass
+from umldotcs import model
+from umldotcs.features import Access
+from umldotcs.model import Model, Project
+
+SOURCE = """namespace Foo
+{
+    public class Program : IFoo
+    {
+        public static int Main(string[] args) { }
+    }
+}
+"""
+
+
+def test_model___bool__():
+    """Test Model.__bool__()."""
+    assert not Model()
+    assert Model({"Foo": [UmlClass(["Klass"])]})
+
+
+def test_model_merge():
+    """Test Model.merge()."""
+    model = Model()
+    nsp_inner = {"Inner.Space": [1, 2, 3]}
+    model.merge(nsp_inner, ["foo"])
+    assert model.namespaces == nsp_inner
+    assert model.relations == ["foo"]
+    nsp_outer1 = {"Outer.Space": [4, 5, 6]}
+    nsp_outer2 = {"Outer.Space": [7, 8, 9]}
+    model.merge(nsp_outer1, [])
+    model.merge(nsp_outer2, ["bar"])
+    nsp_merged = {"Inner.Space": [1, 2, 3], "Outer.Space": [4, 5, 6, 7, 8, 9]}
+    assert model.namespaces == nsp_merged
+    assert model.relations == ["foo", "bar"]
+    assert nsp_outer1 == {"Outer.Space": [4, 5, 6]}
+    assert list(model.entities()) == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+
+def test_model_to_dot():
+    """Test Model.to_dot()."""
+    dot = Project([("Program.cs", SOURCE)]).build().to_dot("Label", "Font")
+    assert dot.startswith("digraph UML {")
+    assert 'label    = "Label"' in dot
+    assert "subgraph cluster_Foo {" in dot
+    assert f"    Program -> IFoo {IMPLEMENTS}" in dot
+    assert "«interface»<BR/>IFoo" in dot
+    assert dot.endswith("\n}\n")
+
+
+def test_model_write_gv():
+    """Test Model.write_gv()."""
+    model = Project([("Program.cs", SOURCE)]).build()
+    with NamedTemporaryFile(mode="r", suffix=".gv") as tmp:
+        model.write_gv(tmp.name, "Label", "Font")
+        assert tmp.read() == model.to_dot("Label", "Font")
+
+
+def test_project_add():
+    """Test Project.add()."""
+    project = Project(["./tests/sln/Uml.Cs.App"])
+    project.add(("Foo.cs", SOURCE))
+    project.add("./tests/sln/Uml.Cs.Dll/UmlEnum.cs")
+    assert project.names() == [
+        "./tests/sln/Uml.Cs.App/Program.cs",
+        "Foo.cs",
+        "./tests/sln/Uml.Cs.Dll/UmlEnum.cs",
+    ]
+    assert len(project) == 3
+
+
+def test_project_add_archive(tmp_path):
+    """Test Project.add_archive()."""
+    archive = tmp_path / "foo.zip"
+    with ZipFile(archive, "w") as zip_:
+        zip_.writestr("src/Foo.cs", SOURCE)
+        zip_.writestr("src/Foo.txt", SOURCE)
+        zip_.writestr("src/Bar/Bar.cs", SOURCE.replace("Program", "Bar"))
+    project = Project([str(archive)])
+    assert [unit for unit, _, _ in project.units()] == [f"{archive}/src/Bar", f"{archive}/src"]
+    assert project.names() == [f"{archive}/src/Bar/Bar.cs", f"{archive}/src/Foo.cs"]
+    model = project.build()
+    assert [ent.name for ent in model.entities()] == ["Bar", "Program"]
+    assert project.build().stats["parsed"] == 0
+
+
+def test_project_build():
+    """Test Project.build()."""
+    seen = []
+    project = Project(["./tests/sln/"])
+    model = project.build(seen.append)
+    assert sorted(seen) == sorted(project.names())
+    assert sorted(model.namespaces) == ["Uml.Cs.App", "Uml.Cs.Dll"]
+    assert project.build() is not model
+
+
+def test_project_add_solution():
+    """Test Project.add_solution() and parsing projects in parallel."""
+    project = Project(["./tests/sln/Uml.Cs.sln"], jobs=2)
+    units = [unit for unit, _, _ in project.units()]
+    assert units == [join("./tests/sln", "Uml.Cs.Dll", "Uml.Cs.Dll.csproj")] * 4 + [
+        join("./tests/sln", "Uml.Cs.App", "Uml.Cs.App.csproj")
+    ]
+    seen = []
+    model = project.build(seen.append)
+    assert seen == project.names()
+    assert model.stats["parsed"] == 5
+    dot = model.to_dot("Label", "Font").splitlines()
+    serial = Project(["./tests/sln/"]).build().to_dot("Label", "Font").splitlines()
+    assert sorted(dot) == sorted(serial)
+    assert project.build().stats["parsed"] == 0
+
+
+def test_project_build_pending(tmp_path, monkeypatch):
+    """Test that a build waits for the oldest unit once PENDING units are in flight."""
+    for i in range(8):
+        (tmp_path / f"Space{i}").mkdir()
+        (tmp_path / f"Space{i}" / "Klass.cs").write_text(SOURCE.replace("Foo", f"Space{i}"))
+    monkeypatch.setattr(model, "PENDING", 2)
+    in_flight = []
+
+    class Pending(Future):
+        """A future that is only resolved when its result is requested."""
+
+        def __init__(self, func, *args, **kwargs):
+            super().__init__()
+            self.call = func, args, kwargs
+            in_flight.append(self)
+
+        def result(self, timeout=None):
+            if not self.done():
+                func, args, kwargs = self.call
+                self.set_result(func(*args, **kwargs))
+            return super().result(timeout)
+
+    class Executor:
+        """An executor that defers every call and checks how many are in flight."""
+
+        def submit(self, func, *args, **kwargs):
+            assert sum(not future.done() for future in in_flight) <= 2
+            return Pending(func, *args, **kwargs)
+
+    serial = Project([str(tmp_path)]).build().to_dot()
+    assert Project([str(tmp_path)], executor=Executor()).build().to_dot() == serial
+    assert len(in_flight) == 8
+
+
+def test_project_build_unit_size(tmp_path, monkeypatch):
+    """Test that the sources of a unit are sent to the pool UNIT_SIZE at a time."""
+    for i in range(5):
+        (tmp_path / f"Klass{i}.cs").write_text(SOURCE.replace("Program", f"Klass{i}"))
+    monkeypatch.setattr(model, "UNIT_SIZE", 2)
+    batches = []
+
+    class Executor(ThreadPoolExecutor):
+        """An executor which records the sources of each call."""
+
+        def submit(self, fn, /, *args, **kwargs):
+            batches.append(len(args[0]))
+            return super().submit(fn, *args, **kwargs)
+
+    with Executor() as pool:
+        assert len(list(Project([str(tmp_path)], executor=pool).build().entities())) == 5
+    assert batches == [2, 2, 1]
+
+
+def test_project_build_merge_order(tmp_path):
+    """Test that sources are merged in the order of discovery, however they are parsed."""
+    for i in range(12):
+        nsp = f"Space{i % 4}"
+        (tmp_path / nsp).mkdir(exist_ok=True)
+        (tmp_path / nsp / f"Klass{i}.cs").write_text(
+            SOURCE.replace("Foo", nsp).replace("Program", f"Klass{i}")
+        )
+    serial = Project([str(tmp_path)]).build().to_dot()
+    assert Project([str(tmp_path)], jobs=3).build().to_dot() == serial
+    assert Project([str(tmp_path)]).names()[:3] == [
+        join(str(tmp_path), "Space0", f"Klass{i}.cs") for i in [0, 4, 8]
+    ]
+
+
+def test_project_associations():
+    """Test that Project(associations=True) adds associations, also to filtered models."""
+    owner = SOURCE.replace("public static int Main(string[] args) { }", "public Part Main;")
+    part = SOURCE.replace("Program : IFoo", "Part")
+    project = Project([("Program.cs", owner), ("Part.cs", part)], associations=True)
+    model = project.build()
+    assert f"    Program -> Part {COMPOSITES}" in model.relations
+    assert f"    Program -> Part {COMPOSITES}" in model.filter(Access.PUBLIC).relations
+    project.associations = False
+    assert f"    Program -> Part {COMPOSITES}" not in project.build().relations
+
+
+def test_project_build_is_isolated():
+    """Test that models built from different projects and threads do not share state."""
+    project1 = Project([("Program.cs", SOURCE)])
+    project2 = Project([("Other.cs", SOURCE.replace("Foo", "Bar"))])
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        models = list(pool.map(lambda p: p.build(), [project1, project2] * 4))
+    for model in models[::2]:
+        assert list(model.namespaces) == ["Foo"]
+        assert len(model.relations) == 1
+    for model in models[1::2]:
+        assert list(model.namespaces) == ["Bar"]
+
+
+def test_project_build_deduplicates(tmp_path):
+    """Test that Project.build() parses identical sources only once."""
+    for name in ["One", "Two", "Three"]:
+        (tmp_path / f"{name}.cs").write_text(SOURCE)
+    (tmp_path / "Other.cs").write_text(SOURCE.replace("Foo", "Bar"))
+    seen = []
+    project = Project([str(tmp_path), ("Four.cs", SOURCE)])
+    model = project.build(seen.append)
+    assert len(seen) == 2
+    assert str(tmp_path / "Other.cs") in seen
+    assert model.stats["files"] == 5
+    assert model.stats["parsed"] == 2
+    assert model.stats["duplicates"] == 3
+    assert model.stats["saved"] > 0
+    assert len(model.namespaces["Foo"]) == 1
+    assert len(model.namespaces["Bar"]) == 1
+    assert len(model.relations) == 2
+
+
+def test_project_generated(tmp_path):
+    """Test Project.build() with each policy for generated code."""
+    (tmp_path / "Program.cs").write_text(SOURCE)
+    (tmp_path / "Program.Designer.cs").write_text(SOURCE.replace("Foo", "Bar"))
+    (tmp_path / "Tool.cs").write_text("// <auto-generated/>\n" + SOURCE.replace("Foo", "Baz"))
+    model = Project([str(tmp_path)]).build()
+    assert sorted(model.namespaces) == ["Bar", "Baz", "Foo"]
+    assert model.stats["skipped"] == 0
+    seen = []
+    model = Project([str(tmp_path)], generated="skip").build(seen.append)
+    assert list(model.namespaces) == ["Foo"]
+    assert seen == [str(tmp_path / "Program.cs")]
+    assert model.stats["skipped"] == 2
+    assert model.stats["skipped_bytes"] == len(SOURCE) * 2 + len("// <auto-generated/>\n")
+    model = Project([str(tmp_path)], generated="summarize").build()
+    assert sorted(model.namespaces) == ["Bar", "Baz", "Foo"]
+    assert model.namespaces["Foo"][0].methods
+    assert not model.namespaces["Bar"][0].methods
+    assert model.stats["skipped"] == 0
+
+
+def test_project_generated_duplicates():
+    """Test that generated code and an identical source don't share their results."""
+    project = Project([("Foo.Designer.cs", SOURCE), ("Foo.cs", SOURCE)], generated="skip")
+    model = project.build()
+    assert model.stats["skipped"] == 1
+    assert model.stats["duplicates"] == 0
+    assert len(model.namespaces["Foo"]) == 1
+
+
+def test_project_max_file_size(tmp_path):
+    """Test Project.build() with max_file_size."""
+    project = Project([("Foo.cs", SOURCE), ("Big.cs", SOURCE + " " * 100)], max_file_size=200)
+    model = project.build()
+    assert model.stats["skipped"] == 1
+    assert model.stats["skipped_bytes"] == len(SOURCE) + 100
+    assert len(model.namespaces["Foo"]) == 1
+    assert project.options()["max_file_size"] == 200
+
+
+def test_project_namespaces(tmp_path):
+    """Test Project.build() with namespace patterns."""
+    (tmp_path / "Foo.cs").write_text(SOURCE)
+    (tmp_path / "Bar.cs").write_text(SOURCE.replace("Foo", "Foo.Bar"))
+    (tmp_path / "Baz.cs").write_text(SOURCE.replace("Foo", "Baz"))
+    model = Project([str(tmp_path)], namespaces=["Foo.*", "-Foo.Bar"]).build()
+    assert list(model.namespaces) == ["Foo"]
+    assert model.stats["skipped"] == 2
+    model = Project([str(tmp_path)], namespaces=["-Foo"], jobs=2).build()
+    assert sorted(model.namespaces) == ["Baz", "Foo.Bar"]
+
+
+def test_project_digest(tmp_path):
+    """Test Project.digest()."""
+    (tmp_path / "Foo.cs").write_text(SOURCE)
+    assert Project.digest(str(tmp_path / "Foo.cs")) == Project.digest("Bar.cs", SOURCE)
+    assert Project.digest(str(tmp_path / "Foo.cs")) != Project.digest("Bar.cs", "")
+    assert Project.digest(str(tmp_path)) is None
+
+
+def test_project_snapshot(tmp_path):
+    """Test Project.save_snapshot() and Project.load_snapshot()."""
+    (tmp_path / "Foo.cs").write_text(SOURCE)
+    (tmp_path / "Bar.cs").write_text(SOURCE.replace("Foo", "Bar"))
+    snapshot = str(tmp_path / "uml.snapshot")
+    assert not Project().load_snapshot(snapshot)
+    project = Project([str(tmp_path)])
+    expected = project.build().to_dot()
+    project.save_snapshot(snapshot)
+    assert not Project([str(tmp_path)], "https://example.com").load_snapshot(snapshot)
+
+    seen = []
+    project = Project([str(tmp_path)])
+    assert project.load_snapshot(snapshot)
+    assert project.build(seen.append).to_dot() == expected
+    assert seen == []
+
+    seen = []
+    (tmp_path / "Bar.cs").write_text(SOURCE.replace("Foo", "Baz"))
+    project = Project([str(tmp_path)])
+    assert project.load_snapshot(snapshot, changed=set())
+    assert project.build(seen.append).to_dot() == expected
+    assert project.load_snapshot(snapshot, changed={str(tmp_path / "Bar.cs")})
+    assert "cluster_Baz" in project.build(seen.append).to_dot()
+    assert seen == [str(tmp_path / "Bar.cs")]
+
+
+def test_project_stamp():
+    """Test that Project.stamp() of a string is the same in every process."""
+    code = "from umldotcs.model import Project; print(Project.stamp('Foo.cs', 'class Foo'))"
+    stamps = {
+        run(  # nosec
+            [sys.executable, "-c", code],
+            env=dict(environ, PYTHONHASHSEED=seed),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        for seed in ["1", "2"]
+    }
+    assert stamps == {f"{Project.stamp('Foo.cs', 'class Foo')}\n"}
+
+
+def test_model_filter():
+    """Test Model.filter()."""
+    model = Project(["./tests/sln/"]).build()
+    names = model.filter(namespaces=["Uml.Cs.App"], members=False)
+    assert [ent.name for ent in names.entities()] == ["Program"]
+    assert not any(ent.methods or ent.fields for ent in names.entities())
+    public = model.filter(Access.PUBLIC)
+    assert sorted(ent.name for ent in public.entities()) == [
+        "ICanBeImplemented",
+        "Program",
+        "UmlCsDll",
+        "UmlEnum",
+    ]
+    assert sorted(public.relations) == sorted(
+        rel for rel in model.relations if not rel.startswith("    SubUmlCsDll")
+    )
+    unfiltered = model.filter()
+    assert list(unfiltered.entities()) == list(model.entities())
+    assert sorted(unfiltered.relations) == sorted(model.relations)
+
+
+def test_project_min_access():
+    """Test Project(min_access=...)."""
+    model = Project(["./tests/sln/"], min_access=Access.PUBLIC).build()
+    assert all(m.access is Access.PUBLIC for ent in model.entities() for m in ent.methods)
+    assert all(f.access is Access.PUBLIC for ent in model.entities() for f in ent.fields)
+    assert len(list(model.entities())) == 5
+
+
+def test_project_build_reuses_fragments(tmp_path):
+    """Test that Project.build() only renders namespaces whose entities changed."""
+    (tmp_path / "Foo.cs").write_text(SOURCE)
+    (tmp_path / "Bar.cs").write_text(SOURCE.replace("Foo", "Bar"))
+    project = Project([str(tmp_path)])
+    project.build().to_dot()
+    assert (project.fragments.hits, project.fragments.misses) == (0, 2)
+    (tmp_path / "Bar.cs").write_text(SOURCE.replace("Foo", "Bar").replace("int", "long"))
+    assert "+Main(string[]) : long" in project.build().to_dot()
+    assert (project.fragments.hits, project.fragments.misses) == (1, 3)
@@ -0,0 +1,137 @@
+"""Test the msbuild module."""
+
+import os
+from os.path import join
+
+from umldotcs import msbuild
+from umldotcs.msbuild import (
+    compile_items,
+    is_project_file,
+    pattern_regex,
+    project_files,
+    solution_projects,
+)
+
+SDK_PROJECT = """<Project Sdk="Microsoft.NET.Sdk">
+  <ItemGroup>
+    <Compile Remove="Generated/**" />
+    <Compile Include="../Shared/*.cs" Exclude="../Shared/Skip.cs" />
+  </ItemGroup>
+</Project>
+"""
+
+OLD_PROJECT = """<?xml version="1.0" encoding="utf-8"?>
+<Project ToolsVersion="15.0" xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <Compile Include="Program.cs" />
+    <Compile Include="Sub\\*.cs" />
+    <Compile Include="$(Generated)\\Foo.cs" />
+  </ItemGroup>
+</Project>
+"""
+
+
+def touch(*paths):
+    """Create empty files, and their directories."""
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+
+def test_is_project_file():
+    """Test msbuild.is_project_file()."""
+    assert is_project_file("Foo.sln")
+    assert is_project_file("foo/Foo.CSPROJ")
+    assert not is_project_file("foo/Foo.cs")
+
+
+def test_pattern_regex():
+    """Test msbuild.pattern_regex()."""
+    assert pattern_regex("**/*.cs").match("Foo.cs")
+    assert pattern_regex("**/*.cs").match("a/b/Foo.cs")
+    assert pattern_regex("bin\\**").match("bin/Debug/Foo.cs")
+    assert not pattern_regex("*.cs").match("a/Foo.cs")
+    assert pattern_regex("Fo?.cs").match("Foo.cs")
+    assert not pattern_regex("Foo.cs").match("FooXcs")
+
+
+def test_solution_projects():
+    """Test msbuild.solution_projects()."""
+    assert solution_projects("./tests/sln/Uml.Cs.sln") == [
+        join("./tests/sln", "Uml.Cs.Dll", "Uml.Cs.Dll.csproj"),
+        join("./tests/sln", "Uml.Cs.App", "Uml.Cs.App.csproj"),
+    ]
+
+
+def test_compile_items_sdk(tmp_path):
+    """Test msbuild.compile_items() on an SDK-style project."""
+    directory = tmp_path / "App"
+    touch(
+        directory / "Program.cs",
+        directory / "Sub" / "Foo.cs",
+        directory / "Generated" / "Bar.cs",
+        directory / "bin" / "Foo.cs",
+        directory / "obj" / "Foo.cs",
+        directory / ".vs" / "Foo.cs",
+        directory / "Readme.md",
+        tmp_path / "Shared" / "Util.cs",
+        tmp_path / "Shared" / "Skip.cs",
+    )
+    (directory / "App.csproj").write_text(SDK_PROJECT)
+    assert compile_items(str(directory / "App.csproj")) == [
+        join(directory, "Program.cs"),
+        join(directory, "Sub/Foo.cs"),
+        join(directory, "../Shared/Util.cs"),
+    ]
+
+
+def test_compile_items_recursive_outside(tmp_path, monkeypatch):
+    """Test msbuild.compile_items() with ** outside of the project, and pruning its walk."""
+    directory = tmp_path / "App"
+    touch(
+        directory / "Program.cs",
+        directory / "obj" / "Debug" / "Foo.cs",
+        directory / ".git" / "Foo.cs",
+        tmp_path / "Shared" / "A.cs",
+        tmp_path / "Shared" / "Deep" / "B.cs",
+        tmp_path / "Shared" / "Deep" / "Er" / "C.cs",
+    )
+    (directory / "App.csproj").write_text(
+        '<Project Sdk="Microsoft.NET.Sdk">\n'
+        '  <ItemGroup><Compile Include="../Shared/**/*.cs" /></ItemGroup>\n'
+        "</Project>\n"
+    )
+    walked = []
+
+    def walk(top):
+        for path, dirs, names in os.walk(top):
+            walked.append(path)
+            yield path, dirs, names
+
+    monkeypatch.setattr(msbuild, "walk", walk)
+    assert compile_items(str(directory / "App.csproj")) == [
+        join(directory, "Program.cs"),
+        join(directory, "../Shared/A.cs"),
+        join(directory, "../Shared/Deep/B.cs"),
+        join(directory, "../Shared/Deep/Er/C.cs"),
+    ]
+    assert walked == [str(directory)]
+
+
+def test_compile_items_explicit(tmp_path):
+    """Test msbuild.compile_items() on an old-style project with explicit items only."""
+    touch(tmp_path / "Program.cs", tmp_path / "Sub" / "Foo.cs", tmp_path / "Other.cs")
+    (tmp_path / "App.csproj").write_text(OLD_PROJECT)
+    assert compile_items(str(tmp_path / "App.csproj")) == [
+        join(tmp_path, "Program.cs"),
+        join(tmp_path, "Sub/Foo.cs"),
+    ]
+
+
+def test_project_files():
+    """Test msbuild.project_files()."""
+    projects = dict(project_files("./tests/sln/Uml.Cs.sln"))
+    assert projects[join("./tests/sln", "Uml.Cs.App", "Uml.Cs.App.csproj")] == [
+        join("./tests/sln", "Uml.Cs.App", "Program.cs")
+    ]
+    assert len(projects[join("./tests/sln", "Uml.Cs.Dll", "Uml.Cs.Dll.csproj")]) == 4
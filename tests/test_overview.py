@@ -0,0 +1,61 @@
+"""Test the overview module."""
+
+from umldotcs.model import Project
+from umldotcs.overview import Overview, collapse_depth, group_of
+
+SOURCES = [
+    ("A.cs", "namespace Co.Web.Api {\npublic class A : B, IC {\npublic int X;\n}\n}"),
+    ("B.cs", "namespace Co.Web {\npublic class B : IC {\npublic void Y() { }\n}\n}"),
+    ("IC.cs", "namespace Co.Core.Contracts {\npublic interface IC {\n}\n}"),
+    ("D.cs", "namespace Co.Core {\npublic class D : IC, IDisposable {\n}\n}"),
+]
+
+
+def test_collapse_depth():
+    """Test collapse_depth()."""
+    assert collapse_depth(2) == 2
+    assert collapse_depth("3") == 3
+    assert collapse_depth("Company.Product.*") == 3
+
+
+def test_group_of():
+    """Test group_of()."""
+    assert group_of("Co.Web.Api", 2) == "Co.Web"
+    assert group_of("Co", 2) == "Co"
+
+
+def test_overview():
+    """Test Overview."""
+    overview = Project(SOURCES).build().collapse(2)
+    assert isinstance(overview, Overview)
+    assert overview.entities == {"Co.Web": 2, "Co.Core": 2}
+    assert overview.members == {"Co.Web": 2, "Co.Core": 0}
+    assert overview.edges == {("Co.Web", "Co.Core"): 2}
+    assert not Project().build().collapse(2)
+
+
+def test_overview_to_dot():
+    """Test Overview.to_dot()."""
+    dot = Project(SOURCES).build().collapse(1).to_dot("Overview", "Font")
+    assert dot.startswith("digraph UML {")
+    assert '  "Co" [label = <<B>Co</B><BR/>4 entities, 2 members>]\n' in dot
+    assert "->" not in dot
+    dot = Project(SOURCES).build().collapse(3).to_dot()
+    assert '"Co.Web.Api" -> "Co.Web" [label = "1", weight = 1, penwidth = 1.00]' in dot
+    assert '"Co.Web" -> "Co.Core.Contracts" [label = "1", weight = 1, penwidth = 1.00]' in dot
+
+
+def test_overview_resolved_edges():
+    """Test Overview with qualified bases, associations and repeated short names."""
+    sources = [
+        ("Foo.cs", "namespace Co.Aa.Inner {\npublic class Foo : Co.Bb.Bar {\n}\n}"),
+        ("Bar.cs", "namespace Co.Bb {\npublic class Bar {\npublic Co.Cc.Baz Other;\n}\n}"),
+        ("Baz.cs", "namespace Co.Cc {\npublic class Baz {\n}\n}"),
+        ("Other.cs", "namespace Co.Dd {\npublic class Baz {\n}\n}"),
+    ]
+    project = Project(sources)
+    assert project.build().collapse(2).edges == {("Co.Aa", "Co.Bb"): 1}
+    project.associations = True
+    overview = project.build().collapse(2)
+    assert overview.entities == {"Co.Aa": 1, "Co.Bb": 1, "Co.Cc": 1, "Co.Dd": 1}
+    assert overview.edges == {("Co.Aa", "Co.Bb"): 1, ("Co.Bb", "Co.Cc"): 1}
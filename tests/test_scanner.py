@@ -0,0 +1,111 @@
+"""Test the scanner module."""
+
+from contextlib import nullcontext
+from glob import glob
+
+import pytest
+
+from umldotcs import scanner
+from umldotcs.model import parse_source
+
+pytest.importorskip("numpy")
+
+MEMBERS = """namespace Foo
+{
+    [Serializable]
+    public class Bar : IBaz
+    {
+        // public int Commented;
+        public int Field;
+        internal\tstring Tabbed { get; set; }
+        publicity = 3;
+        protected internal void Do(int a)
+        {
+            var x = a;
+        }
+    }
+}"""
+
+
+def summary(result):
+    """Return a comparable summary of a parse result."""
+    namespaces, relations = result
+    entities = {
+        nsp: [(repr(ent), ent.attrs, ent.fields, ent.methods) for ent in classes]
+        for nsp, classes in namespaces.items()
+    }
+    return entities, relations
+
+
+def test_candidates():
+    """Test scanner.candidates()."""
+    buf = b"namespace A\n\n  public int B;\npublicity\n\t[Attr]\n internal\x0bC\n\xc2\xa0x\n"
+    starts, ends, found = scanner.candidates(buf)
+    assert starts == [0, 12, 13, 29, 39, 47, 59]
+    assert ends == [11, 12, 28, 38, 46, 58, 62]
+    assert found == [2, 4, 5, 6]
+
+
+def test_read(tmp_path):
+    """Test scanner.read()."""
+    assert scanner.read("A.cs", "a\r\nb\rc\n") == (b"a\nb\nc\n", "utf-8")
+    assert scanner.read("A.cs", "a b") is None
+    assert scanner.read("A.cs", "\ud800") is None
+    assert scanner.read(str(tmp_path), None) is None
+    path = tmp_path / "A.cs"
+    path.write_bytes(b"a\r\nb")
+    assert scanner.read(str(path), None)[0] == b"a\nb"
+
+
+def test_parse_sources():
+    """Test scanner.parse_sources() gives the same results as parse_source()."""
+    sources = [(path, None) for path in sorted(glob("tests/sln/**/*.cs", recursive=True))]
+    sources += [
+        ("Bar.cs", MEMBERS),
+        ("Crlf.cs", MEMBERS.replace("\n", "\r\n")),
+        ("Breaks.cs", MEMBERS.replace("\n", "\x0c\n", 1)),
+    ]
+    results = scanner.parse_sources(sources)
+    assert len(results) == len(sources)
+    for (name, source), (result, elapsed) in zip(sources, results):
+        assert summary(result) == summary(parse_source(name, source))
+        assert elapsed >= 0
+
+
+def test_parse_sources_namespaces():
+    """Test scanner.parse_sources() leaves out sources with a namespace out of scope."""
+    sources = [("Bar.cs", MEMBERS), ("Baz.cs", MEMBERS.replace("Foo", "Foo.Tests"))]
+    results = scanner.parse_sources(sources, namespaces=["Foo.*", "-Foo.Tests"])
+    assert [list(result[0]) for result, _ in results] == [["Foo"], []]
+
+
+def test_parse_sources_namespaces_not_read(tmp_path, monkeypatch):
+    """Test scanner.parse_sources() reads out of scope files only up to their namespace."""
+    path = tmp_path / "Baz.cs"
+    path.write_text(MEMBERS.replace("Foo", "Foo.Tests"))
+    lines, read = [], []
+
+    def counting_lines(name, mode):
+        with open(name, mode) as file_:  # pylint: disable=unspecified-encoding
+            for line in file_:
+                lines.append(line)
+                yield line
+
+    def counting_open(name, mode):
+        return nullcontext(counting_lines(name, mode))
+
+    monkeypatch.setattr(scanner, "open", counting_open, raising=False)
+    monkeypatch.setattr(scanner, "read", lambda *src: read.append(src) or None)
+    sources = [("Bar.cs", MEMBERS), (str(path), None)]
+    results = scanner.parse_sources(sources, namespaces=["Foo.*", "-Foo.Tests"])
+    assert [list(result[0]) for result, _ in results] == [["Foo"], []]
+    assert lines == ["namespace Foo.Tests\n"]
+    assert read == [("Bar.cs", MEMBERS)]
+
+
+def test_parse_sources_errors():
+    """Test scanner.parse_sources() raises the errors of parse_source()."""
+    with pytest.raises(RuntimeError, match="No namespace"):
+        scanner.parse_sources([("A.cs", "class A {}")])
+    with pytest.raises(RuntimeError, match="No class"):
+        scanner.parse_sources([("A.cs", "namespace Foo {\n")])
@@ -0,0 +1,84 @@
+"""Test the server module."""
+
+import json
+from shutil import copytree
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from umldotcs.server import Metrics, RenderService, make_server
+
+
+@pytest.fixture(name="server")
+def fixture_server(tmp_path):
+    """Serve a copy of the test solution from a background thread."""
+    copytree("./tests/sln", tmp_path / "sln")
+    server = make_server(RenderService({"sln": str(tmp_path / "sln")}), port=0)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path):
+    """GET a path from the server and return the body."""
+    with urlopen(f"http://127.0.0.1:{server.server_port}{path}") as response:  # nosec
+        return response.read()
+
+
+def test_metrics():
+    """Test Metrics."""
+    metrics = Metrics()
+    metrics.count("hits")
+    metrics.count("hits", 2)
+    metrics.time("request", 0.5)
+    metrics.time("request", 1.5)
+    assert metrics.as_dict() == dict(
+        counters=dict(hits=3),
+        latencies=dict(request=dict(count=2, avg_ms=1000.0, max_ms=1500.0)),
+    )
+
+
+def test_render_service_render(tmp_path):
+    """Test RenderService.render() re-parses only changed files."""
+    copytree("./tests/sln", tmp_path / "sln")
+    service = RenderService({"sln": str(tmp_path / "sln")}, label="Label")
+    first = service.render("sln", "gv")
+    assert b'label    = "Label"' in first
+    assert service.render("sln", "gv") is first
+    assert service.model("sln") is service.model("sln")
+    with open(tmp_path / "sln" / "Uml.Cs.Dll" / "UmlEnum.cs", "a") as file_:
+        file_.write("\n")
+    assert service.render("sln", "gv") == first
+    counters = service.metrics.as_dict()["counters"]
+    assert counters["files.parsed"] == 6
+    assert counters["files.reused"] == 19
+    assert counters["cache.hits"] == 1
+    assert counters["cache.misses"] == 2
+
+
+def test_render_handler(server):
+    """Test the HTTP endpoints."""
+    assert json.loads(get(server, "/")) == ["sln"]
+    assert get(server, "/sln.gv?label=Check").startswith(b"digraph UML {")
+    assert b'label    = "Check"' in get(server, "/sln.gv?label=Check")
+    for path in ["/nope.gv", "/sln.pdf", "/sln"]:
+        with pytest.raises(HTTPError, match="404"):
+            get(server, path)
+    with pytest.raises(HTTPError, match="400"):
+        get(server, "/sln.gv?label=x%22%5D%3B%20evil%20%5B")
+    metrics = json.loads(get(server, "/metrics"))
+    assert metrics["counters"]["cache.hits"] == 1
+    assert metrics["latencies"]["request"]["count"] == 7
+
+
+def test_render_handler_parse_error(server, tmp_path):
+    """Test that sources which can't be parsed give a 500 with the error."""
+    (tmp_path / "sln" / "NoNs.cs").write_text("public class NoNs {}\n")
+    with pytest.raises(HTTPError, match="500") as error:
+        get(server, "/sln.gv")
+    assert b"No namespace found in" in error.value.read()
+    assert json.loads(get(server, "/")) == ["sln"]
@@ -0,0 +1,131 @@
+"""Test the sources module."""
+
+import tarfile
+from io import BytesIO
+from threading import Event
+from zipfile import ZipFile
+
+import pytest
+
+from umldotcs.sources import (
+    decode,
+    is_archive,
+    is_generated,
+    iter_archive,
+    iter_files,
+    prefetch,
+)
+
+FILES = [
+    "Uml.Cs.App/Program.cs",
+    "Uml.Cs.Dll/ICanBeImplemented.cs",
+    "Uml.Cs.Dll/SubUmlCsDll.cs",
+    "Uml.Cs.Dll/UmlCsDll.cs",
+    "Uml.Cs.Dll/UmlEnum.cs",
+]
+
+
+def make_zip(path):
+    """Zip the test solution, including files which should be excluded."""
+    with ZipFile(path, "w") as archive:
+        archive.write("tests/sln", "sln")
+        for name in FILES + ["Uml.Cs.Dll.Test/UmlCsDllTest.cs", "Uml.Cs.App/App.csproj"]:
+            archive.writestr(f"sln/{name}", "namespace Foo { class Bar { } }")
+        archive.writestr("sln/Uml.Cs.Dll/obj/Debug/netcoreapp2.1/UmlCsDll.cs", "")
+    return path
+
+
+def test_is_archive():
+    """Test sources.is_archive()."""
+    for path in ["a.zip", "b.NUPKG", "c.tar", "d.tar.gz", "e.tgz", "f.tar.xz"]:
+        assert is_archive(path)
+    for path in ["tests/sln", "a.cs", "a.gz", "zip"]:
+        assert not is_archive(path)
+
+
+def test_is_generated():
+    """Test sources.is_generated()."""
+    for path in [
+        "src/Form1.Designer.cs",
+        "obj/Views.g.cs",
+        "obj/App.g.i.cs",
+        "src/Api.generated.cs",
+        "src/Migrations/20240101120000_Initial.cs",
+        "src/Migrations/ShopContextModelSnapshot.cs",
+    ]:
+        assert is_generated(path)
+    assert is_generated("src/Foo.cs", "// <auto-generated>\n//   by a tool\n")
+    assert is_generated("src/Foo.cs", '[System.CodeDom.Compiler.GeneratedCode("xsd", "4.0")]')
+    for path in ["src/Designer.cs", "src/Migrations/Helper.cs", "src/Log.cs"]:
+        assert not is_generated(path, "namespace Foo\n{\n    // generated by hand\n")
+
+
+def test_iter_archive_zip(tmp_path):
+    """Test sources.iter_archive() on a zip file."""
+    path = make_zip(str(tmp_path / "sln.nupkg"))
+    names = [name for name, _ in iter_archive(path)]
+    assert names == [f"{path}/sln/{name}" for name in FILES]
+
+
+def test_iter_archive_tar(tmp_path):
+    """Test sources.iter_archive() on a gzipped tarball."""
+    path = str(tmp_path / "sln.tar.gz")
+    with tarfile.open(path, "w:gz") as archive:
+        archive.add("tests/sln", "sln")
+    sources = dict(iter_archive(path))
+    assert list(sources) == [f"{path}/sln/{name}" for name in FILES]
+    with open("tests/sln/Uml.Cs.Dll/UmlEnum.cs") as file_:
+        assert sources[f"{path}/sln/Uml.Cs.Dll/UmlEnum.cs"] == file_.read()
+
+
+def test_iter_archive_tar_stored_order(tmp_path):
+    """Test that sources.iter_archive() streams a tarball in the order it was archived in."""
+    path = str(tmp_path / "rev.tar.gz")
+    with tarfile.open(path, "w:gz") as archive:
+        for name in ["C.cs", "B.cs", "A.cs"]:
+            data = f"namespace Foo {{ class {name[0]} {{ }} }}".encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, BytesIO(data))
+    sources = list(iter_archive(path))
+    assert [name for name, _ in sources] == [f"{path}/{name}" for name in ["C.cs", "B.cs", "A.cs"]]
+    assert sources[2][1] == "namespace Foo { class A { } }"
+
+
+def test_decode():
+    """Test sources.decode()."""
+    assert decode(b"\xef\xbb\xbfnamespace Foo\r\n{\r}") == "﻿namespace Foo\n{\n}"
+
+
+def test_iter_files(tmp_path):
+    """Test sources.iter_files()."""
+    for name in ["b/B.cs", "a/A.cs", "a/c/C.cs", "Z.cs", ".hidden/H.cs", "a/.H.cs", "a/A.txt"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    files = [path[len(str(tmp_path)) + 1 :] for path in iter_files(str(tmp_path))]
+    assert files == ["Z.cs", "a/A.cs", "a/c/C.cs", "b/B.cs"]
+    assert [path[len("tests/sln/") :] for path in iter_files("tests/sln")] == FILES
+
+
+def test_prefetch():
+    """Test sources.prefetch()."""
+    assert list(prefetch(range(100), 3)) == list(range(100))
+
+    produced = []
+    release = Event()
+
+    def produce():
+        for i in range(10):
+            produced.append(i)
+            yield i
+        release.wait(1)
+        raise ValueError("broken")
+
+    items = prefetch(produce(), 2)
+    assert next(items) == 0
+    # The producer is held back by the bounded queue
+    assert len(produced) <= 4
+    release.set()
+    assert list(zip(range(9), items)) == list(zip(range(9), range(1, 10)))
+    with pytest.raises(ValueError, match="broken"):
+        next(items)
@@ -0,0 +1,106 @@
+"""Test the store module."""
+
+from umldotcs.features import Access
+from umldotcs.model import Project
+from umldotcs.store import ModelStore
+
+BASE = "namespace Foo\n{\n    public abstract class Base : IThing\n    {\n    }\n}\n"
+DERIVED = """namespace Foo.Bar
+{
+    public class Derived : Base
+    {
+        public List<string> Names { get; set; }
+        public IThing Find(string name)
+    }
+}
+"""
+THING = "namespace Foo\n{\n    public interface IThing\n    {\n    }\n}\n"
+
+
+def test_model_store_update(tmp_path):
+    """Test ModelStore.update()."""
+    project = Project([("Base.cs", BASE), ("Derived.cs", DERIVED), ("IThing.cs", THING)])
+    project.build()
+    with ModelStore(tmp_path / "uml.db") as store:
+        assert store.update(project.results(), project.options()) == (3, 0)
+        assert store.update(project.results(), project.options()) == (0, 0)
+    project = Project([("Base.cs", BASE), ("Derived.cs", DERIVED.replace("Base", "Other"))])
+    project.build()
+    with ModelStore(tmp_path / "uml.db") as store:
+        assert store.update(project.results(), project.options()) == (1, 1)
+        assert store.subclasses("Base") == []
+        assert store.subclasses("Other") == [("Foo.Bar", "Derived", "class", "Derived.cs")]
+        assert store.in_namespace("Foo") == [("Foo", "Base", "class", "Base.cs")]
+        options = dict(project.options(), min_access=Access.PUBLIC)
+        assert store.update(project.results(), options) == (2, 0)
+
+
+def test_model_store_queries(tmp_path):
+    """Test ModelStore.derived(), implementors(), subclasses() and returning()."""
+    project = Project([("Base.cs", BASE), ("Derived.cs", DERIVED), ("IThing.cs", THING)])
+    project.build()
+    with ModelStore(tmp_path / "uml.db") as store:
+        store.update(project.results())
+        base = ("Foo", "Base", "class", "Base.cs")
+        derived = ("Foo.Bar", "Derived", "class", "Derived.cs")
+        assert store.implementors("IThing") == [base]
+        assert store.implementors("IThing", recursive=True) == [base, derived]
+        assert store.subclasses("Base") == [derived]
+        assert store.subclasses("IThing") == []
+        assert store.derived("IThing", recursive=True) == [base, derived]
+        assert store.returning("IThing") == [
+            ("Foo.Bar", "Derived", "method", "Find(string)", "IThing")
+        ]
+        assert store.returning("List<*>") == [
+            ("Foo.Bar", "Derived", "field", "Names", "List<string>")
+        ]
+        assert store.returning("int") == []
+
+
+def test_model_store_resolved_relations(tmp_path):
+    """Test that ModelStore relations are resolved like those of the diagram."""
+    sources = [
+        ("Identity.cs", "namespace Aa\n{\n    public class Identity\n    {\n    }\n}\n"),
+        ("User.cs", "namespace Aa\n{\n    public class User : Identity, Named\n    {\n    }\n}\n"),
+        ("Named.cs", "namespace Bb\n{\n    public interface Named\n    {\n    }\n}\n"),
+    ]
+    project = Project(sources)
+    model = project.build()
+    assert "User -> Identity [arrowhead = normal, style = solid]" in model.to_dot()
+    with ModelStore(tmp_path / "uml.db") as store:
+        store.update(project.results())
+        user = ("Aa", "User", "class", "User.cs")
+        assert store.subclasses("Identity") == [user]
+        assert store.subclasses("Aa.Identity") == [user]
+        assert store.implementors("Identity") == []
+        assert store.implementors("Named") == [user]
+        assert store.implementors("Bb.Named") == [user]
+        assert store.implementors("Aa.Named") == []
+
+
+def test_model_store_incremental_relations(tmp_path):
+    """Test that ModelStore.update() resolves again only the relations a change affects."""
+    user = "namespace Aa\n{\n    public class User : Identity\n    {\n    }\n}\n"
+    other = "namespace Cc\n{\n    public class Other : Base\n    {\n    }\n}\n"
+    identity = "namespace Aa\n{\n    public class Identity\n    {\n    }\n}\n"
+    with ModelStore(tmp_path / "uml.db") as store:
+        project = Project([("User.cs", user), ("Other.cs", other)])
+        project.build()
+        store.update(project.results())
+        assert store.subclasses("Aa.Identity") == []
+        rows = "SELECT rowid, file, target FROM relations ORDER BY file"
+        before = store.connection.execute(rows).fetchall()
+        project = Project([("User.cs", user), ("Other.cs", other), ("Identity.cs", identity)])
+        project.build()
+        assert store.update(project.results()) == (1, 0)
+        assert store.subclasses("Aa.Identity") == [("Aa", "User", "class", "User.cs")]
+        after = store.connection.execute(rows).fetchall()
+        assert after[0] == before[0] == (after[0][0], "Other.cs", "Base")
+        assert after[1][1:] == ("User.cs", "Aa.Identity")
+        queries = []
+        store.connection.set_trace_callback(queries.append)
+        store.subclasses("Base", recursive=True)
+        store.connection.set_trace_callback(None)
+        plan = store.connection.execute(f"EXPLAIN QUERY PLAN {queries[-1]}").fetchall()
+        assert "USING INDEX relations_target_name" in str(plan)
+        assert "SCAN relations" not in str(plan)
@@ -0,0 +1,112 @@
+"""Test the symbols module."""
+
+from umldotcs.entities import (
+    AGGREGATES,
+    COMPOSITES,
+    EXTENDS,
+    HAS_A,
+    IMPLEMENTS,
+    UmlClass,
+    UmlInterface,
+)
+from umldotcs.features import Access, Field, Method, Modifier
+from umldotcs.symbols import SymbolTable, looks_like_interface, type_refs
+
+
+def test_looks_like_interface():
+    """Test looks_like_interface()."""
+    assert looks_like_interface("IFoo")
+    assert not looks_like_interface("Image")
+    assert not looks_like_interface("I")
+
+
+def test_type_refs():
+    """Test type_refs()."""
+    assert type_refs("Foo") == (("Foo", COMPOSITES),)
+    assert type_refs("Foo?") == (("Foo", COMPOSITES),)
+    assert type_refs("Co.Foo[]") == (("Co.Foo", AGGREGATES),)
+    assert type_refs("List&lt;Foo&gt;") == (("List", COMPOSITES), ("Foo", AGGREGATES))
+    assert type_refs("Lazy<Foo>") == (("Lazy", COMPOSITES), ("Foo", HAS_A))
+    assert type_refs("Lazy<Foo>[]") == (("Lazy", AGGREGATES), ("Foo", HAS_A))
+    assert type_refs("Dictionary&lt;string, Lazy&lt;Foo&gt;&gt;, Bar") == (
+        ("Dictionary", COMPOSITES),
+        ("string", AGGREGATES),
+        ("Lazy", AGGREGATES),
+        ("Foo", AGGREGATES),
+        ("Bar", COMPOSITES),
+    )
+
+
+def test_symbol_table_add():
+    """Test SymbolTable.add() merges partial declarations."""
+    part1 = UmlClass(["Klass", ":", "IOne"], nsp="Foo", modifiers=[Modifier.PARTIAL])
+    part1.fields.append(Field(None, Access.PUBLIC, [], "int", "Count"))
+    part2 = UmlClass(["Klass", ":", "IOne,", "ITwo"], nsp="Foo", modifiers=[Modifier.PARTIAL])
+    part2.methods.append(Method(None, Access.PUBLIC, [], "", "Do()"))
+    other = UmlClass(["Klass"], nsp="Bar")
+    table = SymbolTable()
+    assert table.add(part1) is part1
+    merged = table.add(part2)
+    assert table.add(other) is other
+    assert merged is not part1
+    assert merged.fields == part1.fields
+    assert merged.methods == part2.methods
+    assert merged.implements == ["IOne", "ITwo"]
+    assert part1.methods == []
+    assert table.add(UmlClass(["Klass"], nsp="Bar")) is other
+    assert len(table) == 2
+    assert table.partials == 1
+    assert table.namespaces() == {"Foo": [merged], "Bar": [other]}
+
+
+def test_symbol_table_resolve():
+    """Test SymbolTable.resolve()."""
+    table = SymbolTable()
+    near = table.add(UmlClass(["Base"], nsp="Co.Web.Models"))
+    far = table.add(UmlClass(["Base"], nsp="Co.Core"))
+    iface = table.add(UmlInterface(["IThing"], nsp="Co.Core"))
+    assert table.resolve("IThing", "Anywhere") is iface
+    assert table.resolve("Base", "Co.Web.Models.Sub") is near
+    assert table.resolve("Base", "Co.Core.Sub") is far
+    assert table.resolve("Co.Core.Base", "Co.Web.Models") is far
+    assert table.resolve("Unknown", "Co") is None
+
+
+def test_symbol_table_relations():
+    """Test SymbolTable.relations()."""
+    table = SymbolTable()
+    table.add(UmlClass(["Klass", ":", "Base,", "IThing,", "IDisposable,", "Exception"], nsp="Co"))
+    table.add(UmlClass(["Base"], nsp="Co"))
+    table.add(UmlInterface(["IThing"], nsp="Co"))
+    table.add(UmlInterface(["IExternal", ":", "System.IDisposable"], nsp="Co"))
+    assert table.relations() == [
+        f"    Klass -> Base {EXTENDS}",
+        f"    Klass -> IThing {IMPLEMENTS}",
+        f"    Klass -> IDisposable {IMPLEMENTS}",
+        f"    Klass -> Exception {EXTENDS}",
+        f"    IExternal -> IDisposable {IMPLEMENTS}",
+    ]
+    assert sorted(table.stubs) == ["Exception", "IDisposable"]
+    assert isinstance(table.stubs["IDisposable"], UmlInterface)
+    assert table.stubs["Exception"].color == "gray50"
+
+
+def test_symbol_table_associations():
+    """Test SymbolTable.associations()."""
+    table = SymbolTable()
+    klass = table.add(UmlClass(["Klass", ":", "Base"], nsp="Co"))
+    klass.fields.append(Field(None, Access.PUBLIC, [], "List&lt;Part&gt;", "Parts"))
+    klass.fields.append(Field(None, Access.PRIVATE, [], "Part", "_main"))
+    klass.fields.append(Field(None, Access.PRIVATE, [], "Gen&lt;int&gt;[]", "_gens"))
+    klass.fields.append(Field(None, Access.PRIVATE, [], "Base", "_parent"))
+    klass.fields.append(Field(None, Access.PRIVATE, [], "Klass", "_next"))
+    klass.methods.append(Method(None, Access.PUBLIC, [], "Task&lt;Tool&gt;", "Use(Other, int)"))
+    klass.methods.append(Method(None, Access.PUBLIC, [], "", "Take(ref Part)"))
+    for name in ["Base", "Part", "Gen<T>", "Tool", "Other"]:
+        table.add(UmlClass([name], nsp="Co"))
+    assert table.associations() == [
+        f"    Klass -> Part {COMPOSITES}",
+        f"    Klass -> Gen_T_ {AGGREGATES}",
+        f"    Klass -> Tool {HAS_A}",
+        f"    Klass -> Other {HAS_A}",
+    ]
@@ -0,0 +1,109 @@
+"""Test the vcs module."""
+
+from os.path import join, normpath
+from shutil import copytree
+
+import pytest
+
+from umldotcs.model import Project
+from umldotcs.vcs import CatFile, Revision, changed_files, git
+
+
+@pytest.fixture(name="repo")
+def fixture_repo(tmp_path):
+    """Return a git repository with a committed copy of the test solution."""
+    copytree("./tests/sln", tmp_path / "sln")
+    repo = str(tmp_path)
+    git(repo, "init", "--quiet")
+    git(repo, "add", ".")
+    git(repo, "-c", "user.name=Test", "-c", "user.email=test@example.com", "commit", "-qm", "init")
+    return repo
+
+
+def test_changed_files(repo):
+    """Test vcs.changed_files()."""
+    directory = join(repo, "sln")
+    assert not changed_files(directory, "HEAD")
+    with open(join(directory, "Uml.Cs.Dll", "UmlEnum.cs"), "a") as file_:
+        file_.write("\n")
+    with open(join(directory, "Uml.Cs.Dll", "New.cs"), "w") as file_:
+        file_.write("namespace New {}\n")
+    with open(join(directory, "Uml.Cs.Dll", "New.txt"), "w") as file_:
+        file_.write("namespace New {}\n")
+    git(repo, "rm", "--quiet", join("sln", "Uml.Cs.App", "Program.cs"))
+    assert changed_files(directory, "HEAD") == {
+        normpath(join(directory, "Uml.Cs.Dll", "UmlEnum.cs")),
+        normpath(join(directory, "Uml.Cs.Dll", "New.cs")),
+        normpath(join(directory, "Uml.Cs.App", "Program.cs")),
+    }
+
+
+def test_git_quoted_paths(repo):
+    """Test vcs.changed_files() and Revision.sources() with paths git would quote."""
+    directory = join(repo, "sln")
+    name = join(directory, 'Ünïcode "quoted".cs')
+    with open(name, "w") as file_:
+        file_.write("namespace Quoted { public class Quoted { } }\n")
+    assert changed_files(directory, "HEAD") == {name}
+    git(repo, "add", ".")
+    git(repo, "-c", "user.name=Test", "-c", "user.email=test@example.com", "commit", "-qm", "add")
+    with open(name, "a") as file_:
+        file_.write("\n")
+    assert changed_files(directory, "HEAD") == {name}
+    revision = Revision(directory, "HEAD")
+    assert name in dict(revision.sources())
+    revision.close()
+
+
+def test_cat_file_read(repo):
+    """Test CatFile.read()."""
+    cat_file = CatFile(repo)
+    sha = git(repo, "rev-parse", "HEAD:sln/Uml.Cs.Dll/UmlEnum.cs")[0]
+    with open(join(repo, "sln", "Uml.Cs.Dll", "UmlEnum.cs"), "rb") as file_:
+        expected = file_.read()
+    assert cat_file.read(sha) == expected
+    assert cat_file.read(sha) == expected
+    with pytest.raises(KeyError):
+        cat_file.read("0" * 40)
+    cat_file.close()
+    assert cat_file.process is None
+
+
+def test_revision_sources(repo):
+    """Test Revision.sources()."""
+    directory = join(repo, "sln")
+    with open(join(directory, "Uml.Cs.Dll", "UmlEnum.cs"), "w") as file_:
+        file_.write("namespace Changed {}\n")
+    revision = Revision(directory, "HEAD")
+    sources = dict(revision.sources())
+    assert sorted(sources) == sorted(
+        join(directory, path)
+        for path in [
+            "Uml.Cs.App/Program.cs",
+            "Uml.Cs.Dll/ICanBeImplemented.cs",
+            "Uml.Cs.Dll/SubUmlCsDll.cs",
+            "Uml.Cs.Dll/UmlCsDll.cs",
+            "Uml.Cs.Dll/UmlEnum.cs",
+        ]
+    )
+    assert "public enum UmlEnum" in sources[join(directory, "Uml.Cs.Dll/UmlEnum.cs")].read()
+    revision.close()
+
+
+def test_project_add_revision(repo):
+    """Test Project.add_revision() with parse results keyed by blob SHA."""
+    directory = join(repo, "sln")
+    project = Project()
+    project.add_revision(directory, "HEAD")
+    assert {unit for unit, _, _ in project.units()} == {
+        join(directory, "Uml.Cs.App"),
+        join(directory, "Uml.Cs.Dll"),
+    }
+    model = project.build()
+    assert model.stats["parsed"] == 5
+    assert project.build().stats["parsed"] == 0
+    assert project.build().version == model.version
+    project.close()
+    assert sorted(ent.name for ent in model.entities()) == sorted(
+        ent.name for ent in Project([directory]).build().entities()
+    )
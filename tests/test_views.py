@@ -0,0 +1,80 @@
+"""Test the views module."""
+
+import pytest
+
+from umldotcs.features import Access
+from umldotcs.model import Project
+from umldotcs.views import View
+
+
+def test_view___init__():
+    """Test View.__init__()."""
+    with pytest.raises(ValueError, match="neither a gv nor an svg"):
+        View("nowhere")
+
+
+def test_view___repr__():
+    """Test View.__repr__()."""
+    view = View("api", "api.gv", access=Access.PUBLIC, namespaces=["Foo.*"], members=False)
+    lazarus = eval(repr(view))  # pylint: disable=eval-used
+    assert lazarus == view
+
+
+def test_view_parse():
+    """Test View.parse()."""
+    assert View.parse("name=api;gv=api.gv;svg=api.svg;access=public;namespaces=A.*,B") == View(
+        "api", "api.gv", "api.svg", access=Access.PUBLIC, namespaces=["A.*", "B"]
+    )
+    assert View.parse("svg=all.svg;members=no;label=Overview") == View(
+        "view", None, "all.svg", label="Overview", members=False
+    )
+    with pytest.raises(ValueError, match="members must be yes or no"):
+        View.parse("gv=x.gv;members=maybe")
+    with pytest.raises(ValueError, match="unknown options colour"):
+        View.parse("gv=x.gv;colour=red")
+    with pytest.raises(ValueError):
+        View.parse("gv=x.gv;access=secret")
+
+
+def test_view_read_config(tmp_path):
+    """Test View.read_config()."""
+    config = tmp_path / "views.ini"
+    config.write_text(
+        "[full]\ngv = full.gv\n\n"
+        "[api]\nsvg = api.svg\naccess = public\nnamespaces = Uml.Cs.Dll Uml.Cs.App\n"
+    )
+    assert View.read_config(str(config)) == [
+        View("full", "full.gv"),
+        View("api", None, "api.svg", access=Access.PUBLIC, namespaces=["Uml.Cs.Dll", "Uml.Cs.App"]),
+    ]
+
+
+def test_view_expand():
+    """Test View.expand()."""
+    model = Project(["./tests/sln/"]).build()
+    view = View("full", "full.gv")
+    assert view.expand(model) == [view]
+    view = View("nsp", "{namespace}.gv", namespaces=["Uml.*"], members=False)
+    assert sorted(view.expand(model), key=lambda v: v.name) == [
+        View("nsp:Uml.Cs.App", "Uml.Cs.App.gv", None, "Uml.Cs.App", None, ["Uml.Cs.App"], False),
+        View("nsp:Uml.Cs.Dll", "Uml.Cs.Dll.gv", None, "Uml.Cs.Dll", None, ["Uml.Cs.Dll"], False),
+    ]
+
+
+def test_view_apply():
+    """Test View.apply()."""
+    model = Project(["./tests/sln/"]).build()
+    api = View("api", "api.gv", access=Access.PUBLIC, namespaces=["Uml.Cs.Dll"]).apply(model)
+    assert list(api.namespaces) == ["Uml.Cs.Dll"]
+    assert "SubUmlCsDll" not in [ent.name for ent in api.entities()]
+    assert all(m.access is Access.PUBLIC for ent in api.entities() for m in ent.methods)
+    assert len(list(model.entities())) == 5
+    assert any(m.access is not Access.PUBLIC for ent in model.entities() for m in ent.methods)
+
+
+def test_view_apply_collapse():
+    """Test View.apply() with collapse."""
+    model = Project(["./tests/sln/"]).build()
+    view = View.parse("gv=x.gv;collapse=Uml.*")
+    assert view.collapse == 2
+    assert view.apply(model).entities == {"Uml.Cs": 5}
@@ -0,0 +1,3 @@
+"""UML class diagram generator for C# code."""
+
+from umldotcs.model import Model, Project
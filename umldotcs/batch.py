@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Batch mode: rendering the diagrams of many source roots in one process."""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from configparser import ConfigParser
+from os.path import join
+from subprocess import CalledProcessError, run  # nosec
+from threading import BoundedSemaphore
+from time import perf_counter
+
+from umldotcs.model import Project
+
+
+class Entry:
+    """A source root in a batch manifest plus the paths to render its diagram to."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self, name, root, output_gv=None, output_svg=None, label=None, font=None, repo_url=None
+    ):
+        if not output_gv and not output_svg:
+            raise ValueError(f"Entry {name} has neither a gv nor an svg output")
+        self.name = name
+        self.root = root
+        self.output_gv = output_gv
+        self.output_svg = output_svg
+        self.label = label
+        self.font = font
+        self.repo_url = repo_url
+
+    def __eq__(self, other):
+        return isinstance(other, Entry) and vars(self) == vars(other)
+
+    def __repr__(self):
+        kwargs = ", ".join(f"{key}={val!r}" for key, val in vars(self).items())
+        return f"Entry({kwargs})"
+
+    @classmethod
+    def from_dict(cls, name, options):
+        """Create an entry from a dictionary of string options, with gv and svg as outputs."""
+        options = dict(options)
+        if "root" not in options:
+            raise ValueError(f"Entry {name} has no root")
+        unknown = options.keys() - {"root", "gv", "svg", "label", "font", "repo_url"}
+        if unknown:
+            raise ValueError(f"Entry {name}: unknown options {', '.join(sorted(unknown))}")
+        return cls(
+            name,
+            options["root"],
+            options.get("gv"),
+            options.get("svg"),
+            label=options.get("label"),
+            font=options.get("font"),
+            repo_url=options.get("repo_url"),
+        )
+
+    @classmethod
+    def read_manifest(cls, path):
+        """Read entries from an INI file with one section per source root."""
+        config = ConfigParser(interpolation=None)
+        with open(path) as file_:
+            config.read_file(file_)
+        return [cls.from_dict(name, config[name]) for name in config.sections()]
+
+
+class Batch:
+    """Build and render many entries with one pool of parser processes.
+
+    Diagrams are rendered in a pool of max_dot threads, so at most max_dot dot
+    processes run at a time, while the next entries are being parsed. Building waits
+    while max_dot models are being rendered, so that models don't pile up. With a
+    cache_dir, each entry's parse results are kept in a snapshot for the next run."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self, font="Bahnschrift", label="UML Diagram", jobs=None, max_dot=2, cache_dir=None
+    ):
+        self.font = font
+        self.label = label
+        self.jobs = jobs
+        self.max_dot = max_dot
+        self.cache_dir = cache_dir
+
+    def run(self, entries, report=None):
+        """Build and render all entries, calling report(stats) as each one is done.
+
+        Return a list of stats dictionaries, in the order of entries. The stats of
+        an entry which failed have an error message."""
+        slots = BoundedSemaphore(self.max_dot)
+
+        def submit(*args):
+            slots.acquire()  # pylint: disable=consider-using-with
+            future = dot_pool.submit(*args)
+            future.add_done_callback(lambda _: slots.release())
+            return future
+
+        with ProcessPoolExecutor(self.jobs) as pool, ThreadPoolExecutor(self.max_dot) as dot_pool:
+            futures = []
+            for entry in entries:
+                stats = dict(name=entry.name, files=0, parsed=0, parse=0.0, render=0.0)
+                try:
+                    model = self.build(entry, pool, stats)
+                except (OSError, RuntimeError, ValueError) as ex:
+                    futures.append(submit(self.fail, stats, ex, report))
+                else:
+                    futures.append(submit(self.render, entry, model, stats, report))
+                    del model
+            return [future.result() for future in futures]
+
+    def build(self, entry, pool, stats):
+        """Build the model of an entry, parsing in pool, and record its parse stats."""
+        start = perf_counter()
+        project = Project([entry.root], entry.repo_url, executor=pool)
+        snapshot = self.cache_dir and join(self.cache_dir, f"{entry.name}.snapshot")
+        if snapshot:
+            project.load_snapshot(snapshot)
+        model = project.build()
+        if snapshot:
+            project.save_snapshot(snapshot)
+        stats.update(files=model.stats["files"], parsed=model.stats["parsed"])
+        stats["parse"] = perf_counter() - start
+        return model
+
+    def render(self, entry, model, stats, report=None):
+        """Render the diagram of an entry and record its render stats."""
+        start = perf_counter()
+        label, font = entry.label or self.label, entry.font or self.font
+        try:
+            if not model:
+                raise ValueError("no code")
+            if entry.output_gv:
+                model.write_gv(entry.output_gv, label, font)
+            if entry.output_svg and entry.output_gv:
+                run(["dot", "-Tsvg", "-o", entry.output_svg, entry.output_gv], check=True)
+            elif entry.output_svg:
+                dot = model.to_dot(label, font).encode()
+                run(["dot", "-Tsvg", "-o", entry.output_svg], input=dot, check=True)
+        except (CalledProcessError, OSError, ValueError) as ex:
+            return self.fail(stats, ex, report)
+        stats["render"] = perf_counter() - start
+        stats["rate"] = stats["files"] / (stats["parse"] + stats["render"] or 1)
+        if report:
+            report(stats)
+        return stats
+
+    @staticmethod
+    def fail(stats, error, report=None):
+        """Record the error of a failed entry."""
+        stats["error"] = str(error) or type(error).__name__
+        if report:
+            report(stats)
+        return stats
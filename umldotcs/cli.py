@@ -1,51 +1,231 @@
 # -*- coding: utf-8 -*-
 """CLI entrypoint."""
 
-from glob import glob
-from os.path import join
-from re import search
+from concurrent.futures import ThreadPoolExecutor
+from configparser import Error as ConfigParserError
+from os import makedirs
+from os.path import basename, dirname, normpath
 from subprocess import CalledProcessError, run  # nosec
+from time import perf_counter
 
 import click
 
-from umldotcs.creator import UmlCreator
+from umldotcs.batch import Batch, Entry
+from umldotcs.diff import ModelDiff, load_model
+from umldotcs.features import Access
+from umldotcs.graphviz import DotPipe
+from umldotcs.model import Project
+from umldotcs.msbuild import is_project_file
+from umldotcs.overview import collapse_depth
+from umldotcs.server import RenderService, make_server
+from umldotcs.sources import exclude, glob_files, is_archive  # pylint: disable=unused-import
+from umldotcs.store import ModelStore
+from umldotcs.vcs import changed_files
+from umldotcs.views import View
+
+
+class DefaultGroup(click.Group):
+    """A command group which falls back to a default command if none is given."""
+
+    def __init__(self, *args, default=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default = default
+
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args.insert(0, self.default)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup, default="create")
+def main():
+    """UML class diagram generator for C# code."""
 
-NAMESPACES = dict()
-RELATIONS = list()
 
 # TODO: add option for exclusions
-@click.command()
+@main.command("create")
 @click.argument("directory")
 @click.option("-f", "--font", default="Bahnschrift")
 @click.option("-l", "--label", default="UML Diagram")
-@click.option("-o", "--output-gv", required=True)
+@click.option("-o", "--output-gv")
 @click.option("-s", "--output-svg")
 @click.option("-u", "--repo-url")
-def create_uml(directory, font, label, output_gv, output_svg, repo_url):
-    """Process all .cs files in directory and its sub-directories."""
-    files = glob_files(directory)
-    for file_path in files:
-        click.echo(f"Processing {click.format_filename(file_path)[len(directory):]}")
-        nsp, rel = UmlCreator(file_path, repo_url).process_file()
-        zip_namespaces(nsp)
-        zip_relations(rel)
-    write_output(font, label, output_gv, output_svg)
+@click.option(
+    "--min-access",
+    type=click.Choice(["public", "protected", "internal"]),
+    help="Skip members with a lower access level while parsing.",
+)
+@click.option(
+    "--generated",
+    type=click.Choice(["include", "skip", "summarize"]),
+    default="include",
+    show_default=True,
+    help="Parse generated code, leave it out or parse it without members.",
+)
+@click.option("--max-file-size", type=int, metavar="BYTES", help="Leave out larger files.")
+@click.option(
+    "--namespace",
+    "namespaces",
+    metavar="PATTERN",
+    multiple=True,
+    help="Only parse files in matching namespaces, or not if PATTERN starts with -.",
+)
+@click.option("--snapshot", help="Load and store parse results from/to this file.")
+@click.option("--db", metavar="FILE", help="Store the model in this SQLite database for query.")
+@click.option("--since", metavar="REV", help="Only parse files changed in git since REV.")
+@click.option("--rev", metavar="REV", help="Read the files as of git revision REV.")
+@click.option("-j", "--jobs", default=1, help="Parse this many projects in parallel.")
+@click.option("--pipe", is_flag=True, help="Start dot early and stream dot code into it.")
+@click.option(
+    "--collapse",
+    metavar="DEPTH|PATTERN",
+    help="Render one node per namespace group, e.g. 2 or Company.Product.*",
+)
+@click.option(
+    "--associations", is_flag=True, help="Draw associations implied by field and method types."
+)
+@click.option("--compact", is_flag=True, help="Write minimal but equivalent dot code.")
+@click.option("--view", "view_specs", multiple=True, help="name=...;gv=...;svg=...;access=...")
+@click.option("--views", "views_file", type=click.Path(exists=True), help="INI file of views.")
+# pylint: disable=too-many-arguments,too-many-locals
+def create_uml(
+    directory,
+    font,
+    label,
+    output_gv,
+    output_svg,
+    repo_url,
+    min_access,
+    generated,
+    max_file_size,
+    namespaces,
+    snapshot,
+    db,
+    since,
+    rev,
+    jobs,
+    pipe,
+    collapse,
+    associations,
+    compact,
+    view_specs,
+    views_file,
+):
+    """Process all .cs files in directory (or .sln/.csproj, zip/nupkg/tar archive)."""
+    views = load_views(view_specs, views_file)
+    if not output_gv and not (pipe and output_svg) and not views:
+        raise click.UsageError("Missing option '-o' / '--output-gv' (or --pipe and -s).")
+    if since and not snapshot:
+        raise click.UsageError("--since requires --snapshot")
+    if since and rev:
+        raise click.UsageError("--since can't be combined with --rev")
+    if rev and is_project_file(directory):
+        raise click.UsageError("--rev requires a directory")
+    dot = DotPipe(output_svg) if pipe and output_svg else None
+    try:
+        project = Project(
+            repo_url=repo_url,
+            min_access=min_access and Access(min_access),
+            jobs=jobs,
+            associations=associations,
+            generated=generated,
+            max_file_size=max_file_size,
+            namespaces=namespaces,
+        )
+        root = dirname(directory) if is_project_file(directory) else directory
+        if rev:
+            project.add_revision(directory, rev)
+        elif is_project_file(directory):
+            project.add_solution(directory)
+        elif is_archive(directory):
+            project.add_archive(directory)
+        else:
+            project.add_directory(directory)
+        if snapshot:
+            try:
+                changed = changed_files(root, since) if since else None
+            except CalledProcessError as ex:
+                raise click.BadParameter(
+                    f"Can't list files changed since {since} in {root}", param_hint="--since"
+                ) from ex
+            if not project.load_snapshot(snapshot, changed):
+                click.secho(f"No usable snapshot in {snapshot}", fg="yellow")
+        try:
+            model = project.build(
+                lambda file_path: click.echo(
+                    f"Processing {click.format_filename(file_path)[len(root):]}"
+                )
+            )
+        except CalledProcessError as ex:
+            raise click.BadParameter(f"Can't read revision {rev}", param_hint="--rev") from ex
+        finally:
+            project.close()
+        if snapshot:
+            project.save_snapshot(snapshot)
+        if db:
+            with ModelStore(db) as store:
+                updated, removed = store.update(project.results(), project.options())
+            click.echo(f"Stored {updated} changed files in {db}, removed {removed}")
+        if model.stats["skipped"]:
+            click.echo(
+                f"Skipped {model.stats['skipped']} out of scope, generated or oversized files, "
+                f"{model.stats['skipped_bytes'] / 2**10:.1f} KiB"
+            )
+        if model.stats["duplicates"]:
+            click.echo(
+                f"Reused {model.stats['duplicates']} duplicate files, "
+                f"saving ~{model.stats['saved']:.2f}s of parsing"
+            )
+    except BaseException:
+        # Don't leave dot waiting for input, or output behind, when the build fails
+        if dot:
+            dot.abort()
+        raise
+    if output_gv or dot:
+        diagram = model.collapse(collapse_depth(collapse)) if collapse else model
+        write_output(diagram, font, label, output_gv, output_svg, dot, compact)
+    write_views(model, views, font, label, compact)
 
 
-def glob_files(directory):
-    """Return list of non-excluded files in dir and its subdirs."""
-    return [f for f in glob(join(directory, "**", "*.cs"), recursive=True) if not exclude(f)]
+def load_views(view_specs, views_file):
+    """Return the views given as --view specifications and in a --views file."""
+    try:
+        views = [View.parse(spec) for spec in view_specs]
+        if views_file:
+            views.extend(View.read_config(views_file))
+    except (ValueError, ConfigParserError) as ex:
+        raise click.BadParameter(str(ex), param_hint="--view/--views") from ex
+    return views
 
 
-def exclude(path):
-    """Return True if the path should be excluded."""
-    return search(r"AssemblyInfo\.cs|Test\.cs|/(bin|obj)/(Debug|Release)/", path)
+def write_views(model, views, font, label, compact=False):
+    """Render views of a model concurrently. Return the highest exit code."""
 
+    def write_view(view):
+        click.echo(f"Rendering view {view.name}")
+        dot = DotPipe(view.output_svg) if view.output_svg and not view.output_gv else None
+        sub_model = view.apply(model)
+        return write_output(
+            sub_model, font, view.label or label, view.output_gv, view.output_svg, dot, compact
+        )
 
-def write_output(font, label, output_gv, output_svg):
-    """Write GraphViz file and optionally run dot to convert it to SVG."""
-    if NAMESPACES:
-        UmlCreator.write_gv(output_gv, label, font, NAMESPACES, RELATIONS)
+    views = [expanded for view in views for expanded in view.expand(model)]
+    with ThreadPoolExecutor() as pool:
+        return max(pool.map(write_view, views), default=0)
+
+
+# pylint: disable=too-many-arguments
+def write_output(model, font, label, output_gv, output_svg, dot=None, compact=False):
+    """Write GraphViz file and optionally run dot to convert it to SVG.
+
+    If dot is a DotPipe, the dot code is streamed into it instead and the
+    GraphViz file is only written if output_gv is given."""
+    if model and dot:
+        return stream_output(model, font, label, output_gv, dot, compact)
+    if dot:
+        dot.abort()
+    if model:
+        model.write_gv(output_gv, label, font, compact)
         if output_svg:
             try:
                 run(["dot", "-Tsvg", "-o", output_svg, output_gv], check=True)
@@ -56,15 +236,145 @@ def write_output(font, label, output_gv, output_svg):
     return 0
 
 
-def zip_namespaces(nsp):
-    """Merge namespace dictionaries."""
-    for key, val in nsp.items():
-        if key in NAMESPACES:
-            NAMESPACES[key].extend(val)
+# pylint: disable=too-many-arguments
+def stream_output(model, font, label, output_gv, dot, compact=False):
+    """Stream dot code into a DotPipe, optionally copying it to a GraphViz file."""
+    out = open(output_gv, "w") if output_gv else None  # pylint: disable=consider-using-with
+    try:
+        for chunk in model.iter_dot(label, font, compact):
+            if out:
+                out.write(chunk)
+            dot.write(chunk)
+    except BrokenPipeError:
+        pass
+    except BaseException:
+        dot.abort()
+        raise
+    finally:
+        if out:
+            out.close()
+    return 0 if dot.close() == 0 else 2
+
+
+@main.command("diff")
+@click.argument("old")
+@click.argument("new")
+@click.option("-f", "--font", default="Bahnschrift")
+@click.option("-l", "--label", default="UML Diff")
+@click.option("-o", "--output-gv", required=True)
+@click.option("-s", "--output-svg")
+@click.option("--associations", is_flag=True, help="Compare associations too.")
+@click.option("--compact", is_flag=True, help="Write minimal but equivalent dot code.")
+# pylint: disable=too-many-arguments
+def diff_uml(old, new, font, label, output_gv, output_svg, associations, compact):
+    """Render the entities added, removed or changed between OLD and NEW, plus their neighbours.
+
+    OLD and NEW are --snapshot files, directories (or .sln/.csproj files, archives) or DIR@REV.
+    Snapshots are unpickled, so only pass snapshot files you trust."""
+    try:
+        diff = ModelDiff(load_model(old, associations), load_model(new, associations))
+    except (CalledProcessError, OSError, ValueError) as ex:
+        raise click.BadParameter(str(ex), param_hint="OLD/NEW") from ex
+    click.echo(f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed")
+    if diff:
+        write_output(diff.to_model(), font, label, output_gv, output_svg, compact=compact)
+
+
+@main.command()
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("-f", "--font", default="Bahnschrift")
+@click.option("-l", "--label", default="UML Diagram")
+@click.option("-j", "--jobs", type=int, help="Number of parser processes [default: one per CPU].")
+@click.option("--max-dot", default=2, type=int, help="Maximum number of concurrent dot processes.")
+@click.option("--cache-dir", type=click.Path(file_okay=False), help="Keep parse snapshots here.")
+# pylint: disable=too-many-arguments
+def batch(manifest, font, label, jobs, max_dot, cache_dir):
+    """Render the diagrams of all source roots in a MANIFEST INI file in one process."""
+    try:
+        entries = Entry.read_manifest(manifest)
+    except (ValueError, ConfigParserError) as ex:
+        raise click.BadParameter(str(ex), param_hint="MANIFEST") from ex
+    if cache_dir:
+        makedirs(cache_dir, exist_ok=True)
+    start = perf_counter()
+    results = Batch(font, label, jobs, max_dot, cache_dir).run(entries, report_entry)
+    failed = sum("error" in stats for stats in results)
+    files = sum(stats["files"] for stats in results)
+    click.echo(
+        f"{len(results) - failed} of {len(results)} diagrams rendered, "
+        f"{files} files in {perf_counter() - start:.2f}s"
+    )
+    if failed:
+        raise SystemExit(1)
+
+
+def report_entry(stats):
+    """Echo the outcome and throughput of a batch entry."""
+    if "error" in stats:
+        click.secho(f"{stats['name']}: {stats['error']}", fg="bright_red")
+    else:
+        click.echo(
+            f"{stats['name']}: {stats['files']} files ({stats['parsed']} parsed) "
+            f"in {stats['parse']:.2f}s + {stats['render']:.2f}s rendering, "
+            f"{stats['rate']:.1f} files/s"
+        )
+
+
+@main.command()
+@click.argument("database", type=click.Path(exists=True, dir_okay=False))
+@click.argument(
+    "question",
+    type=click.Choice(["implementors", "subclasses", "derived", "returning", "namespace"]),
+)
+@click.argument("name")
+@click.option("-r", "--recursive", is_flag=True, help="Include indirectly derived entities.")
+def query(database, question, name, recursive):
+    """Answer a QUESTION about NAME from a DATABASE written by create --db.
+
+    implementors, subclasses and derived list the entities implementing, extending or
+    either NAME; returning lists the fields and methods of type NAME (* and ? match
+    anything); namespace lists the entities in namespace NAME. Exits with 1 if none match."""
+    with ModelStore(database) as store:
+        if question == "returning":
+            rows = store.returning(name)
+            lines = [f"{nsp}.{ent}.{member} : {typ}" for nsp, ent, _, member, typ in rows]
         else:
-            NAMESPACES[key] = val
+            if question == "namespace":
+                rows = store.in_namespace(name)
+            else:
+                kind = dict(implementors="implements", subclasses="extends").get(question)
+                rows = store.derived(name, kind, recursive)
+            lines = [f"{nsp}.{ent} ({kind}) {path}" for nsp, ent, kind, path in rows]
+    for line in lines:
+        click.echo(line)
+    if not lines:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("roots", nargs=-1, required=True)
+@click.option("-f", "--font", default="Bahnschrift")
+@click.option("-l", "--label", default="UML Diagram")
+@click.option("-u", "--repo-url")
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=8080, type=int)
+@click.option("--max-dot", default=2, type=int, help="Maximum number of concurrent dot processes.")
+# pylint: disable=too-many-arguments
+def serve(roots, font, label, repo_url, host, port, max_dot):
+    """Serve diagrams of one or more [NAME=]DIRECTORY roots over HTTP."""
+    roots = dict(parse_root(root) for root in roots)
+    service = RenderService(roots, font, label, repo_url, max_dot)
+    server = make_server(service, host, port)
+    click.echo(f"Serving {', '.join(sorted(roots))} on http://{host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
-def zip_relations(rel):
-    """Append relations to global list."""
-    RELATIONS.extend(rel)
+def parse_root(root):
+    """Split a [NAME=]DIRECTORY argument into a (name, directory) pair."""
+    name, _, directory = root.rpartition("=")
+    return name or basename(normpath(directory)), directory
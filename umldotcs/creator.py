@@ -2,9 +2,20 @@
 """Methods for globbing .cs files and building a UML class hierarchy."""
 
 import re
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
 
-from umldotcs.entities import UmlClass, UmlEntity, UmlEnum, UmlInterface, UmlStruct
+from umldotcs.entities import (
+    DEFAULT_COLOR,
+    UmlClass,
+    UmlEntity,
+    UmlEnum,
+    UmlInterface,
+    UmlStruct,
+)
 from umldotcs.features import Access, MetaEntity, Modifier
+from umldotcs.helpers import in_scope
 
 BOM = "\ufeff"
 AZAZ = "A-Za-z"
@@ -12,6 +23,18 @@ AZAZ = "A-Za-z"
 ATTRIB = f"^\\s*\\[([{AZAZ}]+)"
 ENTITY = "|".join(MetaEntity.as_str_list())
 IDENTI = f"[{AZAZ}_][{AZAZ}0-9._-]+"
+# Only the first MAX_LINE characters of longer lines are parsed, so that minified or
+# generated code costs the same per line however long it is
+MAX_LINE = 10_000
+
+
+def compact_relation(rel):
+    """Return the dot code of a relation without indentation and default edge attributes."""
+    edge, _, attrs = rel.strip().partition(" [")
+    edge = edge.replace(" -> ", "->")
+    attrs = [attr.replace(" = ", "=") for attr in attrs.rstrip("]").split(", ") if attr]
+    attrs = [attr for attr in attrs if attr not in ("arrowhead=normal", "style=solid")]
+    return f"{edge}[{','.join(attrs)}]" if attrs else edge
 
 
 class UmlCreator:
@@ -21,8 +44,13 @@ class UmlCreator:
     re_entity = re.compile(ENTITY)
     re_namespace = re.compile(f"{BOM}?namespace ({IDENTI})")
 
-    def __init__(self, path, repo_url=None):
+    # pylint: disable=too-many-arguments
+    def __init__(self, path, repo_url=None, min_access=None, members=True, namespaces=()):
         self.cur_attrs = []
+        self.members = members
+        self.min_access = min_access
+        self.namespaces = namespaces
+        self.out_of_scope = False
         self.path = path
         self.nsp = None
         self.repo_url = repo_url
@@ -35,9 +63,11 @@ class UmlCreator:
 
     def extract_namespace(self, line):
         """Extract the namespace from a line into self.nsp.
-        Set self.nsp to None if no namespace found."""
+        Set self.nsp to None if no namespace found.
+        Set self.out_of_scope if it doesn't match the namespace patterns."""
         match = self.re_namespace.match(line)
         self.nsp = None if match is None else match.group(1)
+        self.out_of_scope = self.nsp is not None and not in_scope(self.nsp, self.namespaces)
 
     def extract_object(self, tokens):
         """Extract a class or interface name from a line."""
@@ -61,19 +91,40 @@ class UmlCreator:
 
     def process_file(self):
         """Process a .cs file and parse it into entities."""
-        ent = None
         try:
             with open(self.path, "r") as file_:
-                for _, line in enumerate(file_):
-                    ent = self.process_line(line, ent)
+                return self.process_lines(file_)
         except IsADirectoryError:
             return dict(), list()
+
+    def process_source(self, source):
+        """Process a string of C# code and parse it into entities."""
+        return self.process_lines(source.splitlines())
+
+    def process_lines(self, lines):
+        """Process an iterable of lines of C# code and parse it into entities.
+
+        Without members, the lines after the declaration of the entity aren't read, and
+        if the namespace is out of scope, neither are those after it."""
+        ent = None
+        for line in lines:
+            ent = self.process_line(line, ent)
+            if self.out_of_scope or ent is not None and not self.members:
+                break
+        return self.finish(ent)
+
+    def finish(self, ent):
+        """Return the namespace dictionary and relations of the entity parsed from a file.
+
+        Both are empty if the namespace is out of scope."""
+        if self.out_of_scope:
+            return dict(), list()
         if self.nsp is None:
             raise RuntimeError(f"No namespace found in {self.path}")
         if ent is None:
             raise RuntimeError(f"No class, enum, struct or interface found in {self.path}")
-        # TODO: run through relations and create entities
-        # for those not found already (mostly interfaces)
+        # Relations are resolved, and stubs created for unknown types, run-wide by
+        # the SymbolTable in Model.resolve()
         return {self.nsp: [ent]}, ent.relations_to_dot()
 
     def process_line(self, line, ent):
@@ -90,15 +141,20 @@ class UmlCreator:
             self.cur_attrs.append(attr)
             return ent
 
-        tokens = self.tokenize(line)
+        head = line[:MAX_LINE]
+        tokens = self.tokenize(head)
+        summarize = len(line) > MAX_LINE
+        if summarize:
+            # Drop the last token, which may have been cut in two
+            del tokens[-1:]
         if not tokens:
             return ent
 
-        if ent is None and self.re_entity.search(line):
+        if ent is None and self.re_entity.search(head):
             return self.extract_object(tokens)
 
         if ent:
-            self.cur_attrs = ent.parse_tokens(tokens, self.cur_attrs)
+            self.cur_attrs = ent.parse_tokens(tokens, self.cur_attrs, self.min_access, summarize)
 
         return ent
 
@@ -108,11 +164,29 @@ class UmlCreator:
         return line.strip().split()
 
     @staticmethod
-    def write_gv(output_gv, label, font, namespaces, relations):
-        """Write entities to a .gv file."""
-        with open(output_gv, "w") as out:
-            out.write(
-                f"""digraph UML {{
+    def cluster_dot(nsp, classes, compact=False):
+        """Return the dot code for the cluster of entities in a namespace."""
+        cluster_name = nsp.replace(".", "_")
+        if compact:
+            header = f'subgraph cluster_{cluster_name}{{style=rounded;label="{nsp}";color=crimson\n'
+            return header + "".join([ent.to_dot(True) for ent in classes]) + "}\n"
+        header = f"""\n  subgraph cluster_{cluster_name} {{
+    style     = rounded
+    label     = "{nsp}"
+    color     = crimson\n\n"""
+        return header + "\n".join([ent.to_dot() for ent in classes]) + "\n  }\n"
+
+    @staticmethod
+    # pylint: disable=too-many-arguments
+    def iter_gv(label, font, namespaces, relations, stubs=(), cache=None, compact=False):
+        """Yield the dot code for a diagram of entities, one chunk at a time.
+
+        Clusters are taken from the FragmentCache cache, if given. If compact, the
+        code is minimal but equivalent: see UmlEntity.to_dot()."""
+        if compact:
+            yield from UmlCreator.iter_compact_gv(label, font, namespaces, relations, stubs, cache)
+            return
+        yield f"""digraph UML {{
 
   graph [fontname = "{font} SemiBold", fontsize = 48]
   edge  [fontname = "{font}", fontsize = 12]
@@ -120,18 +194,82 @@ class UmlCreator:
 
   label    = "{label}"
   labelloc = "t"\n"""
+        for nsp, classes in namespaces.items():
+            if cache is None:
+                yield UmlCreator.cluster_dot(nsp, classes)
+            else:
+                yield cache.fragment(nsp, classes)
+        yield "\n"
+        if stubs:
+            yield "\n".join([ent.to_dot() for ent in stubs])
+            yield "\n"
+        yield "\n".join(relations)
+        yield "\n}\n"
+
+    @staticmethod
+    # pylint: disable=too-many-arguments
+    def iter_compact_gv(label, font, namespaces, relations, stubs=(), cache=None):
+        """Yield compact dot code for a diagram of entities, one chunk at a time."""
+        yield (
+            f'digraph UML{{graph[fontname="{font} SemiBold",fontsize=48]'
+            f'edge[fontname="{font}",fontsize=12]node[fontname="{font}",fontsize=12,shape=none,'
+            f'width=0,height=0,margin=0,color={DEFAULT_COLOR}]label="{label}";labelloc="t"\n'
+        )
+        for nsp, classes in namespaces.items():
+            if cache is None:
+                yield UmlCreator.cluster_dot(nsp, classes, True)
+            else:
+                yield cache.fragment(nsp, classes, True)
+        yield "".join([ent.to_dot(True) for ent in stubs])
+        yield "".join([compact_relation(rel) + "\n" for rel in relations])
+        yield "}\n"
+
+    @staticmethod
+    # pylint: disable=too-many-arguments
+    def write_gv(
+        output_gv, label, font, namespaces, relations, stubs=(), cache=None, compact=False
+    ):
+        """Write entities to a .gv file."""
+        with open(output_gv, "w") as out:
+            out.writelines(
+                UmlCreator.iter_gv(label, font, namespaces, relations, stubs, cache, compact)
             )
-            for nsp, classes in namespaces.items():
-                cluster_name = nsp.replace(".", "_")
-                out.write(
-                    f"""\n  subgraph cluster_{cluster_name} {{
-    style     = rounded
-    label     = "{nsp}"
-    color     = crimson\n\n"""
-                )
-                out.write("\n".join([ent.to_dot() for ent in classes]))
-                out.write("\n  }\n")
-            out.write("\n")
-            out.write("\n".join(relations))
-            out.write("\n}\n")
             out.flush()
+
+
+class FragmentCache:
+    """Rendered dot clusters, keyed by namespace and a digest of its entities' fingerprints.
+
+    Only namespaces whose entities changed are rendered again."""
+
+    def __init__(self, size=4096):
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.size = size
+        self._lock = Lock()
+
+    def __getstate__(self):
+        with self._lock:
+            return dict(entries=self.entries, size=self.size)
+
+    def __setstate__(self, state):
+        self.__init__(state["size"])
+        self.entries = state["entries"]
+
+    def fragment(self, nsp, classes, compact=False):
+        """Return the (compact) dot code for the cluster of entities in a namespace."""
+        digest = blake2b(b"".join(ent.fingerprint() for ent in classes), digest_size=16)
+        key = (nsp, digest.digest(), compact)
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        fragment = UmlCreator.cluster_dot(nsp, classes, compact)
+        with self._lock:
+            self.entries[key] = fragment
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return fragment
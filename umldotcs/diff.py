@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Structural diff of two models, rendering only what changed."""
+
+from copy import copy
+from os.path import isdir, isfile
+
+from umldotcs.model import Model, Project
+from umldotcs.msbuild import is_project_file
+from umldotcs.sources import is_archive
+
+ADDED = ("darkgreen", "honeydew")
+REMOVED = ("red3", "mistyrose")
+CHANGED = ("darkorange3", "lightyellow")
+NEIGHBOUR = ("gray50", "white")
+
+
+def load_model(spec, associations=False):
+    """Return the model of a snapshot file, a directory (or other source) or a DIR@REV."""
+    directory, _, rev = spec.rpartition("@")
+    if rev and isdir(directory):
+        project = Project(associations=associations)
+        project.add_revision(directory, rev)
+        try:
+            return project.build()
+        finally:
+            project.close()
+    if isfile(spec) and not (is_project_file(spec) or is_archive(spec) or spec.endswith(".cs")):
+        model = Model.from_snapshot(spec, associations)
+        if model is None:
+            raise ValueError(f"{spec} is not a usable snapshot")
+        return model
+    return Project([spec], associations=associations).build()
+
+
+def qualified_name(ent):
+    """Return the namespace qualified name of an entity."""
+    return f"{ent.namespace}.{ent.name}"
+
+
+def outgoing(model):
+    """Return the resolved relations of a model as (target, style) sets by source entity,
+    all by qualified name."""
+    by_source = dict()
+    for ent, target, style in model.edges():
+        by_source.setdefault(qualified_name(ent), set()).add((qualified_name(target), style))
+    return by_source
+
+
+def relation(ent, target, style):
+    """Return the dot code of a relation."""
+    return f"    {ent.name} -> {target.name} {style}"
+
+
+class ModelDiff:
+    """The entities added, removed and changed between two models, by qualified name.
+
+    An entity has changed if its members, modifiers, bases or outgoing relations did."""
+
+    def __init__(self, old, new):
+        self.old_model = old
+        self.new_model = new
+        self.old = {qualified_name(ent): ent for ent in old.entities()}
+        self.new = {qualified_name(ent): ent for ent in new.entities()}
+        old_rels, new_rels = outgoing(old), outgoing(new)
+        self.added = [fqn for fqn in self.new if fqn not in self.old]
+        self.removed = [fqn for fqn in self.old if fqn not in self.new]
+        self.changed = [
+            fqn
+            for fqn, ent in self.new.items()
+            if fqn in self.old
+            and (
+                ent.fingerprint() != self.old[fqn].fingerprint()
+                or new_rels.get(fqn) != old_rels.get(fqn)
+            )
+        ]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def to_model(self):
+        """Return a model of the added, removed and changed entities plus their neighbours.
+
+        Entities are colour-coded, and neighbours are greyed out. Entities are selected by
+        qualified name, so a class moved to another namespace is both removed and added."""
+        selected = dict()
+        for fqns, entities, colors in [
+            (self.added, self.new, ADDED),
+            (self.changed, self.new, CHANGED),
+            (self.removed, self.old, REMOVED),
+        ]:
+            for fqn in fqns:
+                selected[fqn] = (entities[fqn], colors)
+        changed = set(selected)
+        new_edges, old_edges = list(self.new_model.edges()), list(self.old_model.edges())
+        for edges, entities in [(new_edges, self.new), (old_edges, self.old)]:
+            for ent, target, _ in edges:
+                source, target = qualified_name(ent), qualified_name(target)
+                for fqn, other in [(source, target), (target, source)]:
+                    if fqn in changed and other not in selected and other in entities:
+                        selected[other] = (entities[other], NEIGHBOUR)
+        diff = Model()
+        for ent, (color, bgcolor) in selected.values():
+            ent = copy(ent)
+            ent.color, ent.bgcolor = color, bgcolor
+            diff.namespaces.setdefault(ent.namespace, []).append(ent)
+        removed = set(self.removed)
+        old_edges = [
+            edge
+            for edge in old_edges
+            if {qualified_name(edge[0]), qualified_name(edge[1])} & removed
+        ]
+        # Relations are rendered by entity name, so the same one may come from both models
+        relations = dict.fromkeys(
+            relation(*edge)
+            for edge in new_edges + old_edges
+            if qualified_name(edge[0]) in selected and qualified_name(edge[1]) in selected
+        )
+        diff.relations = list(relations)
+        return diff
@@ -2,21 +2,25 @@
 """Definition of UML entities."""
 
 from abc import ABC, abstractmethod
+from hashlib import blake2b
 from os import linesep
 from re import match, sub
 
-from umldotcs.features import Access, Field, MetaEntity, Method, Modifier
+from umldotcs.features import ACCESS_KEYWORDS, Access, Field, MetaEntity, Method, Modifier
 from umldotcs.helpers import clean_generics
 
 ARROW = "=>"
 CURLY = "{"
+IMPLEMENTATION = frozenset([ARROW, CURLY])
+CASTS = frozenset(["explicit", "implicit"])
+ELLIPSIS = "…"
 
 EXTENDS = "[arrowhead = normal, style = solid]"
 IMPLEMENTS = "[arrowhead = empty, style = dotted]"
 AGGREGATES = "[arrowhead = odiamond, style = solid]"
 COMPOSITES = "[arrowhead = diamond, style = solid]"
 HAS_A = "[arrowhead = vee, style = solid]"
-# TODO: autodetection of aggregation, composition, uses
+DEFAULT_COLOR = "gray10"
 
 
 class UmlEntity(ABC):
@@ -35,12 +39,21 @@ class UmlEntity(ABC):
         self.access = kwargs.get("access", Access.INTERNAL)
         self.attrs = kwargs.get("attrs", [])
         self.bgcolor = kwargs.get("bgcolor", "gray99")
-        self.color = kwargs.get("color", "gray10")
+        self.color = kwargs.get("color", DEFAULT_COLOR)
         self.format_href(kwargs.get("repo_url", None))
         self.modifiers = kwargs.get("modifiers", [])
 
+        if "where" in tokens:
+            tokens = tokens[: tokens.index("where")]
         self.implements = [clean_generics(t) for t in tokens[1:] if t != "{"] if tokens else []
 
+    def __copy__(self):
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        # A copy is usually made to be changed, so it needs a fingerprint of its own
+        clone.__dict__.pop("_fingerprint", None)
+        return clone
+
     def __eq__(self, other):
         if other is None:
             return False
@@ -62,6 +75,16 @@ class UmlEntity(ABC):
     def display_name(self):
         """Return dot code for the display name of the object."""
 
+    def fingerprint(self):
+        """Return a digest of everything that goes into to_dot(), computed once."""
+        if "_fingerprint" not in self.__dict__:
+            parts = [repr(self), self.color, self.bgcolor, self.repo_link, repr(self.modifiers)]
+            parts.extend(repr(f) for f in self.fields)
+            parts.extend(repr(m) for m in self.methods)
+            digest = blake2b("\n".join(parts).encode(), digest_size=16).digest()
+            self.__dict__["_fingerprint"] = digest
+        return self.__dict__["_fingerprint"]
+
     def format_href(self, url):
         """Format dot code for a link to the source repo."""
         if url is None:
@@ -84,72 +107,98 @@ class UmlEntity(ABC):
     @staticmethod
     def parse_entity(tokens):
         """Parse tokens. Return entity and leftover tokens."""
-        entity = MetaEntity(tokens[0])
-        del tokens[0]
-        return entity, tokens
+        return MetaEntity(tokens[0]), tokens[1:]
 
-    def parse_return_type(self, tokens):
-        """Parse tokens. Return return type and leftover tokens."""
-        if tokens[0] == "async":
-            del tokens[0]
-        return_type = tokens[0]
+    def parse_return_type(self, tokens, pos):
+        """Parse tokens from pos. Return return type and the position of the member name.
+
+        The name token of constructors and cast operators is rewritten in place."""
+        if tokens[pos] == "async":
+            pos += 1
+        return_type = tokens[pos]
         if return_type.startswith(self.name.partition("_")[0] + "("):
-            return_type = ""
-            tokens = ["«Create»"] + tokens
-        elif return_type in ["explicit", "implicit"]:
-            del tokens[:2]
-            return_type = tokens[0].split("(", 1)[0]
-            tokens[0] = tokens[0].replace(return_type, "«Cast»")
-        else:
-            while return_type.endswith(","):
-                del tokens[0]
-                return_type = f"{return_type} {tokens[0]}"
-            if return_type == "void":
-                return_type = ""
-            del tokens[0]
-        return return_type, tokens
-
-    def parse_tokens(self, tokens, attrs):
-        """Parse line for fields and methods."""
+            tokens[pos] = f"«Create» {return_type}"
+            return "", pos
+        if return_type in CASTS and pos + 2 < len(tokens):
+            pos += 2
+            return_type = tokens[pos].split("(", 1)[0]
+            tokens[pos] = "«Cast»" + tokens[pos][len(return_type) :]
+            return return_type, pos
+        # Tuple return types span tokens up to the first one which doesn't end in a comma
+        end = pos + 1
+        while return_type.endswith(",") and end < len(tokens):
+            return_type = tokens[end]
+            end += 1
+        return_type = " ".join(tokens[pos:end])
+        return ("" if return_type == "void" else return_type), end
+
+    @staticmethod
+    def parse_signature(tokens, pos, end):
+        """Join tokens[pos:end] into a signature without default values and parameter names."""
+        parts = []
+        while pos < end:
+            token = tokens[pos]
+            pos += 1
+            if token == "=":
+                pos += 1
+                continue
+            if pos + 1 < end and tokens[pos] == "=":
+                # Drop the default value, keeping the comma or parenthesis which ends it
+                default = tokens[pos + 1]
+                if default[-1] in ",)":
+                    token += default[-1]
+                pos += 2
+            if token[-1] == "," and "<" not in token:
+                token = ","
+            elif token[-1] == ")" and token[-2:-1] != "(":
+                token = ")"
+            if parts and token[0] not in ",)":
+                parts.append(" ")
+            parts.append(token)
+        signature = "".join(parts)
+        return signature[:-1] if signature.endswith(";") else signature
+
+    def parse_tokens(self, tokens, attrs, min_access=None, summarize=False):
+        """Parse line for fields and methods, skipping those with access below min_access.
+
+        If summarize, the tokens are the head of a line which was cut short, and a member
+        whose signature doesn't end within them is summarized by its name."""
         # Parse access level - NB: if some dolt used implicit
         # internal access we won't catch the method / field
-        try:
-            access = Access(tokens[0])
-            del tokens[0]
-        except ValueError:
+        if tokens[0] not in ACCESS_KEYWORDS:
             return attrs
+        access, pos = Access.scan_access(tokens)
+
+        # Drop members we won't display before doing any more work on them
+        if min_access is not None and access < min_access:
+            return []
 
         # Parse modifiers
-        modifiers, tokens = Modifier.parse_modifiers(tokens)
+        modifiers, pos = Modifier.scan_modifiers(tokens, pos)
+        if summarize and tokens[pos:] in ([], ["async"]):
+            # The line was cut short before the return type
+            self.fields.append(Field(attrs, access, modifiers, ELLIPSIS, ELLIPSIS))
+            return []
 
         # Parse return type
-        return_type, tokens = self.parse_return_type(tokens)
+        return_type, pos = self.parse_return_type(tokens, pos)
 
         # Throw away implementation if present
-        if ARROW in tokens:
-            tokens = tokens[: tokens.index(ARROW)]
-        if CURLY in tokens:
-            tokens = tokens[: tokens.index(CURLY)]
-        if len(tokens) > 1 and tokens[1] == "=":
-            tokens = [tokens[0]]
-
-        # Remove default parameter values
-        while "=" in tokens:
-            idx = tokens.index("=")
-            if tokens[idx + 1].endswith(","):
-                tokens[idx - 1] = tokens[idx - 1] + ","
-            elif tokens[idx + 1].endswith(")"):
-                tokens[idx - 1] = tokens[idx - 1] + ")"
-            del tokens[idx : idx + 2]
-
-        # Remove parameter names
-        tokens = ["," if t[-1] == "," and "<" not in t else t for t in tokens]
-        tokens = [")" if t[-1] == ")" and t[-2] != "(" else t for t in tokens]
+        end = pos
+        while end < len(tokens) and tokens[end] not in IMPLEMENTATION:
+            end += 1
+        if end - pos > 1 and tokens[pos + 1] == "=":
+            end = pos + 1
 
         # Rejoin method / field signature
-        signature = " ".join(tokens).replace(" ,", ",").replace(" )", ")")
-        if signature and signature[-1] == ";":
-            signature = signature[:-1]
+        signature = self.parse_signature(tokens, pos, end)
+        if summarize and end == len(tokens):
+            if return_type.endswith(",") or return_type in CASTS:
+                # The line was cut short within the return type
+                return_type = ELLIPSIS
+                signature = ""
+            name, paren, _ = signature.partition("(")
+            signature = f"{name}({ELLIPSIS})" if paren else name or ELLIPSIS
 
         # Create Method or Field and add to list
         if "(" in signature:
@@ -166,8 +215,14 @@ class UmlEntity(ABC):
             rels.append(f"    {self.name} -> {rel} {style}")
         return rels
 
-    def to_dot(self):
-        """Convert the object to GraphViz/dot code."""
+    def to_dot(self, compact=False):
+        """Convert the object to GraphViz/dot code, or to minimal but equivalent code if compact.
+
+        Compact code has no indentation, leaves out the default BORDER and a color of
+        DEFAULT_COLOR (the node default in compact diagrams), and COLSPAN if there is no
+        column of attributes."""
+        if compact:
+            return self.compact_dot()
         indent = " " * 16
         empty_row = f'{indent}    <TR><TD COLSPAN="2"></TD></TR>'
         dot = f"""    {self.name} [
@@ -182,6 +237,25 @@ class UmlEntity(ABC):
         dot += f"""{indent}</TABLE>>\n    ]\n"""
         return dot
 
+    def compact_dot(self):
+        """Convert the object to compact GraphViz/dot code."""
+        rows = [f'<TR><TD PORT="name" COLSPAN="2">{self.display_name()}</TD></TR>']
+        if self.fields or self.methods:
+            empty_row = '<TR><TD COLSPAN="2"></TD></TR>'
+            rows.append("<HR/>")
+            rows.extend([f.to_dot(True) for f in self.fields] or [empty_row])
+            rows.append("<HR/>")
+            rows.extend([m.to_dot(True) for m in self.methods] or [empty_row])
+        table = "".join(rows)
+        if not any(member.attrs for member in self.fields + self.methods):
+            table = table.replace(' COLSPAN="2"', "")
+        color = "" if self.color == DEFAULT_COLOR else f"color={self.color},"
+        link = f"{self.repo_link} " if self.repo_link else ""
+        return (
+            f'{self.name}[{color}label=<<TABLE {link}BGCOLOR="{self.bgcolor}" CELLBORDER="0" '
+            f'CELLSPACING="0">{table}</TABLE>>]\n'
+        )
+
 
 class UmlInterface(UmlEntity):
     """An interface."""
@@ -25,48 +25,56 @@ class Access(Enum):
             return False
         if not isinstance(other, Access):
             return False
-        values = {
-            "private": 0,
-            "private protected": 1,
-            "internal": 2,
-            "protected internal": 3,
-            "protected": 4,
-            "public": 5,
-        }
-        return values[self.value] < values[other.value]
+        return ACCESS_RANKS[self] < ACCESS_RANKS[other]
 
     def __repr__(self):
         return f'Access("{self.value}")'
 
     def to_dot(self):
         """Convert the Access value to GraphViz/dot code."""
-        return {
-            self.INTERNAL: "~",
-            self.PRIVATE: "-",
-            self.PRIVATEPROTECTED: "-#",
-            self.PROTECTED: "#",
-            self.PROTECTEDINTERNAL: "#~",
-            self.PUBLIC: "+",
-        }[self]
+        return ACCESS_DOTS[self]
 
     @staticmethod
     def parse_access(tokens):
         """Parse tokens. Return access level and leftover tokens."""
-        try:
-            access = Access(tokens[0])
-            del tokens[0]
-        except ValueError:
-            access = Access.INTERNAL
-        try:
-            if access == Access.PRIVATE and Access(tokens[0]) == Access.PROTECTED:
-                access = Access.PRIVATEPROTECTED
-                del tokens[0]
-            elif access == Access.PROTECTED and Access(tokens[0]) == Access.INTERNAL:
-                access = Access.PROTECTEDINTERNAL
-                del tokens[0]
-        except ValueError:
-            pass
-        return access, tokens
+        access, pos = Access.scan_access(tokens)
+        return access, tokens[pos:]
+
+    @staticmethod
+    def scan_access(tokens, pos=0):
+        """Scan tokens from pos. Return access level and the position after it."""
+        access = ACCESS_KEYWORDS.get(tokens[pos]) if pos < len(tokens) else None
+        if access is None:
+            return Access.INTERNAL, pos
+        pos += 1
+        if pos < len(tokens):
+            compound = ACCESS_COMPOUNDS.get((access, tokens[pos]))
+            if compound is not None:
+                return compound, pos + 1
+        return access, pos
+
+
+ACCESS_KEYWORDS = {access.value: access for access in Access}
+ACCESS_COMPOUNDS = {
+    (Access.PRIVATE, "protected"): Access.PRIVATEPROTECTED,
+    (Access.PROTECTED, "internal"): Access.PROTECTEDINTERNAL,
+}
+ACCESS_RANKS = {
+    Access.PRIVATE: 0,
+    Access.PRIVATEPROTECTED: 1,
+    Access.INTERNAL: 2,
+    Access.PROTECTEDINTERNAL: 3,
+    Access.PROTECTED: 4,
+    Access.PUBLIC: 5,
+}
+ACCESS_DOTS = {
+    Access.INTERNAL: "~",
+    Access.PRIVATE: "-",
+    Access.PRIVATEPROTECTED: "-#",
+    Access.PROTECTED: "#",
+    Access.PROTECTEDINTERNAL: "#~",
+    Access.PUBLIC: "+",
+}
 
 
 class FieldOrMethod(ABC):
@@ -94,7 +102,7 @@ class FieldOrMethod(ABC):
         return Modifier.STATIC in self.modifiers
 
     @abstractmethod
-    def to_dot(self):
+    def to_dot(self, compact=False):
         """Convert the Field or Method to GraphViz/dot code."""
 
 
@@ -124,9 +132,9 @@ class Field(FieldOrMethod):
     def __repr__(self):
         return f'Field({self.attrs}, {self.access}, {self.modifiers}, "{self.type}", "{self.name}")'
 
-    def to_dot(self):
-        """Convert the Field to GraphViz/dot code."""
-        dot = '                    <TR><TD ALIGN="LEFT"'
+    def to_dot(self, compact=False):
+        """Convert the Field to GraphViz/dot code, without indentation if compact."""
+        dot = ("" if compact else " " * 20) + '<TR><TD ALIGN="LEFT"'
         if not self.attrs:
             dot += ' COLSPAN="2"'
         if self.is_static():
@@ -197,9 +205,9 @@ class Method(FieldOrMethod):
         """Return True if this Method is abstract."""
         return Modifier.ABSTRACT in self.modifiers
 
-    def to_dot(self):
-        """Convert the Method to GraphViz/dot code."""
-        dot = '                    <TR><TD ALIGN="LEFT"'
+    def to_dot(self, compact=False):
+        """Convert the Method to GraphViz/dot code, without indentation if compact."""
+        dot = ("" if compact else " " * 20) + '<TR><TD ALIGN="LEFT"'
         if not self.attrs:
             dot += ' COLSPAN="2"'
         # TODO: proper wrapping -- static, etc. wrap =
@@ -248,12 +256,20 @@ class Modifier(Enum):
     @staticmethod
     def parse_modifiers(tokens):
         """Parse tokens. Return modifiers and leftover tokens."""
+        modifiers, pos = Modifier.scan_modifiers(tokens)
+        return modifiers, tokens[pos:]
+
+    @staticmethod
+    def scan_modifiers(tokens, pos=0):
+        """Scan tokens from pos. Return modifiers and the position after them."""
         modifiers = []
-        while True:
-            try:
-                # TODO: proper support for partial (urgh!)
-                modifiers.append(Modifier(tokens[0]))
-                del tokens[0]
-            except ValueError:
+        while pos < len(tokens):
+            modifier = MODIFIER_KEYWORDS.get(tokens[pos])
+            if modifier is None:
                 break
-        return modifiers, tokens
+            modifiers.append(modifier)
+            pos += 1
+        return modifiers, pos
+
+
+MODIFIER_KEYWORDS = {modifier.value: modifier for modifier in Modifier}
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Running GraphViz dot as a pipe."""
+
+from subprocess import PIPE, Popen  # nosec
+from threading import Thread
+
+CHUNK_SIZE = 1 << 16
+
+
+class DotPipe:
+    """A dot process which is started ahead of time and fed dot code through stdin.
+
+    Rendered output is read from dot's stdout and written to the output file
+    chunk by chunk, as soon as dot produces it."""
+
+    def __init__(self, output, fmt="svg"):
+        self.output = output
+        self.process = Popen(["dot", f"-T{fmt}"], stdin=PIPE, stdout=PIPE)  # nosec
+        self.reader = Thread(target=self.copy_output, daemon=True)
+        self.reader.start()
+
+    def copy_output(self):
+        """Copy dot's stdout to the output file, which is only created once dot outputs."""
+        out = None
+        try:
+            for chunk in iter(lambda: self.process.stdout.read1(CHUNK_SIZE), b""):
+                if out is None:
+                    out = open(self.output, "wb")  # pylint: disable=consider-using-with
+                out.write(chunk)
+                out.flush()
+        finally:
+            if out is not None:
+                out.close()
+
+    def write(self, chunk):
+        """Write a chunk of dot code to dot's stdin."""
+        self.process.stdin.write(chunk.encode())
+
+    def close(self):
+        """Close dot's stdin and wait for it to finish. Return its exit code."""
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.reader.join()
+        return self.process.wait()
+
+    def abort(self):
+        """Kill dot without producing any output."""
+        self.process.kill()
+        self.close()
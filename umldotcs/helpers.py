@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Generic helper methods."""
 
+from fnmatch import fnmatchcase
 from re import match
 
 
@@ -22,3 +23,21 @@ def clean_generics(token):
 def encode_generics(token):
     """Convert a string like IAmGeneric<Foo,Bar> into IAmGeneric&lt;Foo,Bar&gt;."""
     return token.strip(",").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def decode_generics(token):
+    """Convert a string like IAmGeneric&lt;Foo,Bar&gt; back into IAmGeneric<Foo,Bar>."""
+    return token.replace("&lt;", "<").replace("&gt;", ">")
+
+
+def match_namespace(nsp, patterns):
+    """Return True if a namespace matches any of the patterns, where Foo.* matches Foo too."""
+    return any(fnmatchcase(nsp, p) or p.endswith(".*") and nsp == p[:-2] for p in patterns)
+
+
+def in_scope(nsp, patterns):
+    """Return True if a namespace matches any of the patterns, or there are none besides
+    exclusions, and no exclusion: a pattern prefixed with "-"."""
+    include = [p for p in patterns if not p.startswith("-")]
+    exclude = [p[1:] for p in patterns if p.startswith("-")]
+    return (not include or match_namespace(nsp, include)) and not match_namespace(nsp, exclude)
@@ -0,0 +1,564 @@
+# -*- coding: utf-8 -*-
+"""In-memory UML model and the project of C# sources it is built from."""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from copy import copy
+from hashlib import blake2b
+import pickle  # nosec
+from os import stat
+from os.path import dirname, isdir, normpath
+from threading import Lock
+from time import perf_counter
+
+from umldotcs import scanner
+from umldotcs.creator import FragmentCache, UmlCreator
+from umldotcs.helpers import match_namespace
+from umldotcs.msbuild import is_project_file, project_files
+from umldotcs.overview import Overview
+from umldotcs.symbols import SymbolTable
+from umldotcs.sources import HEAD, is_archive, is_generated, iter_archive, iter_files, prefetch
+from umldotcs.vcs import Blob, Revision
+
+ARCHIVE = object()
+DIRECTORY = object()
+SOLUTION = object()
+PENDING = 64
+UNIT_SIZE = 150
+SNAPSHOT_VERSION = 2
+
+
+# pylint: disable=too-many-arguments
+def parse_source(name, source, repo_url=None, min_access=None, members=True, namespaces=()):
+    """Parse a single source, with or without members, if its namespace is in scope of the
+    namespace patterns. Return its namespace dictionary and relations."""
+    creator = UmlCreator(name, repo_url, min_access, members, namespaces)
+    if source is None:
+        return creator.process_file()
+    if isinstance(source, Blob):
+        source = source.read()
+    return creator.process_source(source)
+
+
+def parse_unit(sources, repo_url=None, min_access=None, progress=None, namespaces=()):
+    """Parse the (name, source) pairs of a unit of work. Return (result, elapsed) for each.
+
+    If NumPy is available, the sources are scanned together by the vectorised scanner."""
+    if scanner.ENABLED:
+        return scanner.parse_sources(sources, repo_url, min_access, progress, namespaces)
+    results = []
+    for name, source in sources:
+        if progress:
+            progress(name)
+        start = perf_counter()
+        result = parse_source(name, source, repo_url, min_access, namespaces=namespaces)
+        results.append((result, perf_counter() - start))
+    return results
+
+
+def read_snapshot(path):
+    """Return the contents of a snapshot written by Project.save_snapshot(), or None.
+
+    Snapshots are pickles, so reading one runs code from it: only read trusted files."""
+    try:
+        with open(path, "rb") as file_:
+            snapshot = pickle.load(file_)  # nosec - snapshots are trusted input, see above
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+class Model:
+    """A parsed UML model: entities grouped by namespace, plus their relations."""
+
+    def __init__(self, namespaces=None, relations=None, stubs=None):
+        self.namespaces = dict() if namespaces is None else namespaces
+        self.relations = list() if relations is None else relations
+        self.stubs = list() if stubs is None else stubs
+        self.associations = False
+        self.fragments = None
+        self.stats = dict()
+        self.version = None
+
+    def __bool__(self):
+        return bool(self.namespaces)
+
+    def entities(self):
+        """Yield all entities in the model."""
+        for classes in self.namespaces.values():
+            yield from classes
+
+    def collapse(self, depth):
+        """Return an overview with one node per namespace group of the given depth."""
+        return Overview(self, depth)
+
+    def filter(self, min_access=None, namespaces=None, members=True):
+        """Return a new model restricted to entities and members of at least min_access,
+        in namespaces matching any of the given patterns, with or without members."""
+        model = Model()
+
+        def visible(feature):
+            return min_access is None or feature.access >= min_access
+
+        for nsp, classes in self.namespaces.items():
+            if namespaces and not match_namespace(nsp, namespaces):
+                continue
+            for ent in filter(visible, classes):
+                ent = copy(ent)
+                ent.fields = [f for f in ent.fields if members and visible(f)]
+                ent.methods = [m for m in ent.methods if members and visible(m)]
+                model.namespaces.setdefault(nsp, []).append(ent)
+        model.associations = self.associations
+        model.fragments = self.fragments
+        return model.resolve()
+
+    @classmethod
+    def from_snapshot(cls, path, associations=False):
+        """Return the resolved model of the sources in a (trusted) snapshot, with or without
+        associations, or None if it can't be read."""
+        snapshot = read_snapshot(path)
+        if snapshot is None:
+            return None
+        model = cls()
+        model.associations = associations
+        for _, _, result, _ in snapshot["results"].values():
+            model.merge(*result)
+        return model.resolve()
+
+    def merge(self, nsp, rel):
+        """Merge namespace dictionary and relations parsed from a file into the model."""
+        for key, val in nsp.items():
+            self.namespaces.setdefault(key, []).extend(val)
+        self.relations.extend(rel)
+
+    def resolve(self):
+        """Return a new model with partial declarations merged and relations resolved
+        through a symbol table, with stub entities for types outside the model.
+
+        If associations is set, associations implied by member types are added."""
+        table = SymbolTable()
+        for ent in self.entities():
+            table.add(ent)
+        model = Model(relations=table.relations())
+        if self.associations:
+            model.relations.extend(table.associations())
+        model.associations = self.associations
+        model.namespaces = table.namespaces()
+        model.stubs = list(table.stubs.values())
+        model.stats = dict(self.stats, partials=table.partials, stubs=len(table.stubs))
+        model.version = self.version
+        model.fragments = self.fragments
+        return model
+
+    def edges(self):
+        """Yield (entity, target, style) for the relations of a resolved model, and for its
+        associations if it has them. Targets outside the model are stubs without namespace."""
+        table = SymbolTable()
+        for ent in self.entities():
+            table.add(ent)
+        yield from table.bases()
+        if self.associations:
+            yield from table.association_edges()
+
+    def iter_dot(self, label="UML Diagram", font="Bahnschrift", compact=False):
+        """Yield the (compact) GraphViz/dot code for the model, one chunk at a time."""
+        return UmlCreator.iter_gv(
+            label, font, self.namespaces, self.relations, self.stubs, self.fragments, compact
+        )
+
+    def to_dot(self, label="UML Diagram", font="Bahnschrift", compact=False):
+        """Convert the model to (compact) GraphViz/dot code."""
+        return "".join(self.iter_dot(label, font, compact))
+
+    def write_gv(self, output_gv, label="UML Diagram", font="Bahnschrift", compact=False):
+        """Write the model to a .gv file."""
+        with open(output_gv, "w") as out:
+            out.writelines(self.iter_dot(label, font, compact))
+
+
+class Project:
+    """A set of C# sources, given as paths or as in-memory (name, source) pairs.
+
+    Every call to build() parses the sources into a new, isolated Model, so a
+    project can be shared between threads. Parse results are kept per source
+    and only sources that changed since the previous build are parsed again.
+    With jobs > 1, or a shared executor, changed sources are parsed in a pool of
+    processes, one .csproj project (or, without project files, one directory) per task.
+
+    Generated code is parsed like any other source if the generated policy is "include",
+    left out if it is "skip" and parsed without members if it is "summarize". Sources
+    larger than max_file_size (in bytes, or characters for strings) are left out, as are
+    sources whose namespace doesn't match the namespace patterns (see in_scope()), which
+    are only read up to their namespace."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        sources=(),
+        repo_url=None,
+        min_access=None,
+        jobs=1,
+        executor=None,
+        associations=False,
+        generated="include",
+        max_file_size=None,
+        namespaces=(),
+    ):
+        self.associations = associations
+        self.executor = executor
+        self.generated = generated
+        self.jobs = jobs
+        self.max_file_size = max_file_size
+        self.min_access = min_access
+        self.namespaces = tuple(namespaces)
+        self.repo_url = repo_url
+        self.fragments = FragmentCache()
+        self._lock = Lock()
+        self._results = dict()
+        self._sources = []
+        for source in sources:
+            self.add(source)
+
+    def __len__(self):
+        return len(self.names())
+
+    def add(self, source):
+        """Add a (name, source) pair, a file, an archive, a .sln/.csproj file or a directory.
+
+        The .cs files in a directory, archive or project are discovered anew on every build."""
+        if isinstance(source, tuple):
+            self.add_source(*source)
+        elif is_project_file(source):
+            self.add_solution(source)
+        elif is_archive(source):
+            self.add_archive(source)
+        elif isdir(source):
+            self.add_directory(source)
+        else:
+            self.add_path(source)
+
+    def add_archive(self, path):
+        """Add all .cs files in a zip, nupkg or tar archive, without extracting it."""
+        with self._lock:
+            self._sources.append((path, ARCHIVE))
+
+    def add_directory(self, directory):
+        """Add all .cs files in a directory and its sub-directories."""
+        with self._lock:
+            self._sources.append((directory, DIRECTORY))
+
+    def add_path(self, path):
+        """Add a .cs file on disk."""
+        with self._lock:
+            self._sources.append((path, None))
+
+    def add_revision(self, directory, rev):
+        """Add all .cs files in a directory as of a git revision, without checking it out."""
+        with self._lock:
+            self._sources.append((directory, Revision(directory, rev)))
+
+    def add_solution(self, path):
+        """Add the .cs files compiled by the projects of a .sln file, or by a .csproj file."""
+        with self._lock:
+            self._sources.append((path, SOLUTION))
+
+    def add_source(self, name, source):
+        """Add a string of C# code under the given (file) name."""
+        with self._lock:
+            self._sources.append((name, source))
+
+    def names(self):
+        """Return the names of all sources in the project."""
+        return [name for name, _ in self.sources()]
+
+    def sources(self):
+        """Return a list of (name, source) pairs.
+
+        Source is None for files on disk and a Blob for files in a git revision."""
+        return [(name, source) for _, name, source in self.units()]
+
+    def units(self):
+        """Return a list of (unit, name, source) triples. Sources of a unit are parsed together.
+
+        The unit of a file in a .sln or .csproj is its project and that of a file in a
+        directory, archive or git revision is the directory it is in. Other sources are units
+        of their own. Units are parsed in batches of at most UNIT_SIZE sources."""
+        return list(self.iter_units())
+
+    def iter_units(self):
+        """Yield (unit, name, source) triples as the sources are discovered, unit by unit."""
+        with self._lock:
+            entries = list(self._sources)
+        for name, source in entries:
+            if source is DIRECTORY:
+                yield from ((dirname(path), path, None) for path in iter_files(name))
+            elif source is SOLUTION:
+                for csproj, paths in project_files(name):
+                    yield from ((csproj, path, None) for path in paths)
+            elif source is ARCHIVE:
+                yield from ((dirname(path), path, text) for path, text in iter_archive(name))
+            elif isinstance(source, Revision):
+                yield from ((dirname(path), path, blob) for path, blob in source.sources())
+            else:
+                yield name, name, source
+
+    def close(self):
+        """Stop any git processes reading sources from a revision."""
+        with self._lock:
+            for _, source in self._sources:
+                if isinstance(source, Revision):
+                    source.close()
+
+    def options(self):
+        """Return the options which the parse results depend on."""
+        return dict(
+            min_access=self.min_access,
+            repo_url=self.repo_url,
+            generated=self.generated,
+            max_file_size=self.max_file_size,
+            namespaces=self.namespaces,
+        )
+
+    def parse(self, name, source=None):
+        """Parse a single source. Return its namespace dictionary and relations."""
+        return parse_source(
+            name, source, self.repo_url, self.min_access, namespaces=self.namespaces
+        )
+
+    @staticmethod
+    def stamp(name, source=None):
+        """Return a value which changes whenever the source changes, ending in its size.
+
+        The stamp of a Blob is its SHA, so it is never read to check for changes. That of
+        a string is a digest of its contents, which is the same in every process."""
+        if isinstance(source, Blob):
+            return (source.sha, source.size)
+        if source is None:
+            try:
+                stat_ = stat(name)
+            except OSError:
+                return None
+            return (stat_.st_mtime_ns, stat_.st_size)
+        return (blake2b(source.encode(), digest_size=16).digest(), len(source))
+
+    @staticmethod
+    def digest(name, source=None):
+        """Return a hash of the contents of a source, or None if it can't be read."""
+        if isinstance(source, Blob):
+            return bytes.fromhex(source.sha)
+        if source is not None:
+            return blake2b(source.encode(), digest_size=16).digest()
+        try:
+            with open(name, "rb") as file_:
+                return blake2b(file_.read(), digest_size=16).digest()
+        except OSError:
+            return None
+
+    @staticmethod
+    def head(name, source=None):
+        """Return the first HEAD characters of a source, or "" if it can't be read."""
+        if isinstance(source, Blob):
+            source = source.read()
+        if source is not None:
+            return source[:HEAD]
+        try:
+            with open(name, errors="replace") as file_:
+                return file_.read(HEAD)
+        except OSError:
+            return ""
+
+    def screen(self, name, source, stamp):
+        """Return the result of a source which isn't to be parsed in full, or None.
+
+        Sources larger than max_file_size, and generated code if the policy is "skip",
+        get an empty result. Generated code is parsed without members if the policy is
+        "summarize". Only the head of a source is read to tell if it is generated."""
+        too_big = self.max_file_size is not None and stamp is not None
+        if too_big and stamp[-1] > self.max_file_size:
+            return dict(), list()
+        if self.generated == "include" or not is_generated(name, self.head(name, source)):
+            return None
+        if self.generated == "skip":
+            return dict(), list()
+        return parse_source(name, source, self.repo_url, self.min_access, False, self.namespaces)
+
+    def load_snapshot(self, path, changed=None):
+        """Load parse results stored by save_snapshot().
+
+        If changed is None, stored results are reused for sources whose stamp is
+        unchanged. Otherwise they are trusted for every source except those with
+        a (normalised) name in changed. Return False if no snapshot could be used."""
+        snapshot = read_snapshot(path)
+        if snapshot is None or snapshot.get("options") != self.options():
+            return False
+        results = snapshot["results"]
+        if changed is not None:
+            results = {
+                name: (self.stamp(name), digest, result, elapsed)
+                for name, (_, digest, result, elapsed) in results.items()
+                if normpath(name) not in changed
+            }
+        with self._lock:
+            self._results = results
+            self.fragments = snapshot["fragments"]
+        return True
+
+    def save_snapshot(self, path):
+        """Store the parse results of the latest build."""
+        with self._lock:
+            snapshot = dict(
+                version=SNAPSHOT_VERSION,
+                options=self.options(),
+                results=self._results,
+                fragments=self.fragments,
+            )
+            with open(path, "wb") as file_:
+                pickle.dump(snapshot, file_, pickle.HIGHEST_PROTOCOL)
+
+    def results(self):
+        """Return the parse results of the latest build, (stamp, digest, result, elapsed) by name."""
+        with self._lock:
+            return dict(self._results)
+
+    def build(self, progress=None):
+        """Parse all sources into a new, resolved Model, calling progress(name) before each one.
+
+        Sources are discovered by a thread and parsed as they arrive, at most PREFETCH
+        sources behind, and merged in the order of discovery. Sources whose stamp is
+        unchanged since the previous build are not parsed again. Sources sharing their
+        size with another source are hashed, and each distinct content is parsed only once.
+        Sources screened out by screen() are neither parsed nor deduplicated."""
+        with self._lock:
+            cached = dict(self._results)
+        model = Model()
+        model.associations = self.associations
+        model.fragments = self.fragments
+        model.stats = dict(files=0, parsed=0, duplicates=0, saved=0.0, skipped=0, skipped_bytes=0)
+        units, entries, by_digest, by_size = [], [], dict(), dict()
+        with ParseQueue(self, progress) as queue, closing(prefetch(self.iter_units())) as stream:
+            for index, (unit, name, source) in enumerate(stream):
+                stamp = self.stamp(name, source)
+                if stamp is not None and name in cached and cached[name][0] == stamp:
+                    _, digest, result, elapsed = cached[name]
+                else:
+                    digest, result, elapsed = None, None, 0.0
+                units.append((unit, name, source))
+                entries.append([name, stamp, digest, result, elapsed])
+                screened = result is None and self.screen(name, source, stamp)
+                if screened:
+                    entries[index][3] = screened
+                    continue
+                # Generated code can't share the result of a source with another name
+                alone = stamp is None or self.generated != "include" and is_generated(name)
+                first = index if alone else by_size.setdefault(stamp[-1], index)
+                if first != index:
+                    # Only sources of the same size can be duplicates, so hash them both
+                    if entries[first][2] is None:
+                        entries[first][2] = self.digest(*units[first][1:])
+                        by_digest.setdefault(entries[first][2], first)
+                    if digest is None:
+                        digest = entries[index][2] = self.digest(name, source)
+                if result is None and digest not in by_digest:
+                    queue.put(unit, index, name, source)
+                if digest is not None:
+                    by_digest.setdefault(digest, index)
+            for index, (result, elapsed) in queue.results():
+                entries[index][3:] = [result, elapsed]
+                model.stats["parsed"] += 1
+        results = dict()
+        for name, stamp, digest, result, elapsed in entries:
+            if result is None:
+                result, elapsed = entries[by_digest[digest]][3:]
+                model.stats["duplicates"] += 1
+                model.stats["saved"] += elapsed
+            results[name] = (stamp, digest, result, elapsed)
+            if not result[0]:
+                model.stats["skipped"] += 1
+                model.stats["skipped_bytes"] += 0 if stamp is None else stamp[-1]
+            model.merge(*result)
+        with self._lock:
+            self._results = results
+        model.stats["files"] = len(entries)
+        model.version = hash(tuple((name, res[0]) for name, res in results.items()))
+        return model.resolve()
+
+
+class ParseQueue:
+    """The sources of a build waiting to be parsed, unit by unit.
+
+    Without a pool, each source is parsed as soon as it is put. With jobs > 1 or a
+    shared executor, the sources of a unit are sent to a pool of processes as soon as
+    the next unit begins or UNIT_SIZE of them are queued, and the pool is only started
+    once there is work for it. At most PENDING batches are in flight; beyond that,
+    putting a source waits for the oldest."""
+
+    def __init__(self, project, progress=None):
+        self.project = project
+        self.progress = progress
+        self.pool = None
+        self.unit = None
+        self.indices = []
+        self.sources = []
+        self.parsed = []
+        self.pending = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.pool is not None and self.pool is not self.project.executor:
+            self.pool.shutdown()
+
+    def put(self, unit, index, name, source):
+        """Parse a source, or queue it with the other sources of its unit."""
+        project = self.project
+        if project.executor is None and project.jobs <= 1:
+            parsed = parse_unit(
+                [(name, source)],
+                project.repo_url,
+                project.min_access,
+                self.progress,
+                project.namespaces,
+            )
+            self.parsed.append(([index], parsed))
+            return
+        if unit != self.unit or len(self.sources) >= UNIT_SIZE:
+            self.submit()
+            self.unit = unit
+        if self.progress:
+            self.progress(name)
+        self.indices.append(index)
+        self.sources.append((name, source.read() if isinstance(source, Blob) else source))
+
+    def submit(self):
+        """Send the sources of the current unit to the pool."""
+        if not self.sources:
+            return
+        project = self.project
+        if self.pool is None:
+            self.pool = project.executor or ProcessPoolExecutor(project.jobs)
+        future = self.pool.submit(
+            parse_unit,
+            self.sources,
+            project.repo_url,
+            project.min_access,
+            namespaces=project.namespaces,
+        )
+        self.pending.append(len(self.parsed))
+        self.parsed.append((self.indices, future))
+        self.indices, self.sources = [], []
+        if len(self.pending) > PENDING:
+            oldest = self.pending.popleft()
+            indices, future = self.parsed[oldest]
+            self.parsed[oldest] = (indices, future.result())
+
+    def results(self):
+        """Yield (index, (result, elapsed)) for every source put, in the order they were put."""
+        self.submit()
+        for indices, parsed in self.parsed:
+            if not isinstance(parsed, list):
+                parsed = parsed.result()
+            yield from zip(indices, parsed)
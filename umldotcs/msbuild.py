@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Discovery of C# source files from .sln and .csproj files."""
+
+import re
+from glob import glob
+from os import walk
+from os.path import dirname, isfile, join, normpath, relpath
+from xml.etree import ElementTree  # nosec - project files are trusted input
+
+from umldotcs.sources import exclude
+
+SLN_PROJECT = re.compile(
+    r'^Project\("\{[^}]+\}"\)\s*=\s*"[^"]*",\s*"([^"]+\.csproj)"', re.MULTILINE
+)
+DEFAULT_EXCLUDES = ["bin/**", "obj/**", "**/.*/**"]
+
+
+def is_project_file(path):
+    """Return True if the path is a .sln or .csproj file."""
+    return path.lower().endswith((".sln", ".csproj"))
+
+
+def solution_projects(sln):
+    """Return the paths of the .csproj files listed in a .sln file."""
+    with open(sln, "r", encoding="utf-8-sig") as file_:
+        matches = SLN_PROJECT.findall(file_.read())
+    return [join(dirname(sln), normpath(path.replace("\\", "/"))) for path in matches]
+
+
+def pattern_regex(pattern):
+    """Return a regex matching the relative paths matched by an MSBuild wildcard pattern."""
+    parts = re.split(r"(\*\*/|\*\*|\*|\?)", pattern.replace("\\", "/"))
+    wildcards = {"**/": "(?:.*/)?", "**": ".*", "*": "[^/]*", "?": "[^/]"}
+    return re.compile("".join(wildcards.get(part, re.escape(part)) for part in parts) + "$")
+
+
+def expand(directory, patterns, files):
+    """Return the .cs files matched by ;-separated MSBuild patterns, relative to directory.
+
+    files is the list of all files below directory, relative to it, for matching wildcards
+    which don't reach outside of it. Patterns using MSBuild properties are skipped."""
+    matched = []
+    for pattern in filter(None, (p.strip() for p in patterns.split(";"))):
+        pattern = pattern.replace("\\", "/")
+        if "$(" in pattern:
+            continue
+        if pattern.startswith("../"):
+            paths = sorted(glob(join(directory, pattern), recursive=True))
+            matched.extend(relpath(path, directory) for path in paths)
+        elif not re.search(r"[*?]", pattern):
+            matched.append(normpath(pattern))
+        else:
+            regex = pattern_regex(pattern)
+            matched.extend(path for path in files if regex.match(path))
+    return [path for path in matched if path.endswith(".cs")]
+
+
+def compile_items(csproj):
+    """Return the .cs files compiled by a .csproj file, defaults first, sorted by path.
+
+    SDK-style projects compile all .cs files below the project directory except for
+    bin/, obj/ and hidden directories, unless EnableDefaultCompileItems is false. Compile
+    items add files (minus their Exclude patterns) and remove them. Conditions are ignored.
+    Wildcards within the project directory never match files in bin/, obj/ or hidden
+    directories, which aren't even walked."""
+    directory = dirname(csproj) or "."
+    root = ElementTree.parse(csproj).getroot()
+    elements = [(elem.tag.rpartition("}")[2], elem) for elem in root.iter()]
+    walked = []
+    for path, dirs, names in walk(directory):
+        # Prune what the default excludes leave out, like .git, bin and obj
+        top = path == directory
+        dirs[:] = [d for d in dirs if not d.startswith(".") and not (top and d in ("bin", "obj"))]
+        walked.append((path, names))
+    files = [
+        relpath(join(path, name), directory).replace("\\", "/")
+        for path, names in sorted(walked)
+        for name in sorted(names)
+    ]
+    items = []
+    defaults = "Sdk" in root.attrib or any(tag == "Sdk" for tag, _ in elements)
+    for tag, elem in elements:
+        if tag == "EnableDefaultCompileItems" and (elem.text or "").strip().lower() == "false":
+            defaults = False
+    if defaults:
+        excluded = set(expand(directory, ";".join(DEFAULT_EXCLUDES), files))
+        items = [path for path in expand(directory, "**/*.cs", files) if path not in excluded]
+    seen = set(items)
+    for tag, elem in elements:
+        if tag != "Compile":
+            continue
+        if "Include" in elem.attrib:
+            excluded = set(expand(directory, elem.get("Exclude", ""), files))
+            for path in expand(directory, elem.get("Include"), files):
+                if path not in excluded and path not in seen:
+                    seen.add(path)
+                    items.append(path)
+        if "Remove" in elem.attrib:
+            removed = set(expand(directory, elem.get("Remove"), files))
+            items = [path for path in items if path not in removed]
+            seen -= removed
+    paths = (join(directory, path) for path in items)
+    return [path for path in paths if isfile(path) and not exclude(path.replace("\\", "/"))]
+
+
+def project_files(path):
+    """Return (csproj, files) pairs for a .sln or .csproj file."""
+    projects = solution_projects(path) if path.lower().endswith(".sln") else [path]
+    return [(csproj, compile_items(csproj)) for csproj in projects if isfile(csproj)]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Namespace-collapsed overview of a model."""
+
+import re
+from collections import Counter
+from math import log2
+
+from umldotcs.symbols import SymbolTable
+
+
+def collapse_depth(spec):
+    """Return the namespace depth for a number or a pattern like Company.Product.*"""
+    if str(spec).isdigit():
+        return int(spec)
+    return len(str(spec).split("."))
+
+
+def group_of(nsp, depth):
+    """Return the first depth parts of a namespace."""
+    return ".".join(nsp.split(".")[:depth])
+
+
+def qualified(ent):
+    """Return the fully qualified name of an entity."""
+    return f"{ent.namespace}.{ent.name}"
+
+
+class Overview:
+    """A model collapsed into one node per namespace group, with weighted aggregate edges.
+
+    Edges are the relations of the model, resolved through a SymbolTable like those of
+    the full diagram, including associations if the model has them."""
+
+    def __init__(self, model, depth):
+        self.depth = depth
+        self.entities = Counter()
+        self.members = Counter()
+        self.edges = Counter()
+        groups = dict()
+        table = SymbolTable()
+        for nsp, classes in model.namespaces.items():
+            group = group_of(nsp, depth)
+            for ent in classes:
+                groups[qualified(table.add(ent))] = group
+                self.entities[group] += 1
+                self.members[group] += len(ent.fields) + len(ent.methods)
+        edges = list(table.bases())
+        if model.associations:
+            edges.extend(table.association_edges())
+        for ent, target, _ in edges:
+            source, target = groups[qualified(ent)], groups.get(qualified(target))
+            if target is not None and target != source:
+                self.edges[(source, target)] += 1
+
+    def __bool__(self):
+        return bool(self.entities)
+
+    def iter_dot(self, label="UML Diagram", font="Bahnschrift", compact=False):
+        """Yield the GraphViz/dot code for the overview, one chunk at a time.
+
+        If compact, the code is not indented."""
+        if compact:
+            for chunk in self.iter_dot(label, font):
+                yield re.sub(r"^\s+", "", chunk, flags=re.MULTILINE)
+            return
+        yield f"""digraph UML {{
+
+  graph [fontname = "{font} SemiBold", fontsize = 48]
+  edge  [fontname = "{font}", fontsize = 12]
+  node  [fontname = "{font}", fontsize = 12, shape = box, style = rounded, color = crimson]
+
+  label    = "{label}"
+  labelloc = "t"\n\n"""
+        for group in sorted(self.entities):
+            yield (
+                f'  "{group}" [label = <<B>{group}</B><BR/>'
+                f"{self.entities[group]} entities, {self.members[group]} members>]\n"
+            )
+        yield "\n"
+        for (source, target), count in sorted(self.edges.items()):
+            yield (
+                f'  "{source}" -> "{target}" '
+                f'[label = "{count}", weight = {count}, penwidth = {1 + log2(count):.2f}]\n'
+            )
+        yield "}\n"
+
+    def to_dot(self, label="UML Diagram", font="Bahnschrift", compact=False):
+        """Convert the overview to GraphViz/dot code."""
+        return "".join(self.iter_dot(label, font, compact))
+
+    def write_gv(self, output_gv, label="UML Diagram", font="Bahnschrift", compact=False):
+        """Write the overview to a .gv file."""
+        with open(output_gv, "w") as out:
+            out.writelines(self.iter_dot(label, font, compact))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Vectorised scanning of many C# sources at once, if NumPy is available.
+
+The sources of a unit are joined into one byte buffer, in which line boundaries and
+the first word of every line are found with NumPy. Once the namespace and entity of
+a file have been found line by line, only the lines which can declare a member or an
+attribute (their first word is an access keyword or starts with "[") are decoded and
+handed to UmlCreator.process_line(). All other lines are no-ops for it, so the results
+are the same as those of parsing every line in Python.
+
+Set UMLDOTCS_ENGINE=python to parse every line in Python even if NumPy is installed."""
+
+from contextlib import nullcontext
+from locale import getpreferredencoding
+from os import environ
+from time import perf_counter
+
+from umldotcs.creator import UmlCreator
+from umldotcs.features import ACCESS_KEYWORDS
+from umldotcs.vcs import Blob
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+ENABLED = np is not None and environ.get("UMLDOTCS_ENGINE", "numpy") != "python"
+KEYWORDS = [key.encode() for key in ACCESS_KEYWORDS if " " not in key]
+WIDTH = max(map(len, KEYWORDS)) + 1
+# Bytes >= 0x80 may be Unicode whitespace, which str.split() also splits on, or begin a
+# keyword after it, so lines with such a first byte are always candidates.
+# Line breaks of str.splitlines() other than \n and \r: strings containing any are
+# parsed in Python, because the lines of the buffer would not be the same.
+LINE_BREAKS = [brk.encode() for brk in "\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"]
+
+
+def blanks(arr):
+    """Return the mask of the bytes of an array which str.split() sees as whitespace."""
+    return ((arr - np.uint8(9)) < 5) | ((arr - np.uint8(28)) < 5)
+
+
+def candidates(buf):
+    """Return the starts and ends of the lines of a buffer ending in a newline, plus the
+    indices of the lines which may declare a member or an attribute."""
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    ends = np.flatnonzero(arr == ord("\n"))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    blank = blanks(arr)
+    # Starts of words, of which the first at or after the start of a line is its first word
+    words = np.flatnonzero(blank[:-1] & ~blank[1:]) + 1
+    if not blank[0]:
+        words = np.concatenate(([0], words))
+    first = np.append(words, len(arr))[np.searchsorted(words, starts)]
+    filled = first < ends
+    lead = arr[np.minimum(first, len(arr) - 1)]
+    found = ((lead == ord("[")) | (lead >= 0x80)) & filled
+    # Compare whole keywords only on the lines whose first byte begins one
+    maybe = np.flatnonzero(np.isin(lead, list({key[0] for key in KEYWORDS})) & filled)
+    padded = np.concatenate((arr, np.full(WIDTH, ord(" "), dtype=np.uint8)))
+    heads = padded[first[maybe, None] + np.arange(WIDTH)]
+    for keyword in KEYWORDS:
+        after = heads[:, len(keyword)]
+        matches = (heads[:, : len(keyword)] == np.frombuffer(keyword, dtype=np.uint8)).all(1)
+        found[maybe[matches & (blanks(after) | (after >= 0x80))]] = True
+    return starts.tolist(), ends.tolist(), np.flatnonzero(found).tolist()
+
+
+def read(name, source):
+    """Return the contents of a source as bytes with \\n line breaks, plus their encoding.
+
+    Return None for sources which can't be scanned as such and are parsed line by line."""
+    if source is None:
+        try:
+            with open(name, "rb") as file_:
+                data, encoding = file_.read(), getpreferredencoding(False)
+        except IsADirectoryError:
+            return None
+    else:
+        try:
+            data, encoding = source.encode(), "utf-8"
+        except UnicodeEncodeError:
+            return None
+        if any(brk in data for brk in LINE_BREAKS):
+            return None
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n"), encoding
+
+
+def in_scope(name, source, namespaces):
+    """Return False if the namespace of a source is out of scope of the namespace patterns,
+    reading a file on disk only up to the line declaring its namespace."""
+    creator = UmlCreator(name, namespaces=namespaces)
+    try:
+        with open(name, "r") if source is None else nullcontext(source.splitlines()) as lines:
+            for line in lines:
+                creator.process_line(line, None)
+                if creator.nsp is not None:
+                    return not creator.out_of_scope
+    except IsADirectoryError:
+        pass
+    return True
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def parse_sources(sources, repo_url=None, min_access=None, progress=None, namespaces=()):
+    """Parse the (name, source) pairs of a unit of work. Return (result, elapsed) for each.
+
+    Sources whose namespace is out of scope of the namespace patterns are left out, and
+    only read up to their namespace, before the others are scanned."""
+    start = perf_counter()
+    sources = [(name, src.read() if isinstance(src, Blob) else src) for name, src in sources]
+    scoped = [not namespaces or in_scope(name, src, namespaces) for name, src in sources]
+    buffers = [read(*src) if keep else None for src, keep in zip(sources, scoped)]
+    buf = b"".join((buffer[0] if buffer else b"") + b"\n" for buffer in buffers)
+    starts, ends, found = candidates(buf)
+    scanned = perf_counter() - start
+    results = []
+    line = cand = 0
+    for (name, source), buffer, keep in zip(sources, buffers, scoped):
+        if progress:
+            progress(name)
+        start = perf_counter()
+        creator = UmlCreator(name, repo_url, min_access, namespaces=namespaces)
+        if not keep:
+            results.append(((dict(), list()), 0.0))
+            line += 1
+            continue
+        if buffer is None:
+            result = creator.process_file() if source is None else creator.process_source(source)
+            results.append((result, perf_counter() - start))
+            line += 1
+            continue
+        data, encoding = buffer
+        last = line + data.count(b"\n") + 1
+        ent = None
+        # Parse line by line up to the entity, then only the lines which may declare members
+        while line < last and ent is None and not creator.out_of_scope:
+            ent = creator.process_line(buf[starts[line] : ends[line]].decode(encoding), ent)
+            line += 1
+        while cand < len(found) and found[cand] < line:
+            cand += 1
+        while cand < len(found) and found[cand] < last and not creator.out_of_scope:
+            index = found[cand]
+            ent = creator.process_line(buf[starts[index] : ends[index]].decode(encoding), ent)
+            cand += 1
+        share = scanned * (len(data) + 1) / len(buf)
+        results.append((creator.finish(ent), perf_counter() - start + share))
+        line = last
+    return results
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Local HTTP service rendering diagrams from warm, incrementally updated models."""
+
+import json
+import re
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from subprocess import CalledProcessError, run  # nosec
+from threading import BoundedSemaphore, Lock
+from time import perf_counter
+from urllib.parse import parse_qs, urlparse
+
+from umldotcs.model import Project
+
+FORMATS = {
+    "gv": "text/vnd.graphviz; charset=utf-8",
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+class Metrics:
+    """Thread-safe counters and latency figures."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.counters = dict()
+        self.latencies = dict()
+
+    def count(self, key, increment=1):
+        """Increment a counter."""
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + increment
+
+    def time(self, key, seconds):
+        """Record the duration of an event."""
+        with self._lock:
+            count, total, peak = self.latencies.get(key, (0, 0.0, 0.0))
+            self.latencies[key] = (count + 1, total + seconds, max(peak, seconds))
+
+    def as_dict(self):
+        """Return a snapshot of all metrics, with latencies in milliseconds."""
+        with self._lock:
+            latencies = {
+                key: dict(count=count, avg_ms=1000 * total / count, max_ms=1000 * peak)
+                for key, (count, total, peak) in self.latencies.items()
+            }
+            return dict(counters=dict(self.counters), latencies=latencies)
+
+
+class RenderService:
+    """Keep a warm Project per source root and a cache of rendered diagrams."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, roots, font="Bahnschrift", label="UML Diagram", repo_url=None, max_dot=2):
+        self.font = font
+        self.label = label
+        self.projects = {name: Project([directory], repo_url) for name, directory in roots.items()}
+        self.metrics = Metrics()
+        self.cache_size = 128
+        self._cache = OrderedDict()
+        self._cache_lock = Lock()
+        self._dot_slots = BoundedSemaphore(max_dot)
+        self._models = dict()
+
+    def model(self, root):
+        """Return an up-to-date model of a root, parsing only changed files.
+
+        The model is only rebuilt if the stamps of the sources changed since the last build."""
+        project = self.projects[root]
+        start = perf_counter()
+        stamps = [(name, project.stamp(name, source)) for name, source in project.sources()]
+        cached = self._models.get(root)
+        if cached is not None and cached[0] == stamps:
+            self.metrics.count("files.reused", len(stamps))
+            return cached[1]
+        model = project.build()
+        self._models[root] = (stamps, model)
+        self.metrics.time("parse", perf_counter() - start)
+        self.metrics.count("files.parsed", model.stats["parsed"])
+        self.metrics.count("files.reused", model.stats["files"] - model.stats["parsed"])
+        return model
+
+    def render(self, root, fmt="svg", label=None):
+        """Return the diagram of a root in the given format, rendering it only if needed."""
+        model = self.model(root)
+        label = label or self.label
+        key = (root, model.version, fmt, label)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.metrics.count("cache.hits")
+                return self._cache[key]
+        self.metrics.count("cache.misses")
+        output = model.to_dot(label, self.font).encode()
+        if fmt != "gv":
+            output = self.run_dot(output, fmt)
+        with self._cache_lock:
+            self._cache[key] = output
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return output
+
+    def run_dot(self, dot, fmt):
+        """Run dot on some dot code, with at most max_dot processes at a time."""
+        with self._dot_slots:
+            start = perf_counter()
+            result = run(["dot", f"-T{fmt}"], input=dot, capture_output=True, check=True)
+            self.metrics.time("dot", perf_counter() - start)
+        return result.stdout
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """Serve /<root>.<format>, /metrics and a list of roots at /."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle a GET request."""
+        start = perf_counter()
+        service = self.server.service
+        url = urlparse(self.path)
+        root, _, fmt = url.path[1:].rpartition(".")
+        label = parse_qs(url.query).get("label", [None])[0]
+        if url.path == "/":
+            self.send(200, "application/json", json.dumps(sorted(service.projects)).encode())
+        elif url.path == "/metrics":
+            self.send(200, "application/json", json.dumps(service.metrics.as_dict()).encode())
+        elif root not in service.projects or fmt not in FORMATS:
+            self.send(404, "text/plain", b"Not found")
+        elif label is not None and re.search(r'["\\]', label):
+            # Quotes and backslashes would escape the dot string the label goes into
+            self.send(400, "text/plain", b"Labels can't contain quotes or backslashes")
+        else:
+            try:
+                self.send(200, FORMATS[fmt], service.render(root, fmt, label))
+            except (CalledProcessError, OSError) as ex:
+                self.send(502, "text/plain", str(ex).encode())
+            except (RuntimeError, ValueError) as ex:
+                # Sources which can't be parsed, e.g. files without a namespace or entity
+                self.send(500, "text/plain", str(ex).encode())
+        service.metrics.time("request", perf_counter() - start)
+
+    def send(self, code, content_type, body):
+        """Send a complete response."""
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(service, host="127.0.0.1", port=8080):
+    """Return an HTTP server for a RenderService."""
+    server = ThreadingHTTPServer((host, port), RenderHandler)
+    server.service = service
+    return server
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Discovery of C# source files."""
+
+import tarfile
+from os import walk
+from os.path import join
+from queue import Full, Queue
+from re import IGNORECASE, search
+from threading import Event, Thread
+from zipfile import ZipFile, is_zipfile
+
+ARCHIVE = r"\.(zip|nupkg|tar|tgz|tar\.gz|tar\.bz2|tar\.xz)$"
+GENERATED = r"\.(designer|generated|g|g\.i)\.cs$|/Migrations/(\d{14}_\w+|\w+ModelSnapshot)\.cs$"
+MARKER = r"<auto-?generated|\[(System\.CodeDom\.Compiler\.)?GeneratedCode(Attribute)?\("
+HEAD = 4096
+PREFETCH = 1024
+
+
+def glob_files(directory):
+    """Return list of non-excluded files in dir and its subdirs."""
+    return list(iter_files(directory))
+
+
+def iter_files(directory):
+    """Yield the non-excluded .cs files in dir and its subdirs as they are found.
+
+    Like a recursive glob, hidden files and directories are skipped. Each directory
+    is walked in name order, so files are always yielded in the same order."""
+    for path, dirs, files in walk(directory, followlinks=True):
+        dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+        for name in sorted(files):
+            if name.endswith(".cs") and not name.startswith("."):
+                file_path = join(path, name)
+                if not exclude(file_path):
+                    yield file_path
+
+
+def prefetch(items, size=PREFETCH):
+    """Yield the items of an iterable which is consumed by a thread, at most size items ahead.
+
+    The thread blocks while size items are waiting, so a slow consumer bounds the memory
+    used. Exceptions raised by the iterable are raised by the generator, in order. When
+    the generator is closed, the thread stops at its next item."""
+    queue = Queue(size)
+    stop = Event()
+    end = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except Exception as ex:  # pylint: disable=broad-except
+            put((end, ex))
+        else:
+            put((end, None))
+
+    Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, error = queue.get()
+            if error is not None:
+                raise error
+            if item is end:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def exclude(path):
+    """Return True if the path should be excluded."""
+    return search(r"AssemblyInfo\.cs|Test\.cs|/(bin|obj)/(Debug|Release)/", path)
+
+
+def is_generated(path, head=""):
+    """Return True if the path or the head of the file, its first HEAD characters, mark
+    the file as generated code, like Form.Designer.cs or an <auto-generated> header."""
+    return bool(search(GENERATED, path, IGNORECASE) or search(MARKER, head, IGNORECASE))
+
+
+def is_archive(path):
+    """Return True if the path looks like a zip, nupkg or tar archive."""
+    return bool(search(ARCHIVE, path, IGNORECASE))
+
+
+def iter_archive(path):
+    """Yield (name, source) pairs for the non-excluded .cs files in an archive.
+
+    Each file is named path/member and decoded in memory, never extracted. Zip files are
+    yielded in name order. Tarballs are streamed in the order they were archived in, since
+    reading their compressed members in any other order restarts decompression."""
+    if is_zipfile(path):
+        with ZipFile(path) as archive:
+            for info in sorted(archive.infolist(), key=lambda info: info.filename):
+                name = f"{path}/{info.filename}"
+                if not info.is_dir() and name.endswith(".cs") and not exclude(name):
+                    yield name, decode(archive.read(info))
+    else:
+        with tarfile.open(path, "r|*") as archive:
+            for info in archive:
+                name = f"{path}/{info.name}"
+                if info.isfile() and name.endswith(".cs") and not exclude(name):
+                    yield name, decode(archive.extractfile(info).read())
+
+
+def decode(data):
+    """Decode the contents of a source file like open() does, keeping any BOM."""
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""SQLite store of parsed models, updated file by file and queryable without parsing."""
+
+import sqlite3
+
+from umldotcs.entities import IMPLEMENTS
+from umldotcs.helpers import decode_generics
+from umldotcs.symbols import SymbolTable
+
+STORE_VERSION = 3
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS options (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, stamp TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    namespace TEXT NOT NULL,
+    name TEXT NOT NULL,
+    fqn TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    access TEXT NOT NULL,
+    modifiers TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    entity INTEGER NOT NULL REFERENCES entities (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    access TEXT NOT NULL,
+    modifiers TEXT NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS relations (
+    file TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    target_name TEXT NOT NULL,
+    kind TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entities_name ON entities (name);
+CREATE INDEX IF NOT EXISTS entities_fqn ON entities (fqn);
+CREATE INDEX IF NOT EXISTS entities_namespace ON entities (namespace);
+CREATE INDEX IF NOT EXISTS entities_file ON entities (file);
+CREATE INDEX IF NOT EXISTS members_entity ON members (entity);
+CREATE INDEX IF NOT EXISTS members_type ON members (type);
+CREATE INDEX IF NOT EXISTS relations_target ON relations (target);
+CREATE INDEX IF NOT EXISTS relations_target_name ON relations (target_name);
+CREATE INDEX IF NOT EXISTS relations_file ON relations (file);
+"""
+ENTITY_COLUMNS = "entities.namespace, entities.name, entities.kind, entities.file"
+
+
+def fqn(ent):
+    """Return the fully qualified name of an entity, or the name of a stub."""
+    return ent.name if ent.namespace is None else f"{ent.namespace}.{ent.name}"
+
+
+def symbol_table(results):
+    """Return a SymbolTable of the entities in parse results."""
+    table = SymbolTable()
+    for _, _, (namespaces, _), _ in results.values():
+        for classes in namespaces.values():
+            for ent in classes:
+                table.add(ent)
+    return table
+
+
+def short_names(namespaces):
+    """Return the set of names of the entities in a namespace dictionary."""
+    return {ent.name for classes in namespaces.values() for ent in classes}
+
+
+def relation_rows(table, path, namespaces):
+    """Return the rows of the relations table for the entities parsed from a file, with
+    their base types resolved through a SymbolTable of the whole model."""
+    rows = []
+    for classes in namespaces.values():
+        for ent in classes:
+            for name in ent.implements:
+                base, style = table.base(name, ent.namespace)
+                kind = "implements" if style == IMPLEMENTS else "extends"
+                rows.append((path, fqn(ent), fqn(base), base.name, kind))
+    return rows
+
+
+def member_rows(entity, ent):
+    """Return the rows of the members table for the fields and methods of an entity."""
+    members = [("field", f.type, f.name, f) for f in ent.fields]
+    members.extend(("method", m.return_type, m.signature, m) for m in ent.methods)
+    return [
+        (
+            entity,
+            kind,
+            member.access.value,
+            " ".join(m.value for m in member.modifiers),
+            decode_generics(typ),
+            decode_generics(name),
+        )
+        for kind, typ, name, member in members
+    ]
+
+
+class ModelStore:
+    """A SQLite database of the entities, members and relations parsed from each file.
+
+    update() only rewrites the rows of files whose stamp changed since the previous
+    update, and drops those of files which are gone. Relations are stored between fully
+    qualified names, resolved through a SymbolTable of the whole model like those of the
+    diagram. Besides those of changed files, only the relations to types sharing a name
+    with an entity of a changed file are resolved again. Queries return rows of
+    (namespace, name, kind, file) for entities and (namespace, entity, kind, name,
+    type) for members."""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != STORE_VERSION:
+            with self.connection:
+                for table in ["relations", "members", "entities", "files", "options"]:
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+                self.connection.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    def update(self, results, options=None):
+        """Store parse results, a dictionary of (stamp, digest, result, elapsed) by file name,
+        as returned by Project.results(). Return the numbers of files updated and removed.
+
+        If options differ from those of the stored results, every file is stored anew."""
+        options = {key: repr(val) for key, val in (options or {}).items()}
+        with self.connection as con:
+            if dict(con.execute("SELECT key, value FROM options")) != options:
+                con.execute("DELETE FROM files")
+                con.execute("DELETE FROM options")
+                con.executemany("INSERT INTO options VALUES (?, ?)", options.items())
+            stored = dict(con.execute("SELECT path, stamp FROM files"))
+            changed = [path for path, res in results.items() if stored.get(path) != repr(res[0])]
+            removed = [path for path in stored if path not in results]
+            # Relations to types sharing a name with a changed entity may resolve differently
+            names = set()
+            for path in changed + removed:
+                rows = con.execute("SELECT name FROM entities WHERE file = ?", (path,))
+                names.update(name for name, in rows)
+            for path in changed:
+                stamp, _, result, _ = results[path]
+                names.update(short_names(result[0]))
+                con.execute("DELETE FROM files WHERE path = ?", (path,))
+                con.execute("INSERT INTO files VALUES (?, ?)", (path, repr(stamp)))
+                self.insert(path, result[0])
+            con.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+            affected = set(changed)
+            for name in names:
+                rows = con.execute(
+                    "SELECT DISTINCT file FROM relations WHERE target_name = ?", (name,)
+                )
+                affected.update(path for path, in rows)
+            if affected:
+                table = symbol_table(results)
+                for path in sorted(affected):
+                    con.execute("DELETE FROM relations WHERE file = ?", (path,))
+                    con.executemany(
+                        "INSERT INTO relations VALUES (?, ?, ?, ?, ?)",
+                        relation_rows(table, path, results[path][2][0]),
+                    )
+        return len(changed), len(removed)
+
+    def insert(self, path, namespaces):
+        """Insert the entities and members parsed from a file."""
+        con = self.connection
+        for nsp, classes in namespaces.items():
+            for ent in classes:
+                modifiers = " ".join(m.value for m in ent.modifiers)
+                kind = type(ent).__name__[3:].lower()
+                row = (path, nsp, ent.name, f"{nsp}.{ent.name}", kind, ent.access.value, modifiers)
+                entity = con.execute(
+                    "INSERT INTO entities (file, namespace, name, fqn, kind, access, modifiers) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                ).lastrowid
+                con.executemany(
+                    "INSERT INTO members VALUES (?, ?, ?, ?, ?, ?)", member_rows(entity, ent)
+                )
+
+    def derived(self, name, kind=None, recursive=False):
+        """Return the entities which extend or implement the named type, given by its fully
+        qualified or its short name.
+
+        If kind is given, only entities related to the type by that kind of relation
+        ("extends" or "implements") are returned. If recursive, entities derived from
+        those, by either kind of relation, are included too."""
+        kinds = ["extends", "implements"] if kind is None else [kind]
+        query = f"""
+            WITH RECURSIVE derived (fqn) AS (
+                SELECT source FROM relations
+                WHERE target_name = ?
+                AND (target = ? OR substr(target, -length(?) - 1) = '.' || ?)
+                AND kind IN ({", ".join("?" * len(kinds))})
+                UNION
+                SELECT relations.source FROM relations JOIN derived ON target = derived.fqn
+                WHERE ?
+            )
+            SELECT DISTINCT {ENTITY_COLUMNS} FROM derived
+            JOIN entities ON entities.fqn = derived.fqn
+            ORDER BY entities.namespace, entities.name"""
+        params = [name.rpartition(".")[2], name, name, name, *kinds, recursive]
+        return self.connection.execute(query, params).fetchall()
+
+    def implementors(self, name, recursive=False):
+        """Return the entities implementing the named interface."""
+        return self.derived(name, "implements", recursive)
+
+    def subclasses(self, name, recursive=False):
+        """Return the entities extending the named class."""
+        return self.derived(name, "extends", recursive)
+
+    def returning(self, typ):
+        """Return the fields and methods of the given (return) type. * and ? are wildcards."""
+        operator = "GLOB" if "*" in typ or "?" in typ else "="
+        query = f"""
+            SELECT entities.namespace, entities.name, members.kind, members.name, members.type
+            FROM members JOIN entities ON entities.id = members.entity
+            WHERE members.type {operator} ?
+            ORDER BY entities.namespace, entities.name, members.name"""
+        return self.connection.execute(query, (typ,)).fetchall()
+
+    def in_namespace(self, nsp):
+        """Return the entities in a namespace."""
+        query = f"""
+            SELECT {ENTITY_COLUMNS} FROM entities WHERE namespace = ?
+            ORDER BY entities.name"""
+        return self.connection.execute(query, (nsp,)).fetchall()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Run-wide symbol table of entities indexed by fully qualified name."""
+
+import re
+from copy import copy
+from functools import lru_cache
+from os.path import commonprefix
+
+from umldotcs.entities import (
+    AGGREGATES,
+    COMPOSITES,
+    EXTENDS,
+    HAS_A,
+    IMPLEMENTS,
+    UmlClass,
+    UmlInterface,
+)
+from umldotcs.features import Modifier
+
+STUB_COLOR = "gray50"
+COLLECTIONS = frozenset(
+    [
+        "Collection",
+        "ConcurrentBag",
+        "ConcurrentDictionary",
+        "ConcurrentQueue",
+        "Dictionary",
+        "HashSet",
+        "ICollection",
+        "IDictionary",
+        "IEnumerable",
+        "IList",
+        "IReadOnlyCollection",
+        "IReadOnlyDictionary",
+        "IReadOnlyList",
+        "ISet",
+        "ImmutableArray",
+        "ImmutableDictionary",
+        "ImmutableList",
+        "LinkedList",
+        "List",
+        "ObservableCollection",
+        "Queue",
+        "ReadOnlyCollection",
+        "SortedDictionary",
+        "SortedList",
+        "SortedSet",
+        "Stack",
+    ]
+)
+GENERIC_SUFFIX = re.compile(r"(_[TUVWXYZ])+_$")
+STRENGTH = {HAS_A: 1, AGGREGATES: 2, COMPOSITES: 3}
+TYPE_TOKEN = re.compile(r"&lt;|<|(?:&gt;|>|([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*))(\s*\[)?")
+
+
+def is_partial(ent):
+    """Return True if an entity is declared partial."""
+    return Modifier.PARTIAL in ent.modifiers
+
+
+def looks_like_interface(name):
+    """Guess whether an unknown type is an interface from the IFoo naming convention."""
+    return len(name) > 1 and name[0] == "I" and name[1].isupper()
+
+
+@lru_cache(maxsize=1 << 16)
+def type_refs(typ):
+    """Return a tuple of (name, style) pairs for the type names in a member type.
+
+    The outer type is composed, types in arrays and collections are aggregated and
+    other generic arguments are merely used. Member types repeat a lot, so results
+    are cached."""
+    refs = []
+    wrappers = []
+    for match in TYPE_TOKEN.finditer(typ):
+        name, array = match.groups()
+        if match.group(0) in ("<", "&lt;"):
+            outer = refs[-1][0].rpartition(".")[2] if refs else None
+            wrappers.append((outer in COLLECTIONS, len(refs) - 1))
+        elif name is None and wrappers:
+            _, index = wrappers.pop()
+            if array and index >= 0 and not any(collection for collection, _ in wrappers):
+                refs[index] = (refs[index][0], AGGREGATES)
+        elif name is None:
+            continue
+        elif array or any(collection for collection, _ in wrappers):
+            refs.append((name, AGGREGATES))
+        else:
+            refs.append((name, HAS_A if wrappers else COMPOSITES))
+    return tuple(refs)
+
+
+class SymbolTable:
+    """Entities indexed by fully qualified name, with partial declarations merged."""
+
+    def __init__(self):
+        self.entities = dict()
+        self.by_name = dict()
+        self.stubs = dict()
+        self.partials = 0
+        self._merged = set()
+
+    def __len__(self):
+        return len(self.entities)
+
+    def add(self, ent):
+        """Add an entity, merging it into an earlier partial declaration of the same type.
+
+        Return the entity in the table."""
+        fqn = f"{ent.namespace}.{ent.name}"
+        existing = self.entities.get(fqn)
+        if existing is None:
+            self.entities[fqn] = ent
+            self.by_name.setdefault(ent.name, []).append(fqn)
+            return ent
+        if not (is_partial(existing) or is_partial(ent)):
+            return existing
+        if fqn not in self._merged:
+            # Parse results may be shared between models, so merge into a copy
+            existing = copy(existing)
+            existing.fields = list(existing.fields)
+            existing.methods = list(existing.methods)
+            existing.implements = list(existing.implements)
+            existing.modifiers = list(existing.modifiers)
+            self.entities[fqn] = existing
+            self._merged.add(fqn)
+        existing.fields.extend(ent.fields)
+        existing.methods.extend(ent.methods)
+        existing.implements.extend(i for i in ent.implements if i not in existing.implements)
+        existing.modifiers.extend(m for m in ent.modifiers if m not in existing.modifiers)
+        self.partials += 1
+        return existing
+
+    def resolve(self, name, nsp):
+        """Return the entity a type name used in namespace nsp refers to, or None."""
+        if name in self.entities:
+            return self.entities[name]
+        fqns = self.by_name.get(name.rpartition(".")[2])
+        if not fqns:
+            return None
+        if len(fqns) == 1:
+            return self.entities[fqns[0]]
+        # Prefer the candidate sharing the longest namespace prefix with nsp
+        scope = f"{nsp}."
+        return self.entities[max(fqns, key=lambda fqn: len(commonprefix([fqn, scope])))]
+
+    def stub(self, name):
+        """Return a stub entity for an external type."""
+        name = name.rpartition(".")[2]
+        if name not in self.stubs:
+            kind = UmlInterface if looks_like_interface(name) else UmlClass
+            stub = kind([name], nsp=None)
+            stub.bgcolor = "white"
+            stub.color = STUB_COLOR
+            self.stubs[name] = stub
+        return self.stubs[name]
+
+    def base(self, name, nsp):
+        """Return (base, style) for a base type name used in namespace nsp, creating a stub
+        if needed. The style is IMPLEMENTS for interfaces and EXTENDS otherwise."""
+        target = self.resolve(name, nsp)
+        if target is None:
+            target = self.stub(name)
+        return target, IMPLEMENTS if isinstance(target, UmlInterface) else EXTENDS
+
+    def bases(self):
+        """Yield (entity, base, style) for the base types of all entities, creating stubs
+        as needed."""
+        for ent in self.entities.values():
+            for base in ent.implements:
+                yield (ent, *self.base(base, ent.namespace))
+
+    def relations(self):
+        """Return the relations of all entities as GraphViz/dot code, creating stubs as needed."""
+        return [f"    {ent.name} -> {base.name} {style}" for ent, base, style in self.bases()]
+
+    def associations(self):
+        """Return the associations between entities implied by their members as dot code."""
+        return [
+            f"    {ent.name} -> {target.name} {style}"
+            for ent, target, style in self.association_edges()
+        ]
+
+    def association_edges(self):
+        """Yield (entity, target, style) for the associations implied by members.
+
+        Field types are composed or aggregated and types in method signatures are used.
+        Every type name is looked up once in the name index, so this is a single linear
+        pass over all members. Only the strongest association between two entities is
+        kept, and none to the entity itself or to its base types."""
+        generics = dict()
+        for ent in self.entities.values():
+            base = GENERIC_SUFFIX.sub("", ent.name)
+            if base != ent.name:
+                generics.setdefault(base, ent.name)
+
+        def lookup(name, nsp):
+            target = self.resolve(name, nsp)
+            if target is None and name.rpartition(".")[2] in generics:
+                target = self.resolve(generics[name.rpartition(".")[2]], nsp)
+            return target
+
+        for ent in self.entities.values():
+            refs = [ref for field in ent.fields for ref in type_refs(field.type)]
+            for method in ent.methods:
+                params = method.signature.partition("(")[2]
+                refs.extend((name, HAS_A) for name, _ in type_refs(method.return_type))
+                refs.extend((name, HAS_A) for name, _ in type_refs(params))
+            bases = {id(self.resolve(base, ent.namespace)) for base in ent.implements}
+            edges = dict()
+            for name, style in refs:
+                target = lookup(name, ent.namespace)
+                if target is None or target is ent or id(target) in bases:
+                    continue
+                if STRENGTH[style] > STRENGTH.get(edges.get(target.name, (None, None))[1], 0):
+                    edges[target.name] = (target, style)
+            for target, style in edges.values():
+                yield ent, target, style
+
+    def namespaces(self):
+        """Return a dictionary of entities by namespace."""
+        namespaces = dict()
+        for ent in self.entities.values():
+            namespaces.setdefault(ent.namespace, []).append(ent)
+        return namespaces
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Helpers for querying a local git repository."""
+
+from os.path import join, normpath
+from subprocess import PIPE, Popen, run  # nosec
+from threading import Lock
+
+from umldotcs.sources import decode, exclude
+
+
+def git(directory, *args):
+    """Run a git command in directory and return its output lines."""
+    result = run(["git", "-C", directory, *args], capture_output=True, check=True, text=True)
+    return result.stdout.splitlines()
+
+
+def git_z(directory, *args):
+    """Run a git command with -z in directory and return its NUL-terminated records.
+
+    Paths in the records are neither quoted nor escaped, whatever characters they contain."""
+    result = run(
+        ["git", "-C", directory, *args],
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+        errors="surrogateescape",
+    )
+    return result.stdout.split("\0")[:-1]
+
+
+def changed_files(directory, rev):
+    """Return the normalised paths of .cs files in directory changed, added or deleted since rev."""
+    changed = git_z(directory, "diff", "-z", "--name-only", "--relative", rev, "--", "*.cs")
+    untracked = git_z(directory, "ls-files", "-z", "--others", "--exclude-standard", "--", "*.cs")
+    return {normpath(join(directory, path)) for path in changed + untracked}
+
+
+class CatFile:
+    """A long-lived git cat-file --batch process, started on the first read."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.process = None
+        self._lock = Lock()
+
+    def read(self, sha):
+        """Return the contents of the object with the given SHA."""
+        with self._lock:
+            if self.process is None:
+                self.process = Popen(  # pylint: disable=consider-using-with
+                    ["git", "-C", self.directory, "cat-file", "--batch"], stdin=PIPE, stdout=PIPE
+                )  # nosec
+            self.process.stdin.write(f"{sha}\n".encode())
+            self.process.stdin.flush()
+            header = self.process.stdout.readline().split()
+            if len(header) != 3:
+                raise KeyError(sha)
+            data = self.process.stdout.read(int(header[2]))
+            self.process.stdout.read(1)
+            return data
+
+    def close(self):
+        """Stop the cat-file process, if it was started."""
+        with self._lock:
+            if self.process is not None:
+                self.process.stdin.close()
+                self.process.wait()
+                self.process.stdout.close()
+                self.process = None
+
+
+class Blob:
+    """A file in a git revision, whose contents are only read when needed."""
+
+    __slots__ = ("sha", "size", "cat_file")
+
+    def __init__(self, sha, size, cat_file):
+        self.sha = sha
+        self.size = size
+        self.cat_file = cat_file
+
+    def read(self):
+        """Return the decoded contents of the blob."""
+        return decode(self.cat_file.read(self.sha))
+
+
+class Revision:
+    """The .cs files in a directory as of a git revision, read from the object store."""
+
+    def __init__(self, directory, rev):
+        self.directory = directory
+        self.rev = rev
+        self.cat_file = CatFile(directory)
+
+    def sources(self):
+        """Return (name, Blob) pairs for the non-excluded .cs files in the revision."""
+        sources = []
+        for line in git_z(self.directory, "ls-tree", "-r", "-l", "-z", self.rev):
+            meta, _, path = line.partition("\t")
+            _, type_, sha, size = meta.split()
+            name = join(self.directory, path)
+            if type_ == "blob" and name.endswith(".cs") and not exclude(name):
+                sources.append((name, Blob(sha, int(size), self.cat_file)))
+        return sources
+
+    def close(self):
+        """Stop the cat-file process."""
+        self.cat_file.close()
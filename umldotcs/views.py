@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Views: filtered renderings of a model, each with its own output paths."""
+
+from configparser import ConfigParser
+
+from umldotcs.features import Access
+from umldotcs.overview import collapse_depth
+
+NAMESPACE = "{namespace}"
+
+
+class View:
+    """A named filter on a model plus the paths to render it to."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        name,
+        output_gv=None,
+        output_svg=None,
+        label=None,
+        access=None,
+        namespaces=(),
+        members=True,
+        collapse=None,
+    ):
+        if not output_gv and not output_svg:
+            raise ValueError(f"View {name} has neither a gv nor an svg output")
+        self.name = name
+        self.output_gv = output_gv
+        self.output_svg = output_svg
+        self.label = label
+        self.access = access
+        self.namespaces = list(namespaces)
+        self.members = members
+        self.collapse = collapse
+
+    def __eq__(self, other):
+        return isinstance(other, View) and vars(self) == vars(other)
+
+    def __repr__(self):
+        kwargs = ", ".join(f"{key}={val!r}" for key, val in vars(self).items())
+        return f"View({kwargs})"
+
+    @classmethod
+    def from_dict(cls, name, options):
+        """Create a view from a dictionary of string options, with gv and svg as outputs."""
+        options = dict(options)
+        output_gv = options.pop("gv", None)
+        output_svg = options.pop("svg", None)
+        access = options.pop("access", None)
+        namespaces = options.pop("namespaces", "").replace(",", " ").split()
+        collapse = options.pop("collapse", None)
+        members = options.pop("members", "yes").lower()
+        if members not in ConfigParser.BOOLEAN_STATES:
+            raise ValueError(f"View {name}: members must be yes or no, not {members}")
+        unknown = options.keys() - {"label"}
+        if unknown:
+            raise ValueError(f"View {name}: unknown options {', '.join(sorted(unknown))}")
+        return cls(
+            name,
+            output_gv,
+            output_svg,
+            label=options.get("label"),
+            access=Access(access) if access else None,
+            namespaces=namespaces,
+            members=ConfigParser.BOOLEAN_STATES[members],
+            collapse=collapse_depth(collapse) if collapse else None,
+        )
+
+    @classmethod
+    def parse(cls, spec):
+        """Create a view from a name=...;key=value;... specification."""
+        options = dict(item.split("=", 1) for item in spec.split(";") if item.strip())
+        return cls.from_dict(options.pop("name", "view"), options)
+
+    @classmethod
+    def read_config(cls, path):
+        """Read views from an INI file with one section per view."""
+        config = ConfigParser(interpolation=None)
+        with open(path) as file_:
+            config.read_file(file_)
+        return [cls.from_dict(name, config[name]) for name in config.sections()]
+
+    def expand(self, model):
+        """Return a list of views, one per namespace if the outputs contain {namespace}."""
+        if NAMESPACE not in f"{self.output_gv}{self.output_svg}":
+            return [self]
+        views = []
+        for nsp in model.filter(self.access, self.namespaces, False).namespaces:
+            view = View(**vars(self))
+            view.name = f"{self.name}:{nsp}"
+            view.output_gv = self.output_gv and self.output_gv.replace(NAMESPACE, nsp)
+            view.output_svg = self.output_svg and self.output_svg.replace(NAMESPACE, nsp)
+            view.label = (self.label or "{namespace}").replace(NAMESPACE, nsp)
+            view.namespaces = [nsp]
+            views.append(view)
+        return views
+
+    def apply(self, model):
+        """Return the filtered model of this view, or its overview if collapsed."""
+        model = model.filter(self.access, self.namespaces, self.members)
+        return model.collapse(self.collapse) if self.collapse else model